@@ -0,0 +1,88 @@
+import warnings
+import torch
+import nodes
+
+
+class CompiledGraph:
+    """
+    Execution schedule traced once into a TorchScript function.
+
+    The traced function takes the sigmoid annealing constant, the string temperature, the controlFlowMultiplicative
+    of the input nodes and the input values as arguments. It returns the controlFlowMultiplicative of the target node
+    as well as the sum of all node penalties.
+    Calling it replaces the node by node execution of the schedule.
+    """
+
+    def __init__(self, function, graph, schedule):
+        self.function = function
+        self.graph = graph
+        self.schedule = schedule
+
+    @staticmethod
+    def compile(schedule, output_id, input_values):
+        """
+        Trace the schedule with the given input values
+
+        :param schedule: ExecutionSchedule of the graph
+        :param output_id: id of the target node
+        :param input_values: example values of the input nodes (only tensors are supported)
+        :return: CompiledGraph or None if the graph can't be traced
+        """
+        if not all(isinstance(value, torch.Tensor) for value in input_values):
+            return None # complex types like strings keep their parameters outside the inputs
+
+        graph = schedule.graph
+
+        def execute(annealing_constant, temperature, input_multiplicative, *values):
+            nodes.custom.Sigmoid.set_annealing_constant(annealing_constant)
+            nodes.types.String.set_temperature(temperature)
+            schedule.run(list(values), input_multiplicative)
+            penalities = 0.0
+            for node in graph.values():
+                if node.node_penalty is not None:
+                    penalities += node.node_penalty
+            return graph[output_id].controlFlowMultiplicative, torch.as_tensor(penalities)
+
+        # the first execution of a schedule can differ from the following ones
+        if schedule.runs == 0:
+            schedule.run(input_values)
+
+        annealing_constant = nodes.custom.Sigmoid.get_annealing_constant()
+        temperature = nodes.types.String.temperature
+        example_inputs = (torch.tensor(float(annealing_constant)), torch.tensor(float(temperature)),
+                          torch.tensor(1.0, requires_grad=True), *input_values)
+        # constants that require a gradient (e.g. defaults for missing inputs) make the tracing fail
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always', torch.jit.TracerWarning)
+                function = torch.jit.trace(execute, example_inputs, check_trace=False)
+        except Exception:
+            return None
+        finally:
+            nodes.custom.Sigmoid.set_annealing_constant(annealing_constant)
+            nodes.types.String.set_temperature(temperature)
+
+        # a tracer warning means that python code depended on a value, the trace would only be valid for it. Tensors
+        # created from python numbers (e.g. of constant nodes) are constants in every run, a tensor created from a
+        # traced value has already caused a warning about its conversion to a python number.
+        if any(issubclass(warning.category, torch.jit.TracerWarning)
+               and 'registered as constants' not in str(warning.message) for warning in caught):
+            return None
+        return CompiledGraph(function, graph, schedule)
+
+    def __call__(self, input_values):
+        """
+        Execute the compiled graph with the current annealing constant and temperature
+
+        :param input_values: values of the input nodes, in the order of the sorted input ids
+        :return: (controlFlowMultiplicative of the target node, sum of the node penalties)
+        """
+        return self.function(torch.tensor(float(nodes.custom.Sigmoid.get_annealing_constant())),
+                             torch.tensor(float(nodes.types.String.temperature)),
+                             torch.tensor(1.0, requires_grad=True), *input_values)
+
+    def sync_nodes(self, input_values):
+        """
+        Execute the schedule once, so that the node objects hold the values of the given inputs again
+        """
+        self.schedule.run(input_values)
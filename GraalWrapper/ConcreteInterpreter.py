@@ -0,0 +1,55 @@
+import torch
+import nodes
+
+
+class ConcreteInterpreter:
+    """
+    Executes a schedule with concrete input values instead of the relaxed ones of the optimization.
+
+    Comparisons become hard decisions, so the controlFlowMultiplicative of every node is 0 or 1, and no autograd graph
+    is recorded. The arithmetic nodes with an int or long stamp compute like Java: divisions and remainders round
+    towards zero, results overflow to the bit width of their type and IntegerBelowNode compares unsigned (see
+    MathFunctions.java_integer). This tells whether the rounded inputs of a try reach the target without running the
+    test in the JVM.
+    The concrete mode is set for the executing thread only.
+    """
+
+    def __init__(self, schedule, output_id):
+        self.schedule = schedule
+        self.output_id = output_id
+
+    def run(self, input_values):
+        """
+        Execute the graph once with concrete values
+
+        :param input_values: concrete values of the input nodes, in the order of the sorted input ids
+        :return: controlFlowMultiplicative of the target node
+        """
+        # the concrete execution must not change the state of the try: penalties add up over its iterations and the
+        # frozen nodes keep their relaxed outputs
+        penalties = [node.node_penalty for node in self.schedule.nodes]
+        frozen = [(node, node.output, node.controlFlowMultiplicative) for node in self.schedule.frozen]
+        runs, captured = self.schedule.runs, self.schedule.captured
+        concrete = nodes.custom.Sigmoid.is_concrete()
+        nodes.custom.Sigmoid.set_concrete(True)
+        # the frozen nodes are computed concretely as well, e.g. an overflow of constants
+        self.schedule.captured = False
+        try:
+            with torch.no_grad():
+                self.schedule.run(input_values)
+        finally:
+            nodes.custom.Sigmoid.set_concrete(concrete)
+            for node, penalty in zip(self.schedule.nodes, penalties):
+                node.node_penalty = penalty
+            for node, output, controlFlowMultiplicative in frozen:
+                node.output = output
+                node.controlFlowMultiplicative = controlFlowMultiplicative
+            self.schedule.runs, self.schedule.captured = runs, captured
+        return self.schedule.graph[self.output_id].controlFlowMultiplicative
+
+    def reaches_target(self, input_values):
+        """
+        :param input_values: concrete values of the input nodes, in the order of the sorted input ids
+        :return: whether the execution reaches the target node
+        """
+        return bool(torch.all(torch.as_tensor(self.run(input_values)) > 0.5))
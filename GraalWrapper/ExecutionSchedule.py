@@ -0,0 +1,363 @@
+import torch
+import nodes
+
+OP_EXEC = 0
+OP_DELIVER = 1
+OP_INPUT = 2
+OP_FORWARD = 3 # delivers the output of a source to a child of the skipped pass-through nodes behind it
+OP_EXEC_BATCH = 4 # executes several nodes of a batchable class at once
+
+
+class ExecutionSchedule:
+    """
+    Flat execution order of a built graph.
+
+    The push based execution (add_input -> exec -> set_output) only depends on the structure of the graph and not on
+    the values that are passed around. Hence, the order in which nodes are executed and inputs are delivered is
+    recorded once by a dry run of the push protocol and afterward replayed in a loop without any readiness checks or
+    recursion.
+
+    If the observed output nodes are known, the recorded operations are simplified. Deliveries that no later operation
+    reads are dropped, equal pure nodes with the same inputs are executed only once (common subexpression elimination)
+    and pass-through nodes (see BaseNode.passthrough_input) are skipped by delivering their input directly to their
+    children.
+
+    A batched schedule orders the operations by dependency level and executes the nodes of a batchable class (see
+    BaseNode.batchable) within a level together.
+
+    Foldable nodes that only depend on constants are evaluated by the first runs of a try and frozen afterward. The
+    following runs replay the folded operations, which only deliver their frozen outputs to the input dependent nodes.
+    """
+
+    def __init__(self, graph, input_ids, output_ids=None, batched=False):
+        """
+        :param graph: the built graph
+        :param input_ids: ids of the nodes whose values are set from outside
+        :param output_ids: ids of the nodes whose state is read after a run, None if any node can be read
+        :param batched: execute the nodes of batchable classes in batches
+        """
+        self.graph = graph
+        self.input_ids = sorted(input_ids)
+        self.nodes = list(graph.values())
+        self.observed = None if output_ids is None else {graph[output_id] for output_id in output_ids}
+
+        # Nodes like the FrameState change their trigger condition during the first execution, so the first
+        # iteration can differ from all following ones
+        self.first_ops = self.record()
+        self.ops = self.record()
+        if self.ops == self.first_ops:
+            self.first_ops = self.ops
+        if self.observed is not None:
+            self.first_ops = self.simplify(self.first_ops)
+            self.ops = self.simplify(self.ops)
+        self.frozen = self.get_frozen_nodes()
+        self.folded_ops = [op for op in self.ops
+                           if not (op[0] == OP_EXEC and op[1] in self.frozen
+                                   or op[0] in (OP_DELIVER, OP_FORWARD) and op[1] in self.frozen and op[3] in self.frozen)]
+        # nodes that the folded operations change, all others keep their state
+        changed = {op[1] if op[0] in (OP_EXEC, OP_INPUT) else op[3] for op in self.folded_ops}
+        self.active_nodes = [node for node in self.nodes if node in changed]
+        if batched:
+            self.first_ops = self.ops if self.first_ops is self.ops else self.batch_executions(self.first_ops)
+            self.ops = self.batch_executions(self.ops)
+            self.folded_ops = self.batch_executions(self.folded_ops)
+        self.runs = 0
+        self.captured = False
+
+    def reset(self):
+        """
+        Reset the state of all nodes, the next run behaves like the first run of a newly built graph
+        """
+        self.runs = 0
+        self.captured = False
+        for node in self.nodes:
+            node.reset_state()
+
+    def record(self):
+        """
+        Dry run of one iteration of the push protocol
+
+        :return: list of operations
+        """
+        ops = []
+        received = {node: set() for node in self.nodes}
+
+        # Don't let the start node auto-trigger
+        for input_id in self.input_ids:
+            self.graph[input_id].desired_inputs = -1
+
+        # trigger all constant values to pass on values
+        for node in self.nodes:
+            if node.node['id'] in self.input_ids:
+                continue
+            if node.triggers_without_inputs():
+                ops.append((OP_EXEC, node))
+                self.record_outputs(node, ops, received)
+
+        # set the input of the start node, thus, triggering the overall execution
+        for idx, input_id in enumerate(self.input_ids):
+            ops.append((OP_INPUT, self.graph[input_id], idx))
+            self.record_outputs(self.graph[input_id], ops, received)
+
+        return ops
+
+    def get_frozen_nodes(self):
+        """
+        Nodes that are executed before the first input is set and only receive values of other frozen nodes
+
+        :return: set of nodes whose outputs are the same in every run of a try
+        """
+        producers = {node: [] for node in self.nodes}
+        for op in self.ops:
+            if op[0] in (OP_DELIVER, OP_FORWARD):
+                producers[op[3]].append(op[1])
+
+        frozen = set()
+        for op in self.ops:
+            if op[0] == OP_INPUT:
+                break
+            if op[0] == OP_EXEC:
+                node = op[1]
+                if node.foldable and all(producer in frozen for producer in producers[node]):
+                    frozen.add(node)
+        return frozen
+
+    def simplify(self, ops):
+        """
+        :param ops: recorded operations
+        :return: operations that leave the observed nodes in the same state
+        """
+        ops = self.merge_equal_nodes(self.drop_unread_deliveries(ops))
+        # the inputs of the merged nodes aren't read anymore
+        return self.skip_passthrough(self.drop_unread_deliveries(ops))
+
+    def drop_unread_deliveries(self, ops):
+        """
+        Remove deliveries to nodes that aren't observed and neither execute nor pass on a value afterward
+
+        :param ops: recorded operations
+        :return: operations without the unread deliveries
+        """
+        last_read = {}
+        for idx, op in enumerate(ops):
+            if op[0] != OP_INPUT:
+                last_read[op[1]] = idx
+        return [op for idx, op in enumerate(ops)
+                if op[0] != OP_DELIVER or op[3] in self.observed
+                or last_read.get(op[3], -1) > idx]
+
+    def merge_equal_nodes(self, ops):
+        """
+        Execute only the first of several pure nodes of the same class and props that receive the same inputs
+
+        The children of the other nodes receive the output of the first one instead. Inlined callees and bounds checks
+        often repeat the same constants and comparisons, which are then evaluated once per run. The first node is only
+        used if its state doesn't change after the other one would have been executed.
+
+        :param ops: recorded operations
+        :return: operations without the executions of the merged nodes
+        """
+        executions = {}
+        last_change = {}
+        for idx, op in enumerate(ops):
+            node = op[3] if op[0] == OP_DELIVER else op[1]
+            if op[0] == OP_EXEC:
+                executions[node] = executions.get(node, 0) + 1
+            last_change[node] = idx
+
+        # merged node -> node that is executed instead
+        merged = {}
+        inputs = {node: set() for node in self.nodes}
+        first_nodes = {}
+        result = []
+        for idx, op in enumerate(ops):
+            if op[0] == OP_DELIVER:
+                _, src, edge, dest, slot = op
+                src = merged.get(src, src)
+                # the pure nodes use the default get_output_for, which doesn't depend on the edge
+                op = (OP_DELIVER, src, edge, dest, slot)
+                inputs[dest].add((slot, edge, src))
+            elif op[0] == OP_EXEC:
+                node = op[1]
+                if node.pure and executions[node] == 1 and last_change[node] == idx:
+                    props = node.node['props']
+                    key = (type(node), tuple(repr(props.get(name)) for name in node.key_props),
+                           frozenset(inputs[node]))
+                    first = first_nodes.setdefault(key, node)
+                    if first is not node and node not in self.observed and last_change[first] < idx:
+                        merged[node] = first
+                        continue
+            result.append(op)
+        return result
+
+    def skip_passthrough(self, ops):
+        """
+        Deliver the input of pass-through nodes directly to their children instead of executing them
+
+        The children receive the value (or the controlFlowMultiplicative) that the pass-through node would have passed
+        on, since the node takes the minimum of its own controlFlowMultiplicative of 1 and the one of its input.
+        A chain of pass-through nodes is skipped at once. The source is only read later than before if its state
+        doesn't change in between.
+
+        :param ops: recorded operations
+        :return: operations without the skipped nodes
+        """
+        deliveries = {}
+        executions = {}
+        last_change = {}
+        for idx, op in enumerate(ops):
+            if op[0] == OP_DELIVER:
+                deliveries.setdefault(op[3], []).append(idx)
+                last_change[op[3]] = idx
+            else:
+                if op[0] == OP_EXEC:
+                    executions.setdefault(op[1], []).append(idx)
+                last_change[op[1]] = idx
+
+        def can_skip(node, slot):
+            return (node not in self.observed and node.passthrough_input in ('*', slot)
+                    and len(deliveries.get(node, ())) == 1 and len(executions.get(node, ())) == 1
+                    and deliveries[node][0] < executions[node][0])
+
+        # skipped node -> (source, edge of the source, passes on the controlFlowMultiplicative, index of the first
+        # delivery of the chain)
+        forwarded = {}
+        result = []
+        for idx, op in enumerate(ops):
+            if op[0] == OP_EXEC and op[1] in forwarded:
+                continue
+            if op[0] == OP_DELIVER:
+                _, src, edge, dest, slot = op
+                src_edge, control_flow, first = edge, False, idx
+                if src in forwarded:
+                    src, src_edge, control_flow, first = forwarded[src]
+                if can_skip(dest, slot) and last_change[src] < first:
+                    forwarded[dest] = (src, src_edge, control_flow or dest.passthrough_control_flow, first)
+                    continue
+                if src is not op[1]:
+                    op = (OP_FORWARD, src, src_edge, dest, slot, edge, control_flow)
+            result.append(op)
+        return result
+
+    @staticmethod
+    def batch_executions(ops):
+        """
+        Reorder the operations by dependency level and execute the batchable nodes of a class in a level together
+
+        Two operations depend on each other if they access the same node and one of them changes it, i.e. executes it,
+        delivers to it or sets its input. The level of an operation is the length of the longest chain of such
+        dependencies before it, so the operations of a level are independent of each other and their order within the
+        level doesn't matter. The deliveries to a node keep their order, hence the inputs of every node are the same.
+        Executions of nodes that aren't pure keep their order as well, since they can draw random numbers.
+
+        :param ops: recorded operations
+        :return: operations ordered by level, with batch executions
+        """
+        random_state = object() # accessed by the executions of all nodes that aren't pure
+        last_change = {} # node -> level of the last operation that changed it
+        last_read = {} # node -> highest level of the operations that read it since then
+        levels = []
+        for op in ops:
+            if op[0] in (OP_DELIVER, OP_FORWARD):
+                read, changed = [op[1]], [op[3]]
+            elif op[0] == OP_EXEC and not op[1].pure:
+                read, changed = [], [op[1], random_state]
+            else:
+                read, changed = [], [op[1]]
+            level = max([last_change.get(node, -1) + 1 for node in read + changed]
+                        + [last_read.get(node, -1) + 1 for node in changed])
+            for node in read:
+                last_read[node] = max(last_read.get(node, -1), level)
+            for node in changed:
+                last_change[node] = level
+                last_read.pop(node, None)
+            levels.append(level)
+
+        result = []
+        batches = {} # (level, class) -> batch
+        for idx in sorted(range(len(ops)), key=lambda i: (levels[i], i)):
+            op = ops[idx]
+            if op[0] == OP_EXEC and op[1].batchable:
+                key = (levels[idx], type(op[1]))
+                if key in batches:
+                    batches[key].append(op[1])
+                    continue
+                batches[key] = [op[1]]
+                op = (OP_EXEC_BATCH, type(op[1]), batches[key])
+            result.append(op)
+
+        return [(OP_EXEC, op[2][0]) if op[0] == OP_EXEC_BATCH and len(op[2]) == 1 else op for op in result]
+
+    def capture(self):
+        """
+        Keep the outputs of the frozen nodes of the last run, detached from the autograd graph of that run
+        """
+        for node in self.frozen:
+            if isinstance(node.output, torch.Tensor):
+                node.output = node.output.detach()
+            if isinstance(node.node_penalty, torch.Tensor):
+                node.node_penalty = node.node_penalty.detach()
+            node.controlFlowMultiplicative = node.controlFlowMultiplicative.detach()
+        self.captured = True
+
+    @staticmethod
+    def record_outputs(node, ops, received):
+        # depth first like the recursive add_input calls, but with an explicit stack
+        stack = [(node, iter(node.get_output_edges()))]
+        while stack:
+            src, edges = stack[-1]
+            for edge, child in edges:
+                if child not in received:
+                    continue # outside of the scheduled graph, e.g. of a slice (see GraphBuilder.get_slice)
+                slot = nodes.BaseNode.get_input_slot(received[child], edge)
+                received[child].add(slot)
+                ops.append((OP_DELIVER, src, edge, child, slot))
+                if len(received[child]) == child.desired_inputs:
+                    ops.append((OP_EXEC, child))
+                    stack.append((child, iter(child.get_output_edges())))
+                    break
+            else:
+                stack.pop()
+
+    def run(self, input_values, input_multiplicative=None):
+        """
+        Execute the graph once
+
+        :param input_values: values of the input nodes, in the order of the sorted input ids
+        :param input_multiplicative: controlFlowMultiplicative of the input nodes, a new tensor(1.0) by default
+        """
+        if self.captured:
+            ops, reset_nodes = self.folded_ops, self.active_nodes
+        else:
+            ops, reset_nodes = (self.first_ops if self.runs == 0 else self.ops), self.nodes
+        self.runs += 1
+
+        for node in reset_nodes:
+            node.reset_inputs()
+
+        for op in ops:
+            kind = op[0]
+            if kind == OP_DELIVER:
+                _, src, edge, dest, slot = op
+                value, controlFlowMultiplicative = src.get_output_for(edge)
+                dest.receive_input(value, slot, edge, controlFlowMultiplicative)
+            elif kind == OP_EXEC:
+                op[1].run_exec()
+            elif kind == OP_EXEC_BATCH:
+                op[1].exec_batch(op[2])
+            elif kind == OP_FORWARD:
+                _, src, src_edge, dest, slot, edge, control_flow = op
+                value, controlFlowMultiplicative = src.get_output_for(src_edge)
+                dest.receive_input(controlFlowMultiplicative if control_flow else value, slot, edge,
+                                   controlFlowMultiplicative)
+            else:
+                _, node, idx = op
+                node.controlFlowMultiplicative = input_multiplicative if input_multiplicative is not None \
+                    else torch.tensor(1.0, requires_grad=True)
+                node.output = input_values[idx]
+                node.executed = True
+
+        # the first run can differ from the following ones, the frozen values are taken from a steady run. A traced
+        # run must record the frozen nodes as well, so they are not captured from it.
+        if self.frozen and self.runs > 1 and not self.captured and not torch.jit.is_tracing():
+            self.capture()
@@ -0,0 +1,370 @@
+import contextlib
+import copy
+import copyreg
+import gc
+import hashlib
+import io
+import os
+import pickle
+import time
+
+import torch
+
+import nodes
+import GraalWrapper
+
+ARTIFACT_SUFFIX = '.artifact'
+ARTIFACT_VERSION = b'5'
+# environment variable that enables the artifacts, its value is their directory (the default one if it's empty)
+ARTIFACT_DIR_VARIABLE = 'DASA_ARTIFACT_DIR'
+# in the cache directory of the user, run_dasa.sh recreates the SUT directory for every analysis
+ARTIFACT_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                            'dasa', 'artifacts')
+# size of the artifact directory in bytes, the least recently used artifacts are removed beyond it
+ARTIFACT_SIZE_LIMIT = 1 << 30
+# temporary files of a save that didn't finish within this many seconds were left by a process that died
+STALE_TMP_SECONDS = 3600
+
+# the code that builds and schedules the graphs, an artifact of an older version is never loaded
+SOURCE_DIRS = [os.path.dirname(os.path.abspath(nodes.__file__)), os.path.dirname(os.path.abspath(__file__))]
+code_version = None
+
+# hashes of the json files read by this process, keyed by (path, size, modification time)
+file_hashes = {}
+
+
+@contextlib.contextmanager
+def paused_gc():
+    # the many containers of a graph would trigger collections that scan the whole graph again and again
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def rebuild_scalar(value, dtype, requires_grad):
+    return torch.tensor(value, dtype=dtype, requires_grad=requires_grad)
+
+
+class NodePickler(pickle.Pickler):
+    """
+    Pickles nodes without their state, which is pickled separately.
+
+    The nodes reference their children, so pickling a node together with its state recurses along the paths of the
+    graph and exceeds the recursion limit for long paths. Scalar tensors, e.g. the controlFlowMultiplicative of every
+    node, are pickled as numbers, since unpickling a tensor takes far longer than creating it.
+    """
+
+    def reducer_override(self, obj):
+        if isinstance(obj, nodes.BaseNode):
+            return copyreg.__newobj__, (type(obj),)
+        if type(obj) is torch.Tensor and obj.dim() == 0 and obj.is_leaf:
+            return rebuild_scalar, (obj.item(), obj.dtype, obj.requires_grad)
+        return NotImplemented
+
+
+class SchedulePickler(NodePickler):
+    """
+    Pickles the schedule records that are appended to an artifact, the nodes are referenced by their position in the
+    node list of the artifact.
+    """
+
+    def __init__(self, file, positions):
+        """
+        :param positions: id of every node -> its position in the node list
+        """
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.positions = positions
+
+    def persistent_id(self, obj):
+        if isinstance(obj, nodes.BaseNode):
+            return self.positions[id(obj)]
+        return None
+
+
+class ScheduleUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, node_list):
+        super().__init__(file)
+        self.node_list = node_list
+
+    def persistent_load(self, pid):
+        return self.node_list[pid]
+
+
+class GraphArtifact:
+    """
+    Built graphs that are reused across runs.
+
+    After a GraphBuilder built its graph, the graph and the json graph are pickled into an artifact file. Every
+    execution schedule that the builder or one of its slices (see GraphBuilder.get_slice) records afterward is appended
+    to the file as a record of its own. The next build of the same graph loads the artifact instead, e.g. when the same
+    SUT is analyzed again. The file is named by the hash of the code version, the json text of the root graph, the
+    start and end node and the global state the build depends on (the id blocks of the IdNamespace). It starts with
+    the hashes of the inlined method files, so it's rebuilt as soon as one of them changes. Once the directory exceeds
+    the size limit, the least recently used artifacts are removed.
+
+    Artifacts are disabled by default. They are enabled by the environment variable DASA_ARTIFACT_DIR or by
+    main(..., artifact_dir=...). Loading an artifact unpickles it, so artifacts are only loaded from and written to a
+    directory that belongs to the current user and that nobody else can write to.
+    """
+    enabled = ARTIFACT_DIR_VARIABLE in os.environ
+    directory = os.environ.get(ARTIFACT_DIR_VARIABLE) or ARTIFACT_DIR
+    size_limit = ARTIFACT_SIZE_LIMIT
+
+    @staticmethod
+    def set_enabled(enabled):
+        GraphArtifact.enabled = enabled
+
+    @staticmethod
+    def is_private(stat):
+        """
+        :param stat: os.stat_result of the artifact directory or an artifact
+        :return: whether it belongs to the current user and only the user can write to it
+        """
+        if hasattr(os, 'getuid') and stat.st_uid != os.getuid():
+            return False
+        return not stat.st_mode & (0o020 | 0o002)
+
+    @staticmethod
+    def set_directory(directory):
+        GraphArtifact.directory = directory
+
+    @staticmethod
+    def set_size_limit(size_limit):
+        GraphArtifact.size_limit = size_limit
+
+    @staticmethod
+    def get_code_version():
+        global code_version
+        if code_version is None:
+            digest = hashlib.sha256(ARTIFACT_VERSION)
+            for source_dir in SOURCE_DIRS:
+                for directory, dir_names, file_names in os.walk(source_dir):
+                    dir_names.sort()
+                    for file_name in sorted(file_names):
+                        if file_name.endswith('.py'):
+                            path = os.path.join(directory, file_name)
+                            digest.update(os.path.relpath(path, source_dir).encode())
+                            with open(path, 'rb') as file:
+                                digest.update(file.read())
+            code_version = digest.hexdigest()
+        return code_version
+
+    @staticmethod
+    def get_file_hash(graph_json_file):
+        """
+        :param graph_json_file: path of a json file
+        :return: hash of the json text of its first graph, the only one that is read
+        """
+        stat = os.stat(graph_json_file)
+        key = (os.path.abspath(graph_json_file), stat.st_size, stat.st_mtime_ns)
+        if key not in file_hashes:
+            data = GraalWrapper.GraphCache.read_first_graph(graph_json_file)
+            file_hashes[key] = hashlib.sha256(data.encode()).hexdigest()
+        return file_hashes[key]
+
+    @staticmethod
+    def get_key(graph_builder, start_node, end_node):
+        """
+        :return: hash of everything that a build of the graph depends on, except for the inlined method files
+        """
+        state = (GraphArtifact.get_code_version(), GraphArtifact.get_file_hash(graph_builder.graph_json_file),
+                 start_node, end_node, graph_builder.namespace.get_state())
+        return hashlib.sha256(repr(state).encode()).hexdigest()
+
+    @staticmethod
+    def get_path(key):
+        return os.path.join(GraphArtifact.directory, key + ARTIFACT_SUFFIX)
+
+    @staticmethod
+    def get_header(key):
+        return ARTIFACT_VERSION + b' ' + key.encode() + b'\n'
+
+    @staticmethod
+    def get_node_state(node):
+        # the state as after reset_state, without the values of earlier runs, e.g. the random logits of String inputs
+        node = copy.copy(node)
+        node.reset_state()
+        return node.__dict__
+
+    @staticmethod
+    def read_records(file, node_list):
+        """
+        :return: the schedule records that were appended to the artifact, up to the first incomplete one
+        """
+        records = []
+        while True:
+            try:
+                # every record is a pickle of its own with a new memo
+                records.append(ScheduleUnpickler(file, node_list).load())
+            except (EOFError, pickle.UnpicklingError):
+                # the end of the file or a record that another process is still appending
+                return records
+
+    @staticmethod
+    def load(graph_builder, start_node, end_node):
+        """
+        Restore the graph of a GraphBuilder from its artifact
+
+        The builder remembers the key, so that the following saves write the artifact that this call looked for.
+
+        :param graph_builder: GraphBuilder of a root graph
+        :return: whether the artifact exists and is up to date
+        """
+        graph_builder.artifact_key = None
+        graph_builder.artifact_build = None
+        if not GraphArtifact.enabled:
+            return False
+        try:
+            key = GraphArtifact.get_key(graph_builder, start_node, end_node)
+            graph_builder.artifact_key = key
+            header = GraphArtifact.get_header(key)
+            if not GraphArtifact.is_private(os.stat(GraphArtifact.directory)):
+                print(f"Graph artifacts are disabled: {GraphArtifact.directory} can be written by other users")
+                graph_builder.artifact_key = None
+                return False
+            with open(GraphArtifact.get_path(key), 'rb') as file:
+                if not GraphArtifact.is_private(os.fstat(file.fileno())) or file.read(len(header)) != header:
+                    return False
+                work_dir = os.path.dirname(graph_builder.graph_json_file)
+                files = pickle.load(file)
+                for graph_json_file, file_hash in files:
+                    if GraphArtifact.get_file_hash(os.path.join(work_dir, graph_json_file)) != file_hash:
+                        return False # outdated
+                with paused_gc():
+                    node_list, node_states, state = pickle.load(file)
+                    records = GraphArtifact.read_records(file, node_list)
+            os.utime(GraphArtifact.get_path(key)) # used recently, see prune
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False # e.g. missing or cut off, the graph is built again
+
+        for node, node_state in zip(node_list, node_states):
+            node.__dict__.update(node_state)
+        graph_builder.graph = state['graph']
+        graph_builder.json_graph = state['json_graph']
+        graph_builder.index = None
+        graph_builder.id_base, graph_builder.id_end = state['id_block']
+        graph_builder.schedules = {}
+        graph_builder.method_index = state['method_index']
+        graph_builder.built_inputs = state['built_inputs']
+        graph_builder.slices = {}
+        # the global state as if the graph was built, the slices take the call-site paths of the nodes from it
+        graph_builder.namespace.set_state(state['build']['namespace'])
+        for end_node, key, schedule in records:
+            view = graph_builder if end_node is None else graph_builder.get_slice(end_node)
+            # the schedules are keyed by the id of the graph, which changes with every load
+            schedule.graph = view.graph
+            view.schedules[(id(view.graph),) + key] = schedule
+        graph_builder.artifact_build = dict(state['build'], files=files, nodes=node_list)
+        return True
+
+    @staticmethod
+    def save(graph_builder):
+        """
+        Write the built graph of a GraphBuilder into the artifact that its last load looked for
+
+        Has to be called right after the build, before the next graph is built, since it takes the global state after
+        the build from the IdNamespace. The schedules are appended by add_schedule afterward.
+        """
+        if graph_builder.artifact_key is None:
+            return
+        work_dir = os.path.dirname(graph_builder.graph_json_file)
+        path = GraphArtifact.get_path(graph_builder.artifact_key)
+        tmp_file = f"{path}.{os.getpid()}.tmp"
+        try:
+            # the method files that were loaded while building the graph, besides the root graph itself
+            files = [(os.path.relpath(graph_json_file, work_dir or os.curdir),
+                      GraphArtifact.get_file_hash(graph_json_file))
+                     for graph_json_file in GraalWrapper.MethodRegister.get_loaded_files()
+                     if graph_json_file != graph_builder.graph_json_file]
+            graph = graph_builder.graph
+            node_list = list(graph.values())
+            state = {'graph': graph,
+                     'json_graph': graph_builder.json_graph,
+                     'id_block': (graph_builder.id_base, graph_builder.id_end),
+                     'method_index': graph_builder.method_index,
+                     'built_inputs': graph_builder.built_inputs,
+                     'build': {'namespace': graph_builder.namespace.get_state()}}
+
+            # write to a temporary file first, so that a concurrent load never sees a partially written artifact
+            os.makedirs(GraphArtifact.directory, mode=0o700, exist_ok=True)
+            if not GraphArtifact.is_private(os.stat(GraphArtifact.directory)):
+                return
+            with open(tmp_file, 'wb') as file, paused_gc():
+                file.write(GraphArtifact.get_header(graph_builder.artifact_key))
+                pickle.dump(files, file, protocol=pickle.HIGHEST_PROTOCOL)
+                NodePickler(file, protocol=pickle.HIGHEST_PROTOCOL).dump(
+                    (node_list, [GraphArtifact.get_node_state(node) for node in node_list], state))
+            os.replace(tmp_file, path)
+            graph_builder.artifact_build = dict(state['build'], files=files, nodes=node_list)
+        except (OSError, pickle.PicklingError, TypeError, RuntimeError):
+            # e.g. a read-only directory, an object that can't be pickled (TypeError) or a node that holds a tensor of
+            # an autograd graph (RuntimeError of torch)
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+            return
+        GraphArtifact.prune(keep=path)
+
+    @staticmethod
+    def add_schedule(graph_builder, end_node, key, schedule):
+        """
+        Append a newly recorded schedule to the artifact of a GraphBuilder that was saved or loaded before
+
+        :param graph_builder: GraphBuilder of a root graph
+        :param end_node: end node of the slice that recorded the schedule, None for the built graph itself
+        :param key: key of the schedule without the id of the graph
+        """
+        build = graph_builder.artifact_build
+        if graph_builder.artifact_key is None or build is None:
+            return
+        if 'positions' not in build:
+            build['positions'] = {id(node): position for position, node in enumerate(build['nodes'])}
+        data = io.BytesIO()
+        try:
+            with paused_gc():
+                SchedulePickler(data, build['positions']).dump((end_node, key, schedule))
+            # a single write, so that the records of concurrent processes don't interleave. The artifact isn't
+            # created if it was removed in the meantime.
+            fd = os.open(GraphArtifact.get_path(graph_builder.artifact_key), os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, data.getvalue())
+            finally:
+                os.close(fd)
+        except (OSError, pickle.PicklingError, TypeError, RuntimeError):
+            pass # e.g. a read-only directory, the schedule is recorded again by the next run
+
+    @staticmethod
+    def prune(keep=None):
+        """
+        Remove the least recently used artifacts until the directory fits the size limit, and the temporary files
+        that processes which died left behind
+
+        :param keep: path of an artifact that is never removed
+        """
+        try:
+            entries = []
+            for entry in os.scandir(GraphArtifact.directory):
+                stat = entry.stat()
+                if entry.name.endswith(ARTIFACT_SUFFIX):
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                elif entry.name.endswith('.tmp') and time.time() - stat.st_mtime > STALE_TMP_SECONDS:
+                    os.remove(entry.path)
+        except OSError:
+            return
+        size = sum(entry[1] for entry in entries)
+        for _, file_size, path in sorted(entries):
+            if size <= GraphArtifact.size_limit:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                size -= file_size
+            except OSError:
+                pass
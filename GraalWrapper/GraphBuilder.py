@@ -1,6 +1,8 @@
-import json
+import copy
 import re
 import sys
+from collections import deque
+import torch
 import nodes
 from .InputNodeTypes import input_node_tuple, TYPE_CONV_INT, TYPE_CONV_FLOAT, TYPE_CONV_DEFAULT, TYPE_CONV_STRING, \
     string_input_node_tuple, TYPE_CONV_CHAR, TYPE_CONV_BOOL, TYPE_CONV_BYTE, TYPE_CONV_SHORT, TYPE_CONV_LONG
@@ -8,210 +10,150 @@ import GraalWrapper
 
 current_working_dir = ""
 
-
-def get_recursion_boundary_node(node_id, thousands_offset=0):
-    return (node_id // 1000 + thousands_offset) * 1000
+# Graal node classes whose implementation depends on the 'operation' prop
+MATH_INTRINSIC_NODE_CLASSES = {nodes.NodeRegistry.UNARY_MATH_INTRINSIC: 'Unary Math function',
+                               nodes.NodeRegistry.BINARY_MATH_INTRINSIC: 'Binary Math function'}
 
 
 class GraphBuilder:
-    def __init__(self, graph_json_file, work_dir=None, rec_list=None):
+    def __init__(self, graph_json_file, work_dir=None, call_path=(), namespace=None, inline_budget=None):
         global current_working_dir
         if work_dir is not None:
             current_working_dir = work_dir
         self.graph_json_file = current_working_dir + graph_json_file
         self.json_graph = None
+        self.index = None
         self.graph = None
-        self.rec_list = rec_list if rec_list is not None else []
+        self.schedules = {}
+        # local ids of the invoke nodes that lead to this method, empty for the root graph
+        self.call_path = tuple(call_path)
+        self.namespace = namespace if namespace is not None else \
+            GraalWrapper.IdNamespace.get_namespace(self.graph_json_file)
+        # inlining counts of the callees below the invoke node of the root graph that this method belongs to, every
+        # invoke node of the root graph starts a new one, so the callees of a node don't depend on the other nodes
+        self.inline_budget = inline_budget
+        # global ids of the nodes of this method are id_base <= id < id_end
+        self.id_base = None
+        self.id_end = None
         self.verbose = False
+        # key and build state of the GraphArtifact of the built graph
+        self.artifact_key = None
+        self.artifact_build = None
+        # index of the json graph of the method before any callee was inlined, get_slice walks it backward
+        self.method_index = None
+        # desired_inputs of every node after the build, recording a schedule changes them
+        self.built_inputs = None
+        # end node -> slice of the built graph, see get_slice
+        self.slices = {}
+        # builder of the full graph and end node if this one is a slice of it
+        self.base = None
+        self.slice_end_node = None
 
     def load_graph(self):
 
         if self.json_graph is not None:
             return self.json_graph
 
-        with open(self.graph_json_file, 'r') as file:
-            data = file.read()
-
-        # Split using regex
-        json_strings = re.split(r'}\n{', data)
-        orig_json_graph = json.loads(json_strings[0] + "}")
-        rec_offset = len(self.rec_list)
-        if rec_offset > 0:
-            adapted_json_graph = {}
-            for key in orig_json_graph:
-                if key == "nodes":
-                    adapted_json_graph[key] = []
-                    for node in orig_json_graph[key]:
-                        node['id'] += 1000 * rec_offset
-                        node['props']['id'] = node['id']
-                        adapted_json_graph[key].append(node)
-                elif key == "edges":
-                    adapted_json_graph[key] = []
-                    for node in orig_json_graph[key]:
-                        node['from'] += 1000 * rec_offset
-                        node['to'] += 1000 * rec_offset
-                        adapted_json_graph[key].append(node)
-                else:
-                    adapted_json_graph[key] = orig_json_graph[key]
-            self.json_graph = adapted_json_graph
-        else:
-            self.json_graph = orig_json_graph
+        # the local ids of the method are shifted into the block of its call-site path
+        template = GraalWrapper.MethodRegister.get_template(self.graph_json_file)
+        local_ids = [node['id'] for node in template.get('nodes', [])]
+        local_ids.extend(edge[key] for edge in template.get('edges', []) for key in ['from', 'to'])
+        size = max(local_ids, default=-1) + 1
+        self.id_base = self.namespace.get_block(self.call_path, size)
+        self.id_end = self.id_base + size
+        self.json_graph = GraalWrapper.MethodRegister.clone_template(self.graph_json_file, self.id_base)
+        self.index = None
         return self.json_graph
 
+    def owns(self, node_id):
+        """
+        :return: whether the node belongs to this method and not to an inlined callee
+        """
+        return self.id_base <= node_id < self.id_end
+
+    def get_callee_path(self, node_id):
+        """
+        :return: call-site path of the callee that was inlined into this method and contains the node, None for nodes
+            of this method
+        """
+        if self.owns(node_id):
+            return None
+        call_path = self.namespace.get_call_path(node_id)
+        if call_path is None or len(call_path) <= len(self.call_path):
+            return None
+        return call_path[:len(self.call_path) + 1]
+
+    def get_index(self):
+        """
+        Adjacency index of the json graph, rebuilt after the json graph was changed
+
+        :return: GraphIndex
+        """
+        if self.index is None:
+            self.index = GraalWrapper.GraphIndex(self.json_graph)
+        return self.index
+
 
     def do_backward_slicing(self, graph, end_node):
+        index = self.get_index() if graph is self.json_graph else GraalWrapper.GraphIndex(graph)
+        return self.get_ancestors(index, end_node)
+
+    @staticmethod
+    def get_ancestors(index, end_node):
         # do a BFS to infer all nodes that are connected to the end node
-        curr_node = end_node
-        visited = set()
-        queue = [curr_node]
+        visited = {end_node}
+        queue = deque([end_node])
         while queue:
-            curr_node = queue.pop(0)
-            visited.add(curr_node)
-            for edge in graph['edges']:
-                if edge['to'] == curr_node:
-                    if edge['from'] not in visited:
-                        queue.append(edge['from'])
+            curr_node = queue.popleft()
+            for edge in index.get_incoming(curr_node):
+                if edge['from'] not in visited:
+                    visited.add(edge['from'])
+                    queue.append(edge['from'])
 
         return visited
 
     def build(self, start_node, end_node):
 
+        self.schedules = {}
+        self.slices = {}
         graph = self.load_graph()
+        self.method_index = self.get_index()
         allowed_nodes = None
-        if 0 <= end_node <= 1000: #only do backwards slicing if the end_node is not inside a called function
+        if self.owns(end_node): #only do backwards slicing if the end_node is not inside a called function
             allowed_nodes = self.do_backward_slicing(graph, end_node)
         new_graph = {}
         unknown_nodes = []
         for node in graph['nodes']:
             if allowed_nodes is not None and end_node >= 0 and node['id'] not in allowed_nodes:
                 continue
-            if node['id'] >= get_recursion_boundary_node(start_node, 1):
-                continue
+            if not self.owns(node['id']):
+                continue # nodes of inlined callees are built by their own builder
             node_class = node['props']['node_class']['node_class']
 
-            if node_class == 'jdk.graal.compiler.nodes.calc.AddNode':
-                new_graph[node['id']] = nodes.calc.AddNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.ConstantNode':
-                new_graph[node['id']] = nodes.ConstantNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.IntegerLessThanNode':
-                new_graph[node['id']] = nodes.calc.IntegerLessThanNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.FloatLessThanNode':
-                new_graph[node['id']] = nodes.calc.FloatLessThanNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.ConditionalNode':
-                new_graph[node['id']] = nodes.calc.ConditionalNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.ValuePhiNode':
-                new_graph[node['id']] = nodes.ValuePhiNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.IntegerEqualsNode':
-                new_graph[node['id']] = nodes.calc.IntegerEqualsNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.FloatEqualsNode':
-                new_graph[node['id']] = nodes.calc.FloatEqualsNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.IfNode':
-                new_graph[node['id']] = nodes.IfNode(node)
-            elif node_class in ['jdk.graal.compiler.nodes.InvokeNode',
-                                'jdk.graal.compiler.nodes.InvokeWithExceptionNode']:
+            if node_class in nodes.NodeRegistry.INVOKE_NODE_CLASSES:
+                node_type = nodes.NodeRegistry.get(node_class, node['props']['targetMethod'])
                 if re.match(r"FdLibm\$[A-Za-z0-9]+\.compute", node['props']['targetMethod']):
                     # Don't actually call a function, instead use the corresponding math function
                     new_graph[node['id']] = self.get_invoked_math_node(node)
-                elif node['props']['targetMethod'] == "String.charAt":
-                    new_graph[node['id']] = nodes.java.CharAtNode(node)
-                elif node['props']['targetMethod'] == "String.indexOf":
-                    new_graph[node['id']] = nodes.java.IndexOfNode(node)
+                elif node_type is not None:
+                    # methods that are implemented by a node
+                    new_graph[node['id']] = node_type(node)
                 else:
                     new_graph.update(self.inline_new_graph(node))
-            elif node_class == 'jdk.graal.compiler.nodes.MergeNode':
-                new_graph[node['id']] = nodes.MergeNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.BeginNode':
-                new_graph[node['id']] = nodes.BeginNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.EndNode':
-                new_graph[node['id']] = nodes.EndNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.LeftShiftNode':
-                new_graph[node['id']] = nodes.calc.LeftShiftNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.IntegerBelowNode':
-                new_graph[node['id']] = nodes.calc.IntegerBelowNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.FloatBelowNode':
-                new_graph[node['id']] = nodes.calc.FloatBelowNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.SubNode':
-                new_graph[node['id']] = nodes.calc.SubNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.MulNode':
-                new_graph[node['id']] = nodes.calc.MulNode(node)
-            elif node_class in ['jdk.graal.compiler.nodes.calc.SignedFloatingIntegerDivNode',
-                                'jdk.graal.compiler.nodes.calc.FloatDivNode']:
-                new_graph[node['id']] = nodes.calc.DivNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.SqrtNode':
-                new_graph[node['id']] = nodes.calc.SqrtNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.SignedFloatingIntegerRemNode':
-                new_graph[node['id']] = nodes.calc.ModNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.NegateNode':
-                new_graph[node['id']] = nodes.calc.NegateNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.StartNode':
-                new_graph[node['id']] = nodes.StartNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.ParameterNode':
-                new_graph[node['id']] = nodes.ParameterNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.ReturnNode':
-                new_graph[node['id']] = nodes.ReturnNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.virtual.VirtualInstanceNode':
-                new_graph[node['id']] = nodes.virtual.VirtualInstanceNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.virtual.CommitAllocationNode':
-                new_graph[node['id']] = nodes.virtual.CommitAllocationNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.virtual.AllocatedObjectNode':
-                new_graph[node['id']] = nodes.virtual.AllocatedObjectNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.java.LoadFieldNode':
-                new_graph[node['id']] = nodes.java.LoadFieldNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.FrameState':
-                new_graph[node['id']] = nodes.FrameState(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.ObjectEqualsNode':
-                new_graph[node['id']] = nodes.calc.ObjectEqualsNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.calc.IsNullNode':
-                new_graph[node['id']] = nodes.calc.IsNullNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.java.ArrayLengthNode':
-                new_graph[node['id']] = nodes.java.ArrayLengthNode(node)
-            elif node_class == 'jdk.graal.compiler.replacements.nodes.ArrayEqualsNode':
-                new_graph[node['id']] = nodes.java.ArrayEqualsNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.PiNode':
-                new_graph[node['id']] = nodes.PiNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.java.LoadIndexedNode':
-                new_graph[node['id']] = nodes.java.LoadIndexedNode(node)
-            elif node_class == 'com.oracle.svm.core.nodes.SubstrateMethodCallTargetNode':
-                new_graph[node['id']] = nodes.types.com.oracle.svm.core.nodes.SubstrateMethodCallTargetNode(node)
-            elif node_class == 'jdk.graal.compiler.nodes.FullInfopointNode':
-                new_graph[node['id']] = nodes.FullInfoPointNode(node)
-            elif node_class == 'jdk.graal.compiler.replacements.nodes.UnaryMathIntrinsicNode':
-                match node['props']['operation']:
-                    case 'SIN':
-                        new_graph[node['id']] = nodes.calc.SinNode(node)
-                    case 'COS':
-                        new_graph[node['id']] = nodes.calc.CosNode(node)
-                    case 'TAN':
-                        new_graph[node['id']] = nodes.calc.TanNode(node)
-                    case 'LOG':
-                        new_graph[node['id']] = nodes.calc.LogNode(node)
-                    case 'LOG10':
-                        new_graph[node['id']] = nodes.calc.Log10Node(node)
-                    case 'EXP':
-                        new_graph[node['id']] = nodes.calc.ExpNode(node)
-                    case _:
-                        print_orange = "\033[33m"
-                        print_normal = "\033[00m"
-                        if self.verbose and node_class not in unknown_nodes:
-                            unknown_nodes.append(node_class)
-                            print(f"{print_orange}Unknown Unary Math function {node['props']['operation']}\n"
-                                  f"using FallbackNode instead...{print_normal}")
-                        new_graph[node['id']] = nodes.FallbackNode(node)
-            elif node_class == 'jdk.graal.compiler.replacements.nodes.BinaryMathIntrinsicNode':
-                match node['props']['operation']:
-                    case 'POW':
-                        new_graph[node['id']] = nodes.calc.PowNode(node)
-                    case _:
-                        print_orange = "\033[33m"
-                        print_normal = "\033[00m"
-                        if self.verbose and node_class not in unknown_nodes:
-                            unknown_nodes.append(node_class)
-                            print(f"{print_orange}Unknown Binary Math function {node['props']['operation']}\n"
-                                  f"using FallbackNode instead...{print_normal}")
-                        new_graph[node['id']] = nodes.FallbackNode(node)
-            elif node_class in ['com.oracle.svm.core.graal.nodes.ThrowBytecodeExceptionNode',
-                                'jdk.graal.compiler.nodes.extended.BytecodeExceptionNode']:
-                new_graph[node['id']] = nodes.types.com.oracle.svm.core.graal.graal_nodes.ThrowBytecodeExceptionNode(node)
+            elif node_class in MATH_INTRINSIC_NODE_CLASSES:
+                node_type = nodes.NodeRegistry.get(node_class, node['props']['operation'])
+                if node_type is not None:
+                    new_graph[node['id']] = node_type(node)
+                else:
+                    print_orange = "\033[33m"
+                    print_normal = "\033[00m"
+                    if self.verbose and node_class not in unknown_nodes:
+                        unknown_nodes.append(node_class)
+                        print(f"{print_orange}Unknown {MATH_INTRINSIC_NODE_CLASSES[node_class]} "
+                              f"{node['props']['operation']}\nusing FallbackNode instead...{print_normal}")
+                    new_graph[node['id']] = nodes.FallbackNode(node)
+            elif (node_type := nodes.NodeRegistry.get(node_class)) is not None:
+                new_graph[node['id']] = node_type(node)
             else:
                 # default
                 if node['id'] == -1:
@@ -228,6 +170,7 @@ class GraphBuilder:
         self.graph = new_graph
 
         self.connect_nodes(start_node=start_node)
+        self.built_inputs = {node_id: node.desired_inputs for node_id, node in new_graph.items()}
 
         return new_graph
 
@@ -236,38 +179,42 @@ class GraphBuilder:
         # do a BFS to find all nodes that are connected to the start node
         # and all nodes that are connected to the end node
         if start_node != -1:
-            curr_node = start_node
+            index = self.get_index()
             visited = set()
-            queue = [curr_node]
+            walked = set()
+            # all nodes of these callees count as visited, they were already walked by the builder of the callee
+            skipped_callees = set()
+            queue = deque([start_node])
             # manually add all parameter nodes of the current layer (they don't have a parent yet)
             queue.extend(node[0] for node in self.graph.items()
-                         if get_recursion_boundary_node(start_node, 0) <= node[0]
-                         < get_recursion_boundary_node(start_node, 1)
-                         and isinstance(node[1], nodes.ParameterNode))
+                         if self.owns(node[0]) and isinstance(node[1], nodes.ParameterNode))
             while queue:
-                curr_node = queue.pop(0)
+                curr_node = queue.popleft()
+                if curr_node in walked:
+                    continue
+                walked.add(curr_node)
                 visited.add(curr_node)
-                for edge in self.json_graph['edges']:
-                    if edge['from'] == curr_node and edge['to'] not in visited:
-                        if edge['to'] // 1000 > curr_node // 1000:
+                for edge in index.get_outgoing(curr_node):
+                    callee_path = self.get_callee_path(edge['to'])
+                    if edge['to'] not in visited and callee_path not in skipped_callees:
+                        if callee_path is not None:
                             # we already walked this graph in another iteration and can skip it now
-                            visited.update([node['id'] for node in
-                                            self.json_graph['nodes'] if node['id'] >= edge['to']])
+                            skipped_callees.add(callee_path)
                         else:
                             queue.append(edge['to'])
 
             # delete all nodes that are not connected to the start node
             for node in list(self.graph.keys()):
                 # delete if not ConstantNode
-                if node not in visited and not isinstance(self.graph[node], nodes.ConstantNode):
+                if (node not in visited and self.get_callee_path(node) not in skipped_callees
+                        and not isinstance(self.graph[node], nodes.ConstantNode)):
                     del self.graph[node]
 
         for edge in self.json_graph['edges']:
 
-            # make sure that both nodes exist
+            # make sure that both nodes exist, edges inside of inlined callees were connected by their builder
             if (edge['from'] not in self.graph or edge['to'] not in self.graph or
-                    (edge['from'] >= get_recursion_boundary_node(start_node, 1) and
-                     edge['to'] >= get_recursion_boundary_node(start_node, 1))):
+                    (self.get_callee_path(edge['from']) is not None and self.get_callee_path(edge['to']) is not None)):
                 continue
 
             src = self.graph[edge['from']]
@@ -281,48 +228,30 @@ class GraphBuilder:
     def get_invoked_math_node(self, node):
         function_str = node['props']['targetMethod']
         function_str = function_str.split('$')[1].split('.')[0]
-        match function_str:
-            case 'Asin':
-                return nodes.calc.AsinNode(node)
-            case 'Acos':
-                return nodes.calc.AcosNode(node)
-            case 'Atan':
-                return nodes.calc.AtanNode(node)
-            case 'Atan2':
-                return nodes.calc.Atan2Node(node)
-            case 'Sin':
-                return nodes.calc.SinNode(node)
-            case 'Cos':
-                return nodes.calc.CosNode(node)
-            case 'Tan':
-                return nodes.calc.TanNode(node)
-            case 'Log':
-                return nodes.calc.LogNode(node)
-            case 'Log10':
-                return nodes.calc.Log10Node(node)
-            case 'Exp':
-                return nodes.calc.ExpNode(node)
-            case 'Pow':
-                return nodes.calc.PowNode(node)
-            case _:
-                if self.verbose:
-                    print_orange = "\033[33m"
-                    print_normal = "\033[00m"
-                    print(f"{print_orange}Unknown Invoked Math function {node['props']['targetMethod']}\n"
-                          f"Using InvokeNode instead...{print_normal}")
-                return nodes.InvokeNode(node)
+        node_type = nodes.NodeRegistry.get(nodes.NodeRegistry.FDLIBM, function_str)
+        if node_type is not None:
+            return node_type(node)
+        if self.verbose:
+            print_orange = "\033[33m"
+            print_normal = "\033[00m"
+            print(f"{print_orange}Unknown Invoked Math function {node['props']['targetMethod']}\n"
+                  f"Using InvokeNode instead...{print_normal}")
+        return nodes.InvokeNode(node)
 
 
     def inline_new_graph(self, node):
         inline_graph = {node['id']: nodes.InvokeNode(node)}
-        loaded_method = GraalWrapper.MethodRegister.get_method(node['props']['targetMethod'])
+        inline_budget = self.inline_budget if self.call_path else GraalWrapper.MethodRegister.new_budget()
+        loaded_method = GraalWrapper.MethodRegister.get_method(node['props']['targetMethod'], inline_budget)
         if not loaded_method:
             return inline_graph
-        rec_list = self.rec_list.copy()
-        rec_list.append(node['id'])
-        loaded_graph = GraphBuilder(loaded_method, rec_list=rec_list)
+        call_path = self.call_path + (node['id'] - self.id_base,)
+        loaded_graph = GraphBuilder(loaded_method, call_path=call_path, namespace=self.namespace,
+                                    inline_budget=inline_budget)
         try:
-            inline_graph.update(loaded_graph.get_graph(get_recursion_boundary_node(node['id'], 1), -1))
+            loaded_graph.load_graph()
+            # the start node of the callee is its node 0
+            inline_graph.update(loaded_graph.get_graph(loaded_graph.id_base, -1))
         except FileNotFoundError:
             print(f"Unknown method {node['props']['targetMethod']}")
             return inline_graph
@@ -332,12 +261,10 @@ class GraphBuilder:
                 return_targets.append(edge)
         for edge in return_targets:
             self.json_graph['edges'].remove(edge)
-        min_node_id = get_recursion_boundary_node(node['id'], 1) # Node 0 of highest layer of inlined graph
-        max_node_id = get_recursion_boundary_node(node['id'], 2) - 1 # Node 999 of highest layer of inlined graph
         self.json_graph['edges'].extend(loaded_graph.json_graph['edges'])
         self.json_graph['nodes'].extend(loaded_graph.json_graph['nodes'])
         for idx, child_node in inline_graph.items():
-            if not min_node_id <= idx <= max_node_id:
+            if not loaded_graph.owns(idx):
                 continue # only nodes in the highest layer need to be linked to the invoke node
             if isinstance(child_node, nodes.StartNode):
                 edge = {
@@ -369,48 +296,125 @@ class GraphBuilder:
                     edge['from'] = idx
                     self.json_graph['edges'].append(edge)
 
-        self.rec_list = loaded_graph.rec_list
+        self.index = None # edges and nodes changed
         return inline_graph
 
     def get_graph(self, start_node, end_node, reset=False, verbose=False):
         if self.graph is None or reset:
             self.verbose = verbose
-            self.build(start_node, end_node)
+            # callee graphs are part of the artifact of the root graph
+            if self.call_path or not GraalWrapper.GraphArtifact.load(self, start_node, end_node):
+                self.build(start_node, end_node)
+                GraalWrapper.GraphArtifact.save(self)
         return self.graph
 
+    def get_schedule(self, input_ids, graph=None, output_ids=None, batched=False):
+        """
+        Precompute the execution order of the built graph
+
+        The schedule is recorded once per graph, set of inputs and set of outputs. Every call resets the state of the
+        nodes, so a new try can reuse the graph instead of a copy of it. A new schedule is added to the GraphArtifact of
+        the graph.
+
+        :param input_ids: ids of the nodes whose values are set from outside
+        :param graph: the graph to schedule, defaults to the built graph
+        :param output_ids: ids of the nodes whose state is read after a run, None if any node can be read. Only the
+                           state of these nodes is guaranteed to be up to date after a run.
+        :param batched: execute the nodes of batchable classes in batches
+        :return: ExecutionSchedule
+        """
+        graph = self.graph if graph is None else graph
+        key = (id(graph), tuple(sorted(input_ids)), None if output_ids is None else tuple(sorted(output_ids)), batched)
+        recorded = key not in self.schedules or self.schedules[key].graph is not graph
+        if recorded:
+            if graph is self.graph:
+                # recording changes desired_inputs of the nodes (e.g. of the inputs) and the slices share them, so
+                # every schedule starts like after the build and doesn't depend on the schedules recorded before
+                built_inputs = (self if self.base is None else self.base).built_inputs
+                for node_id, node in graph.items():
+                    node.desired_inputs = built_inputs[node_id]
+            self.schedules[key] = GraalWrapper.ExecutionSchedule(graph, input_ids, output_ids, batched)
+        schedule = self.schedules[key]
+        schedule.reset()
+        if recorded and graph is self.graph:
+            if self.base is None:
+                GraalWrapper.GraphArtifact.add_schedule(self, None, key[1:], schedule)
+            else:
+                GraalWrapper.GraphArtifact.add_schedule(self.base, self.slice_end_node, key[1:], schedule)
+        return schedule
+
+    def get_slice(self, end_node):
+        """
+        View of the built graph with the nodes that a build for the end node would contain
+
+        A build for an end node of this method only keeps the nodes that reach it in the json graph of the method and
+        the callees of the kept invoke nodes. Instead of building the graph again for every end node, a slice takes
+        these nodes from a build for all end nodes (end node -1) with the same start node, using the index of the
+        method that the build kept. It shares the nodes, the json graph and the namespace with this builder and has
+        its own schedules. Since every invoke node of the root graph has its own limit of inlinings per method, a
+        slice has the same nodes as a build for its end node.
+
+        :param end_node: id of the end node
+        :return: GraphBuilder of the slice, the same one for every call with the same end node
+        """
+        if end_node not in self.slices:
+            graph = self.graph
+            if self.owns(end_node):
+                allowed_nodes = self.get_ancestors(self.method_index, end_node)
+                # the nodes of a callee belong to the invoke node that inlined it
+                graph = {node_id: node for node_id, node in graph.items()
+                         if (node_id if self.owns(node_id) else self.id_base + self.get_callee_path(node_id)[0])
+                         in allowed_nodes}
+            self.slices[end_node] = self.create_view(dict(graph), end_node)
+        return self.slices[end_node]
+
+    def create_view(self, graph, end_node):
+        """
+        :param graph: subset of the built graph
+        :param end_node: end node of the slice
+        :return: GraphBuilder of the subset that shares everything else with this builder
+        """
+        view = copy.copy(self)
+        view.graph = graph
+        view.schedules = {}
+        view.slices = {}
+        view.base = self
+        view.slice_end_node = end_node
+        view.artifact_key = None
+        view.artifact_build = None
+        return view
+
     def infer_string_length(self, string_invoke_node_id):
         if self.json_graph is None:
             self.load_graph()
 
         length_hints = []
         index_hints = []
+        index = self.get_index()
+        string_constants = [other_node['props'].get('rawvalue', '') for other_node in self.json_graph['nodes']
+                            if other_node['props'].get('node_class', {}).get('node_class')
+                            == 'jdk.graal.compiler.nodes.ConstantNode'
+                            and 'java.lang.String' in other_node['props'].get('stamp', '')]
 
         for node in self.json_graph['nodes']:
             node_props = node['props']
             if node_props.get('targetMethod') == "String.charAt":
-                for edge in self.json_graph.get('edges', []):
-                    if edge['to'] == node['id'] and edge.get('from') == string_invoke_node_id:
-                        length_hints.append(10)
-                        break
+                if any(edge.get('from') == string_invoke_node_id for edge in index.get_incoming(node['id'])):
+                    length_hints.append(10)
 
             if node_props.get('node_class', {}).get('node_class') == "jdk.graal.compiler.nodes.calc.ObjectEqualsNode":
-                from_ids = set()
-                for edge in self.json_graph.get('edges', []):
-                    if edge['to'] == node['id']:
-                        from_ids.add(edge['from'])
-                for other_node in self.json_graph['nodes']:
-                    if (other_node['props'].get('node_class', {}).get('node_class')
-                            == 'jdk.graal.compiler.nodes.ConstantNode' and other_node['id'] in from_ids):
-                        return len(other_node['props'].get('rawvalue', ''))
+                from_ids = set(edge['from'] for edge in index.get_incoming(node['id']))
+                constants = [other_node for from_id in from_ids for other_node in index.get_nodes(from_id)
+                             if other_node[1]['props'].get('node_class', {}).get('node_class')
+                             == 'jdk.graal.compiler.nodes.ConstantNode']
+                if constants:
+                    # the first one in the node list
+                    return len(min(constants, key=lambda other_node: other_node[0])[1]['props'].get('rawvalue', ''))
             # Check for contains/indexOf with constant string arguments
             if 'String.indexOf' in str(node_props.get('targetMethod', '')):
                 # Look for ConstantNode with string in the graph
-                for other_node in self.json_graph['nodes']:
-                    if other_node['props'].get('node_class', {}).get('node_class') == 'jdk.graal.compiler.nodes.ConstantNode':
-                        if 'java.lang.String' in other_node['props'].get('stamp', ''):
-                            raw_value = other_node['props'].get('rawvalue', '')
-                            # Need at least as long as the constant + buffer for matching
-                            index_hints.append(raw_value)
+                # Need at least as long as the constant + buffer for matching
+                index_hints.extend(string_constants)
 
         for i in range(len(index_hints)):
             i_str = index_hints[i]
@@ -470,7 +474,7 @@ class GraphBuilder:
 
         return start_nodes, end_nodes, constant_nodes
 
-    def reconstruct_path_through_graph(self, start_node, end_node):
+    def reconstruct_path_through_graph(self, start_node, end_node, batch_index=None):
         start_node = self.graph[start_node]
         end_node = self.graph[end_node]
         curr_node = start_node
@@ -482,17 +486,22 @@ class GraphBuilder:
                 visited.add(curr_node)
             if curr_node == end_node:
                 return [key for key, node in self.graph.items() if node in visited]
+            # a slice shares the nodes with the full graph, the children outside of it don't count
+            children = {edge: child for edge, child in curr_node.children.items() if child.node['id'] in self.graph}
             if type(curr_node) is nodes.IfNode:
-                if len(curr_node.children) == 1:
-                    queue.append(list(curr_node.children.values())[0])
-                elif curr_node.c >= 0.5:
-                    queue.append(curr_node.children['trueSuccessor'])
+                c = curr_node.c
+                if batch_index is not None and isinstance(c, torch.Tensor) and c.dim() > 0:
+                    c = c[batch_index] # decision of a single restart of a batched run
+                if len(children) == 1:
+                    queue.append(list(children.values())[0])
+                elif c >= 0.5:
+                    queue.append(children['trueSuccessor'])
                 else:
-                    queue.append(curr_node.children['falseSuccessor'])
+                    queue.append(children['falseSuccessor'])
             elif type(curr_node) is nodes.FrameState:
                 continue
             else:
-                for child in curr_node.children.values():
+                for child in children.values():
                     if child not in visited:
                         queue.append(child)
         return [key for key, node in self.graph.items() if node in visited]
\ No newline at end of file
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import pickle
+
+CACHE_SUFFIX = '.cache'
+CACHE_VERSION = b'2'
+
+# bgv2json writes one graph per compiler phase, separated by a newline
+GRAPH_SEPARATOR = '}\n{'
+CHUNK_SIZE = 1 << 16
+
+# node props that are never read by the builder or the nodes, dropped to keep the cached graphs small
+UNUSED_PROPS = ['nodeSourcePosition', 'nodeCostCycles', 'nodeCostSize', 'nodeToBlock', 'relativeFrequency']
+
+# pickled graphs that were already loaded by this process, keyed by the hash of their json file
+loaded_graphs = {}
+
+
+class GraphCache:
+    """
+    Cache of parsed bgv2json files.
+
+    Only the first graph of a json file is read. It is pickled into a cache file next to it. The cache file starts with the hash of
+    the json content, so it is rebuilt as soon as the json file changes. Within a process, the pickled graph is
+    additionally kept in memory, since callee graphs are loaded again for every inlined invoke.
+    Every call returns a new copy of the graph, because the builder changes the ids and edges of the loaded graph.
+    """
+    enabled = True
+
+    @staticmethod
+    def set_enabled(enabled):
+        GraphCache.enabled = enabled
+
+    @staticmethod
+    def clear():
+        loaded_graphs.clear()
+
+    @staticmethod
+    def load(graph_json_file):
+        """
+        Load the first graph of a json file
+
+        :param graph_json_file: path of the json file
+        :return: the graph as a dictionary
+        """
+        data = GraphCache.read_first_graph(graph_json_file)
+        if not GraphCache.enabled:
+            return GraphCache.parse(data)
+
+        key = hashlib.sha256(data.encode()).hexdigest().encode()
+        if key not in loaded_graphs:
+            pickled_graph = GraphCache.read_cache_file(graph_json_file, key)
+            if pickled_graph is None:
+                pickled_graph = pickle.dumps(GraphCache.parse(data), protocol=pickle.HIGHEST_PROTOCOL)
+                GraphCache.write_cache_file(graph_json_file, key, pickled_graph)
+            loaded_graphs[key] = pickled_graph
+        return pickle.loads(loaded_graphs[key])
+
+    @staticmethod
+    def read_first_graph(graph_json_file):
+        """
+        Read a json file up to the end of its first graph, the graphs of the later phases are never read
+
+        :param graph_json_file: path of the json file
+        :return: json text of the first graph
+        """
+        chunks = []
+        tail = ''
+        with open(graph_json_file, 'r') as file:
+            while True:
+                chunk = file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                text = tail + chunk
+                end = text.find(GRAPH_SEPARATOR)
+                if end >= 0:
+                    chunks.append(text[:end + 1])
+                    return ''.join(chunks)
+                # keep the end of the chunk, the separator could continue in the next one
+                split = max(len(text) - len(GRAPH_SEPARATOR) + 1, 0)
+                chunks.append(text[:split])
+                tail = text[split:]
+        chunks.append(tail)
+        return ''.join(chunks)
+
+    @staticmethod
+    def parse(data):
+        graph = json.loads(data)
+        for node in graph.get('nodes', []):
+            for prop in UNUSED_PROPS:
+                node['props'].pop(prop, None)
+        return graph
+
+    @staticmethod
+    def get_header(key):
+        return CACHE_VERSION + b' ' + key + b'\n'
+
+    @staticmethod
+    def read_cache_file(graph_json_file, key):
+        header = GraphCache.get_header(key)
+        try:
+            with open(graph_json_file + CACHE_SUFFIX, 'rb') as file:
+                if file.read(len(header)) != header:
+                    return None # outdated
+                return file.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def write_cache_file(graph_json_file, key, pickled_graph):
+        # write to a temporary file first, so that a concurrent load never sees a partially written cache
+        cache_file = graph_json_file + CACHE_SUFFIX
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, 'wb') as file:
+                file.write(GraphCache.get_header(key))
+                file.write(pickled_graph)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass # e.g. read-only directory, the graph is parsed again next time
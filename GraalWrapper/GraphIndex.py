@@ -0,0 +1,32 @@
+from collections import defaultdict
+
+
+class GraphIndex:
+    """
+    Adjacency lists of a json graph.
+
+    The edges of every node are kept in the order of the edge list and the nodes of an id in the order of the node
+    list, so walking them gives the same order as scanning the full lists. The index has to be rebuilt after edges or
+    nodes were added or removed.
+    """
+
+    def __init__(self, json_graph):
+        self.outgoing = defaultdict(list)
+        self.incoming = defaultdict(list)
+        for edge in json_graph.get('edges', []):
+            self.outgoing[edge['from']].append(edge)
+            self.incoming[edge['to']].append(edge)
+
+        # (position in the node list, node) for every id
+        self.nodes = defaultdict(list)
+        for position, node in enumerate(json_graph.get('nodes', [])):
+            self.nodes[node['id']].append((position, node))
+
+    def get_outgoing(self, node_id):
+        return self.outgoing.get(node_id, [])
+
+    def get_incoming(self, node_id):
+        return self.incoming.get(node_id, [])
+
+    def get_nodes(self, node_id):
+        return self.nodes.get(node_id, [])
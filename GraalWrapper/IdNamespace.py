@@ -0,0 +1,89 @@
+import bisect
+import os
+
+# namespace of every root graph file
+namespaces = {}
+
+
+class IdNamespace:
+    """
+    Global node ids of a graph and all of its inlined callees.
+
+    A node is identified by its call-site path (the local ids of the invoke nodes that lead to its method, empty for
+    the root graph) and its local id in the json file of the method. Every call-site path gets its own dense block of
+    global ids, which is large enough for the method, so methods of any size can be inlined at any depth.
+    The blocks are kept for the lifetime of the namespace, so every GraphBuilder of the same root graph assigns the
+    same global id to the same node, no matter which nodes it slices away.
+    """
+
+    def __init__(self):
+        self.blocks = {} # call-site path -> (first global id, size)
+        self.starts = [] # sorted first global ids of the blocks
+        self.paths = [] # call-site paths in the order of self.starts
+        self.next_id = 0
+
+    @staticmethod
+    def get_namespace(graph_json_file):
+        """
+        :param graph_json_file: path of the json file of the root graph
+        :return: the namespace shared by all GraphBuilders of the root graph
+        """
+        key = os.path.abspath(graph_json_file)
+        if key not in namespaces:
+            namespaces[key] = IdNamespace()
+        return namespaces[key]
+
+    def get_block(self, call_path, size):
+        """
+        Block of global ids of a call-site path, allocated on its first use
+
+        :param call_path: tuple of the local ids of the invoke nodes that lead to the method
+        :param size: number of local ids of the method
+        :return: first global id of the block
+        """
+        if call_path not in self.blocks:
+            self.blocks[call_path] = (self.next_id, size)
+            self.starts.append(self.next_id)
+            self.paths.append(call_path)
+            self.next_id += max(size, 1)
+        first_id, block_size = self.blocks[call_path]
+        if size > block_size:
+            raise ValueError(f"The method at call-site path {call_path} changed its size from {block_size} to {size}")
+        return first_id
+
+    def get_call_path(self, node_id):
+        """
+        :param node_id: global id of a node
+        :return: call-site path of the node or None for an unknown id
+        """
+        position = bisect.bisect_right(self.starts, node_id) - 1
+        if position < 0 or node_id >= self.starts[position] + self.blocks[self.paths[position]][1]:
+            return None
+        return self.paths[position]
+
+    def get_local_id(self, node_id):
+        """
+        :param node_id: global id of a node
+        :return: (call-site path, id in the json file of its method)
+        """
+        call_path = self.get_call_path(node_id)
+        if call_path is None:
+            return None, node_id
+        return call_path, node_id - self.blocks[call_path][0]
+
+    def get_state(self):
+        """
+        :return: the allocated blocks in the order of their allocation and the next free id, as a hashable tuple
+        """
+        return tuple(self.blocks.items()), self.next_id
+
+    def set_state(self, state):
+        """
+        Replace the allocated blocks by the ones of a state returned by get_state
+
+        :param state: ((call-site path, (first global id, size)), ...), next free id
+        """
+        blocks, self.next_id = state
+        self.blocks = dict(blocks)
+        self.starts = [first_id for first_id, _ in self.blocks.values()]
+        self.paths = list(self.blocks)
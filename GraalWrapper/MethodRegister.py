@@ -1,16 +1,30 @@
 import GraalWrapper
 from collections import defaultdict
 
-methods = defaultdict(int)
+# parsed json graphs of the loaded methods, keyed by their file
+templates = {}
 class MethodRegister:
 
     @staticmethod
     def clear():
-        global methods
-        methods = defaultdict(int)
+        templates.clear()
 
     @staticmethod
-    def get_method(key):
+    def new_budget():
+        """
+        :return: how often every method was inlined, the builder stops inlining a method after 10 times
+        """
+        return defaultdict(int)
+
+    @staticmethod
+    def get_loaded_files():
+        """
+        :return: json files of the methods whose templates were loaded since the last clear
+        """
+        return list(templates)
+
+    @staticmethod
+    def get_method(key, budget):
         #if key not in MethodRegister.methods:
         #    MethodRegister.methods[key] = MethodRegister.create_method(key)
         #else:
@@ -27,13 +41,53 @@ class MethodRegister:
         if key.startswith('Verifier.'):
             return None # value is usually what we optimize for
 
-        return MethodRegister.create_method(key)
+        return MethodRegister.create_method(key, budget)
 
     @staticmethod
-    def create_method(key):
-        if methods[key] >= 10:
+    def create_method(key, budget):
+        """
+        :param budget: inlining counts of new_budget, incremented for the method
+        """
+        if budget[key] >= 10:
             return None
-        methods[key] += 1
+        budget[key] += 1
         if key == 'org_example_Test.convertValue':
             return GraalWrapper.GraphBuilder('SUTs/Test7/graph_convert_value.json')
         return f"{key}.json"
+
+    @staticmethod
+    def get_template(graph_json_file):
+        """
+        Parsed json graph of a method file, loaded only once per file
+
+        :param graph_json_file: path of the json file
+        :return: the json graph, it must not be changed
+        """
+        if graph_json_file not in templates:
+            templates[graph_json_file] = GraalWrapper.GraphCache.load(graph_json_file)
+        return templates[graph_json_file]
+
+    @staticmethod
+    def clone_template(graph_json_file, id_offset=0):
+        """
+        Copy of the json graph of a method file with all node ids shifted by an offset
+
+        Only the parts that are changed by the GraphBuilder are copied, i.e. the nodes, their props and the edges.
+
+        :param graph_json_file: path of the json file
+        :param id_offset: offset that is added to all node ids
+        :return: the json graph
+        """
+        template = MethodRegister.get_template(graph_json_file)
+        json_graph = dict(template)
+        json_graph['nodes'] = []
+        for node in template.get('nodes', []):
+            node = dict(node)
+            node['props'] = dict(node['props'])
+            if id_offset > 0:
+                node['id'] += id_offset
+                node['props']['id'] = node['id']
+            json_graph['nodes'].append(node)
+        json_graph['edges'] = [dict(edge, **{'from': edge['from'] + id_offset, 'to': edge['to'] + id_offset})
+                               for edge in template.get('edges', [])]
+        return json_graph
@@ -0,0 +1,708 @@
+import builtins
+import contextlib
+import math
+import types
+
+import numpy as np
+import torch
+
+
+class Tensor:
+    """
+    Array of numbers that records the operations on it for reverse-mode differentiation.
+
+    The module mirrors the part of the torch API that the node kernels use, see GraalWrapper.TapeGraph. Every operation
+    on a tensor that requires a gradient appends a record (result, operands, backward function) to the tape, so
+    backward() only has to walk the tape in reverse order instead of sorting the autograd graph.
+    Random numbers are drawn from the generator of torch, so the tape samples the same values as torch would.
+    """
+    # let numpy scalars and arrays defer to the reflected operators of the tensor
+    __array_ufunc__ = None
+
+    def __init__(self, value, requires_grad=False, is_leaf=True):
+        self.value = value
+        self.requires_grad = requires_grad
+        self.is_leaf = is_leaf
+        self.grad = None
+        self.pending_grad = None # gradient summed up by the running backward pass
+        self._version = 0 # number of in-place changes, like in torch
+
+    @property
+    def data(self):
+        # shares the array, changes of it aren't recorded
+        return Tensor(self.value)
+
+    @data.setter
+    def data(self, data):
+        self.value = to_value(data)
+        self._version += 1
+
+    @property
+    def shape(self):
+        return np.shape(self.value)
+
+    @property
+    def dtype(self):
+        return self.value.dtype
+
+    def dim(self):
+        return np.ndim(self.value)
+
+    def numel(self):
+        return np.size(self.value)
+
+    def item(self):
+        return self.value.item()
+
+    def tolist(self):
+        return self.value.tolist()
+
+    def numpy(self):
+        return np.asarray(self.value)
+
+    def detach(self):
+        return Tensor(self.value)
+
+    def to(self, dtype):
+        if self.value.dtype == dtype:
+            return self
+        value = self.value.astype(dtype)
+        if not np.issubdtype(dtype, np.floating):
+            return Tensor(value)
+        return record(value, (self,), lambda g: (g,))
+
+    def float(self):
+        return self.to(float32)
+
+    def backward(self, gradient=None):
+        """
+        Sum up the gradients of all leaves that require a gradient in their grad attribute and clear the tape
+
+        :param gradient: gradient of the tensor, 1 by default
+        """
+        if not self.requires_grad:
+            raise RuntimeError("element 0 of tensors does not require grad and does not have a grad_fn")
+        self.pending_grad = np.ones_like(self.value) if gradient is None else np.asarray(to_value(gradient))
+        leaves = [self] if self.is_leaf else []
+        with np.errstate(all='ignore'):
+            for result, operands, backward in reversed(tape):
+                grad = result.pending_grad
+                if grad is None:
+                    continue
+                result.pending_grad = None
+                for operand, operand_grad in zip(operands, backward(grad)):
+                    if not (isinstance(operand, Tensor) and operand.requires_grad) or operand_grad is None:
+                        continue
+                    operand_grad = unbroadcast(operand_grad, operand.shape)
+                    if operand.pending_grad is None:
+                        operand.pending_grad = operand_grad
+                        if operand.is_leaf:
+                            leaves.append(operand)
+                    else:
+                        operand.pending_grad = operand.pending_grad + operand_grad
+        for leaf in leaves:
+            grad = leaf.pending_grad
+            leaf.pending_grad = None
+            leaf.grad = Tensor(grad) if leaf.grad is None else Tensor(leaf.grad.value + grad)
+        clear_tape()
+
+    def __repr__(self):
+        return f"tensor({self.value})"
+
+    def __format__(self, format_spec):
+        return format(self.value, format_spec)
+
+    def __len__(self):
+        if self.dim() == 0:
+            raise TypeError("len() of a 0-d tensor")
+        return len(self.value)
+
+    def __iter__(self):
+        return iter(self.unbind(0))
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.value, dtype=dtype)
+
+    def __bool__(self):
+        return builtins.bool(self.value)
+
+    def __float__(self):
+        return float(self.value)
+
+    def __int__(self):
+        return int(self.value)
+
+    def __index__(self):
+        return int(self.value)
+
+    __hash__ = object.__hash__
+
+    def __getitem__(self, index):
+        index = to_value(index)
+        shape = self.shape
+
+        def backward(g):
+            grad = np.zeros(shape)
+            np.add.at(grad, index, g)
+            return (grad,)
+        return record(np.asarray(self.value)[index], (self,), backward)
+
+    def __setitem__(self, index, value):
+        self.value[to_value(index)] = to_value(value)
+        self._version += 1
+
+    def unbind(self, dim=0):
+        return [self[(slice(None),) * dim + (i,)] for i in range(self.shape[dim])]
+
+    def reshape(self, *shape):
+        if len(shape) == 1 and isinstance(shape[0], (tuple, list)):
+            shape = tuple(shape[0])
+        old_shape = self.shape
+        return record(np.reshape(self.value, shape), (self,), lambda g: (np.reshape(g, old_shape),))
+
+    view = reshape
+
+    def unsqueeze(self, dim):
+        if dim < 0:
+            dim += self.dim() + 1
+        return self.reshape(self.shape[:dim] + (1,) + self.shape[dim:])
+
+    def __neg__(self):
+        return record(-self.value, (self,), lambda g: (-g,))
+
+    def __add__(self, other):
+        return add(self, other)
+
+    def __radd__(self, other):
+        return add(other, self)
+
+    def __sub__(self, other):
+        return sub(self, other)
+
+    def __rsub__(self, other):
+        return sub(other, self)
+
+    def __mul__(self, other):
+        return mul(self, other)
+
+    def __rmul__(self, other):
+        return mul(other, self)
+
+    def __truediv__(self, other):
+        return div(self, other)
+
+    def __rtruediv__(self, other):
+        return div(other, self)
+
+    def __mod__(self, other):
+        return remainder(self, other)
+
+    def __rmod__(self, other):
+        return remainder(other, self)
+
+    def __pow__(self, other):
+        return pow(self, other)
+
+    def __rpow__(self, other):
+        return pow(other, self)
+
+    def __matmul__(self, other):
+        return matmul(self, other)
+
+    def __lt__(self, other):
+        return Tensor(self.value < to_value(other))
+
+    def __le__(self, other):
+        return Tensor(self.value <= to_value(other))
+
+    def __gt__(self, other):
+        return Tensor(self.value > to_value(other))
+
+    def __ge__(self, other):
+        return Tensor(self.value >= to_value(other))
+
+    def __eq__(self, other):
+        return Tensor(self.value == to_value(other))
+
+    def __ne__(self, other):
+        return Tensor(self.value != to_value(other))
+
+    def __and__(self, other):
+        return Tensor(self.value & to_value(other))
+
+    def __or__(self, other):
+        return Tensor(self.value | to_value(other))
+
+    def __xor__(self, other):
+        return Tensor(self.value ^ to_value(other))
+
+    def __invert__(self):
+        return Tensor(~self.value)
+
+    def __abs__(self):
+        return abs(self)
+
+    def abs(self):
+        return abs(self)
+
+    def exp(self):
+        return exp(self)
+
+    def log(self):
+        return log(self)
+
+    def sigmoid(self):
+        return sigmoid(self)
+
+    def clamp(self, min=None, max=None):
+        return clamp(self, min, max)
+
+    def round(self):
+        return round(self)
+
+    def sum(self, dim=None):
+        return sum(self, dim)
+
+    def mean(self, dim=None):
+        return mean(self, dim)
+
+    def max(self, dim=None):
+        return max(self, dim=dim)
+
+    def min(self, dim=None):
+        return min(self, dim=dim)
+
+    def argmax(self, dim=None):
+        return argmax(self, dim)
+
+    def softmax(self, dim):
+        return softmax(self, dim)
+
+    def all(self):
+        return all(self)
+
+
+# records (result, operands, backward function) of the operations since the last backward pass
+tape = []
+grad_enabled = True
+
+float32 = np.dtype(np.float32)
+float64 = np.dtype(np.float64)
+double = float64
+int64 = np.dtype(np.int64)
+long = int64
+bool = np.dtype(np.bool_)
+
+jit = types.SimpleNamespace(is_tracing=lambda: False)
+
+
+def clear_tape():
+    tape.clear()
+
+
+def is_grad_enabled():
+    return grad_enabled
+
+
+def set_grad_enabled(enabled):
+    global grad_enabled
+    grad_enabled = enabled
+
+
+@contextlib.contextmanager
+def no_grad():
+    enabled = grad_enabled
+    set_grad_enabled(False)
+    try:
+        yield
+    finally:
+        set_grad_enabled(enabled)
+
+
+def get_default_dtype():
+    return float64
+
+
+def to_value(x):
+    return x.value if isinstance(x, Tensor) else x
+
+
+def unbroadcast(grad, shape):
+    """
+    Sum up the gradient of a broadcast operand over the broadcast dimensions
+
+    :param grad: gradient of the result
+    :param shape: shape of the operand
+    :return: gradient of the shape of the operand
+    """
+    grad_shape = np.shape(grad)
+    if grad_shape == shape:
+        return grad
+    grad = np.sum(grad, axis=tuple(range(len(grad_shape) - len(shape))))
+    axes = tuple(i for i, size in enumerate(shape) if size == 1 and np.shape(grad)[i] != 1)
+    if axes:
+        grad = np.sum(grad, axis=axes, keepdims=True)
+    return np.reshape(grad, shape)
+
+
+def record(value, operands, backward):
+    """
+    Wrap the result of an operation and append it to the tape if an operand requires a gradient
+
+    :param value: result of the operation
+    :param operands: tensors and numbers the result was computed from
+    :param backward: function that maps the gradient of the result to the gradients of the operands
+    :return: the result as a tensor
+    """
+    if grad_enabled and builtins.any(isinstance(operand, Tensor) and operand.requires_grad for operand in operands):
+        result = Tensor(value, True, False)
+        tape.append((result, operands, backward))
+        return result
+    return Tensor(value)
+
+
+def tensor(data, dtype=None, requires_grad=False):
+    if isinstance(data, Tensor):
+        data = data.value
+    elif isinstance(data, (list, tuple)):
+        data = [to_value(x) for x in data]
+    value = np.array(data, dtype=dtype)
+    if dtype is None and value.dtype == np.float32:
+        value = value.astype(float64)
+    return Tensor(value, requires_grad)
+
+
+def as_tensor(data, dtype=None):
+    if isinstance(data, Tensor):
+        return data if dtype is None else data.to(dtype)
+    return tensor(data, dtype)
+
+
+def zeros_like(x, dtype=None):
+    return Tensor(np.zeros_like(to_value(x), dtype=dtype))
+
+
+def ones_like(x, dtype=None):
+    return Tensor(np.ones_like(to_value(x), dtype=dtype))
+
+
+def full(size, fill_value, dtype=None, requires_grad=False):
+    return Tensor(np.full(size, fill_value, dtype=dtype or float64), requires_grad)
+
+
+def ones(*size, dtype=None, requires_grad=False):
+    if len(size) == 1 and isinstance(size[0], (tuple, list)):
+        size = tuple(size[0])
+    return full(size, 1.0, dtype, requires_grad)
+
+
+def arange(end, dtype=None):
+    return Tensor(np.arange(to_value(end), dtype=dtype))
+
+
+def randn(*size, requires_grad=False):
+    return Tensor(torch.randn(*size, dtype=torch.float64).numpy(), requires_grad)
+
+
+def rand_like(x):
+    return Tensor(torch.rand(np.shape(to_value(x)), dtype=torch.float64).numpy())
+
+
+def one_hot(x, num_classes):
+    return Tensor(np.eye(num_classes, dtype=np.int64)[to_value(x)])
+
+
+def add(x, y):
+    return record(to_value(x) + to_value(y), (x, y), lambda g: (g, g))
+
+
+def sub(x, y):
+    return record(to_value(x) - to_value(y), (x, y), lambda g: (g, -g))
+
+
+def mul(x, y):
+    x_value, y_value = to_value(x), to_value(y)
+    return record(x_value * y_value, (x, y), lambda g: (g * y_value, g * x_value))
+
+
+def div(x, y):
+    x_value, y_value = to_value(x), to_value(y)
+    return record(x_value / y_value, (x, y), lambda g: (g / y_value, -g * ((x_value / y_value) / y_value)))
+
+
+def remainder(x, y):
+    x_value, y_value = to_value(x), to_value(y)
+    return record(np.mod(x_value, y_value), (x, y), lambda g: (g, -g * np.floor_divide(x_value, y_value)))
+
+
+def fmod(x, y):
+    x_value, y_value = to_value(x), to_value(y)
+    return record(np.fmod(x_value, y_value), (x, y), lambda g: (g, -g * np.trunc(x_value / y_value)))
+
+
+def pow(x, y):
+    x_value, y_value = to_value(x), to_value(y)
+    with np.errstate(all='ignore'):
+        value = np.power(np.asarray(x_value, dtype=np.result_type(x_value, y_value, float64)), y_value)
+
+    def backward(g):
+        # like torch, a zero exponent and a zero base with a positive exponent have a zero gradient
+        x_grad = np.where(y_value == 0, 0.0, g * (y_value * np.power(x_value, y_value - 1.0)))
+        y_grad = np.where((x_value == 0) & (y_value >= 0), 0.0, g * (value * np.log(x_value)))
+        return x_grad, y_grad
+    return record(value, (x, y), backward)
+
+
+def matmul(x, y):
+    x_value, y_value = to_value(x), to_value(y)
+
+    def backward(g):
+        if np.ndim(y_value) == 1:
+            return np.multiply.outer(g, y_value), np.tensordot(x_value, g, axes=(0, 0))
+        return g @ np.swapaxes(y_value, -1, -2), np.swapaxes(x_value, -1, -2) @ g
+    return record(np.matmul(x_value, y_value), (x, y), backward)
+
+
+def where(condition, x, y):
+    condition, x_value, y_value = to_value(condition), to_value(x), to_value(y)
+    return record(np.where(condition, x_value, y_value), (x, y),
+                  lambda g: (np.where(condition, g, 0.0), np.where(condition, 0.0, g)))
+
+
+def unary(x, function, backward):
+    """
+    :param x: operand
+    :param function: numpy function of the operation
+    :param backward: function of the gradient of the result, the operand and the result that returns the gradient of
+        the operand, with the same order of operations as in torch
+    :return: the result of the operation
+    """
+    x = as_tensor(x)
+    with np.errstate(all='ignore'):
+        value = function(x.value)
+    return record(value, (x,), lambda g: (backward(g, x.value, value),))
+
+
+def exp(x):
+    return unary(x, np.exp, lambda g, x, y: g * y)
+
+
+def log(x):
+    return unary(x, np.log, lambda g, x, y: g / x)
+
+
+def log10(x):
+    return unary(x, np.log10, lambda g, x, y: g / (x * math.log(10)))
+
+
+def sqrt(x):
+    return unary(x, np.sqrt, lambda g, x, y: g / (2 * y))
+
+
+def sin(x):
+    return unary(x, np.sin, lambda g, x, y: g * np.cos(x))
+
+
+def cos(x):
+    return unary(x, np.cos, lambda g, x, y: g * -np.sin(x))
+
+
+def tan(x):
+    return unary(x, np.tan, lambda g, x, y: g * (1 + y * y))
+
+
+def asin(x):
+    return unary(x, np.arcsin, lambda g, x, y: g * (1 / np.sqrt(-x * x + 1)))
+
+
+def acos(x):
+    return unary(x, np.arccos, lambda g, x, y: g * -(1 / np.sqrt(-x * x + 1)))
+
+
+def atan(x):
+    return unary(x, np.arctan, lambda g, x, y: g / (x * x + 1))
+
+
+def sigmoid(x):
+    return unary(x, lambda x: 1 / (1 + np.exp(-x)), lambda g, x, y: g * (1 - y) * y)
+
+
+def relu(x):
+    return unary(x, lambda x: np.maximum(x, 0.0), lambda g, x, y: np.where(y > 0, g, 0.0))
+
+
+def abs(x):
+    return unary(x, np.abs, lambda g, x, y: g * np.sign(x))
+
+
+def round(x):
+    return unary(x, np.round, lambda g, x, y: np.zeros_like(y))
+
+
+def trunc(x):
+    return unary(x, np.trunc, lambda g, x, y: np.zeros_like(y))
+
+
+def atan2(y, x):
+    y_value, x_value = to_value(y), to_value(x)
+    reciprocal = 1 / (y_value * y_value + x_value * x_value)
+    return record(np.arctan2(y_value, x_value), (y, x), lambda g: (g * x_value * reciprocal,
+                                                                   g * -y_value * reciprocal))
+
+
+def clamp(x, min=None, max=None):
+    x = as_tensor(x)
+    value = x.value
+    if min is not None:
+        value = np.maximum(value, min)
+    if max is not None:
+        value = np.minimum(value, max)
+    inside = np.ones(x.shape, dtype=np.bool_)
+    if min is not None:
+        inside &= x.value >= min
+    if max is not None:
+        inside &= x.value <= max
+    return record(value, (x,), lambda g: (np.where(inside, g, 0.0),))
+
+
+def extremum(x, y, dim, select, arg_select):
+    """
+    Elementwise extremum of two tensors or the extremum of one tensor, like torch.max and torch.min
+
+    Like in torch, equal elements share the gradient.
+    """
+    if y is not None and not isinstance(y, int):
+        x_value, y_value = to_value(x), to_value(y)
+        value = select(x_value, y_value)
+
+        def backward(g):
+            x_share = np.where(x_value == y_value, 0.5, value == x_value)
+            return g * x_share, g * (1 - x_share)
+        return record(value, (x, y), backward)
+    if y is not None:
+        dim = y
+    x = as_tensor(x)
+    if dim is None:
+        value = select.reduce(x.value, axis=None)
+        hits = (x.value == value).astype(float64)
+        return record(value, (x,), lambda g: (hits * (g / np.sum(hits)),))
+    indices = arg_select(x.value, axis=dim)
+    value = np.take_along_axis(x.value, np.expand_dims(indices, dim), dim).squeeze(dim)
+
+    def backward(g):
+        grad = np.zeros(x.shape)
+        np.put_along_axis(grad, np.expand_dims(indices, dim), np.expand_dims(g, dim), dim)
+        return (grad,)
+    return types.SimpleNamespace(values=record(value, (x,), backward), indices=Tensor(indices))
+
+
+def max(x, other=None, dim=None):
+    return extremum(x, other, dim, np.maximum, np.argmax)
+
+
+def min(x, other=None, dim=None):
+    return extremum(x, other, dim, np.minimum, np.argmin)
+
+
+def maximum(x, y):
+    return max(x, y)
+
+
+def minimum(x, y):
+    return min(x, y)
+
+
+def argmax(x, dim=None):
+    return Tensor(np.argmax(to_value(x), axis=dim))
+
+
+def sum(x, dim=None):
+    x = as_tensor(x)
+    shape = x.shape
+    return record(np.sum(x.value, axis=dim), (x,),
+                  lambda g: (np.broadcast_to(g if dim is None else np.expand_dims(g, dim), shape),))
+
+
+def mean(x, dim=None):
+    x = as_tensor(x)
+    count = x.numel() if dim is None else x.shape[dim]
+    return sum(x, dim) / count
+
+
+def softmax(x, dim):
+    x = as_tensor(x)
+    shifted = np.exp(x.value - np.max(x.value, axis=dim, keepdims=True))
+    value = shifted / np.sum(shifted, axis=dim, keepdims=True)
+    return record(value, (x,), lambda g: (value * (g - np.sum(g * value, axis=dim, keepdims=True)),))
+
+
+def stack(tensors, dim=0):
+    tensors = tuple(tensors)
+    value = np.stack([to_value(t) for t in tensors], axis=dim)
+    return record(value, tensors, lambda g: tuple(np.moveaxis(g, dim, 0)))
+
+
+def cat(tensors, dim=0):
+    tensors = tuple(tensors)
+    values = [to_value(t) for t in tensors]
+    splits = np.cumsum([np.shape(v)[dim] for v in values])[:-1]
+    return record(np.concatenate(values, axis=dim), tensors, lambda g: tuple(np.split(g, splits, axis=dim)))
+
+
+def broadcast_to(x, shape):
+    x = as_tensor(x)
+    return record(np.broadcast_to(x.value, shape), (x,), lambda g: (g,))
+
+
+def broadcast_tensors(*tensors):
+    shape = np.broadcast_shapes(*[np.shape(to_value(t)) for t in tensors])
+    return [broadcast_to(t, shape) for t in tensors]
+
+
+def isnan(x):
+    return Tensor(np.isnan(to_value(x)))
+
+
+def all(x):
+    return Tensor(np.all(to_value(x)))
+
+
+def any(x):
+    return Tensor(np.any(to_value(x)))
+
+
+class Adam:
+    """
+    Adam optimizer for tensors of this module, with the update of the default torch.optim.Adam
+
+    torch fuses some of the multiplications and additions, so the parameters can differ in the last bits.
+    """
+
+    def __init__(self, params, lr=0.001, betas=(0.9, 0.999), eps=1e-8):
+        self.params = list(params)
+        self.lr = lr
+        self.betas = betas
+        self.eps = eps
+        self.steps = 0
+        self.exp_avg = [np.zeros_like(p.value) for p in self.params]
+        self.exp_avg_sq = [np.zeros_like(p.value) for p in self.params]
+
+    def zero_grad(self):
+        for p in self.params:
+            p.grad = None
+
+    def step(self):
+        beta1, beta2 = self.betas
+        self.steps += 1
+        step_size = self.lr / (1 - beta1 ** self.steps)
+        bias_correction2_sqrt = (1 - beta2 ** self.steps) ** 0.5
+        for i, p in enumerate(self.params):
+            if p.grad is None:
+                continue
+            grad = p.grad.value
+            # lerp and addcmul of torch
+            self.exp_avg[i] = self.exp_avg[i] + (1 - beta1) * (grad - self.exp_avg[i])
+            self.exp_avg_sq[i] = self.exp_avg_sq[i] * beta2 + (1 - beta2) * grad * grad
+            denom = np.sqrt(self.exp_avg_sq[i]) / bias_correction2_sqrt + self.eps
+            p.value = p.value - step_size * self.exp_avg[i] / denom
+            p._version += 1
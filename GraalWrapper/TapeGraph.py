@@ -0,0 +1,199 @@
+import contextlib
+import sys
+import threading
+
+import numpy as np
+import torch
+
+import nodes
+from GraalWrapper import TapeAutograd
+from GraalWrapper.ConcreteInterpreter import ConcreteInterpreter
+
+# the torch modules are replaced in the whole process, so only one thread at a time may run a graph on the tape.
+# A thread can activate a tape graph again while it is active, e.g. for the concrete execution.
+activation_lock = threading.RLock()
+
+
+class TapeGraph:
+    """
+    Execution schedule that runs on the NumPy tape of GraalWrapper.TapeAutograd instead of torch.
+
+    The node kernels only call the part of the torch API that TapeAutograd mirrors. While the graph runs, the torch
+    module of the node and GraalWrapper modules is replaced by TapeAutograd, so the kernels compute with NumPy arrays
+    and record a compact tape instead of the autograd graph of torch. This avoids the dispatch overhead of torch for
+    the small scalar operations most graphs consist of. The replacement holds a process-wide lock (see activate), so
+    torch kernels of other threads must not run while a tape graph is active. The tape of TapeAutograd is process-wide
+    as well, hence the graphs of a process are optimized on the tape by one thread at a time.
+    Calling it replaces the node by node execution of the schedule. The inputs are tensors of TapeAutograd, which are
+    optimized by TapeAutograd.Adam.
+    """
+
+    # a graph is only executed on the tape if its dry run matches the torch execution up to this relative tolerance
+    tolerance = 1e-9
+    # runs of the dry run: the first run, the run after which the frozen nodes are captured and a run of the folded
+    # schedule, which the following iterations execute
+    dry_runs = 3
+    # class attributes that keep tensors between the runs, the tape has its own values of them
+    cached_attributes = [(nodes.types.String, 'vocab_codes'), (nodes.types.String, 'position_weights')]
+
+    def __init__(self, schedule, output_id, input_values):
+        self.graph = schedule.graph
+        self.schedule = schedule
+        self.output_id = output_id
+        self.input_values = input_values
+        self.replaced_attributes = self.get_torch_attributes()
+        self.caches = [{} if isinstance(getattr(cls, name), dict) else None for cls, name in self.cached_attributes]
+
+    @staticmethod
+    def get_torch_attributes():
+        """
+        :return: (module, attribute name, torch module) of the torch modules that the loaded node and GraalWrapper
+            modules imported
+        """
+        excluded = (__name__, TapeAutograd.__name__)
+        with activation_lock:
+            return [(module, name, value) for module_name, module in list(sys.modules.items())
+                    if module_name.split('.')[0] in ('nodes', 'GraalWrapper') and module_name not in excluded
+                    for name, value in list(vars(module).items()) if value is torch or value is torch.nn.functional]
+
+    @contextlib.contextmanager
+    def activate(self):
+        """
+        Replace torch by TapeAutograd in the node and GraalWrapper modules, the gradient mode is taken over from torch
+
+        All executions on the tape go through this context manager. It holds activation_lock while torch is replaced
+        and restores the modules and the cached attributes that were set before, also if the execution fails.
+        """
+        with activation_lock:
+            previous_caches = [getattr(cls, name) for cls, name in self.cached_attributes]
+            previous_modules = [getattr(module, name) for module, name, _ in self.replaced_attributes]
+            grad_enabled = TapeAutograd.is_grad_enabled()
+            try:
+                for (cls, name), value in zip(self.cached_attributes, self.caches):
+                    setattr(cls, name, value)
+                for module, name, _ in self.replaced_attributes:
+                    setattr(module, name, TapeAutograd)
+                TapeAutograd.set_grad_enabled(torch.is_grad_enabled())
+                # like torch, invalid operations silently result in nan or inf
+                with np.errstate(all='ignore'):
+                    yield
+            finally:
+                TapeAutograd.set_grad_enabled(grad_enabled)
+                for (module, name, _), value in zip(self.replaced_attributes, previous_modules):
+                    setattr(module, name, value)
+                self.caches = [getattr(cls, name) for cls, name in self.cached_attributes]
+                for (cls, name), value in zip(self.cached_attributes, previous_caches):
+                    setattr(cls, name, value)
+
+    @staticmethod
+    def to_tape(values):
+        return [TapeAutograd.tensor(value.detach().numpy(), requires_grad=value.requires_grad) for value in values]
+
+    @staticmethod
+    def to_torch(values):
+        return [torch.tensor(value.numpy(), requires_grad=value.requires_grad) for value in values]
+
+    @staticmethod
+    def get_penalties(graph):
+        penalities = 0.0
+        for node in graph.values():
+            if node.node_penalty is not None:
+                penalities += node.node_penalty
+        return penalities
+
+    @staticmethod
+    def compile(schedule, output_id, input_values):
+        """
+        Prepare the execution of the schedule on the tape
+
+        The schedule is executed dry_runs times with torch and as often on the tape. The tape is only used if both
+        executions compute the same loss and the same gradients of the inputs in every run, i.e. the kernels of the
+        graph only use the part of the torch API that the tape mirrors, also once the frozen nodes are folded. Other
+        errors than those of a missing part of the API are raised.
+
+        :param schedule: ExecutionSchedule of the graph
+        :param output_id: id of the target node
+        :param input_values: start values of the input nodes (only tensors are supported)
+        :return: TapeGraph or None if the graph can't be executed on the tape
+        """
+        if not all(isinstance(value, torch.Tensor) for value in input_values):
+            return None # complex types like strings keep their parameters outside the inputs
+
+        graph = schedule.graph
+        tape_graph = TapeGraph(schedule, output_id, TapeGraph.to_tape(input_values))
+        # both executions draw the same random numbers
+        rng_state = torch.get_rng_state()
+        # the execution with torch must not see the modules of another thread's tape graph
+        with activation_lock:
+            try:
+                schedule.reset()
+                expected = []
+                for _ in range(TapeGraph.dry_runs):
+                    schedule.run(input_values)
+                    loss = -graph[output_id].controlFlowMultiplicative + TapeGraph.get_penalties(graph)
+                    grads = torch.autograd.grad(loss, input_values, allow_unused=True) \
+                        if loss.requires_grad else [None] * len(input_values)
+                    expected.append((loss.detach().numpy(), [grad.numpy() if grad is not None else None
+                                                            for grad in grads]))
+
+                torch.set_rng_state(rng_state)
+                schedule.reset()
+                matches = True
+                for expected_loss, expected_grads in expected:
+                    with tape_graph.activate():
+                        schedule.run(tape_graph.input_values)
+                        loss = -graph[output_id].controlFlowMultiplicative + TapeGraph.get_penalties(graph)
+                        if loss.requires_grad:
+                            loss.backward()
+                    TapeAutograd.clear_tape()
+                    matches = matches and np.allclose(loss.numpy(), expected_loss, rtol=TapeGraph.tolerance,
+                                                      equal_nan=True)
+                    for value, expected_grad in zip(tape_graph.input_values, expected_grads):
+                        grad = value.grad.numpy() if value.grad is not None else np.zeros(value.shape)
+                        expected_grad = expected_grad if expected_grad is not None else np.zeros(value.shape)
+                        matches = matches and np.allclose(grad, expected_grad, rtol=TapeGraph.tolerance,
+                                                          equal_nan=True)
+                        value.grad = None
+            except (AttributeError, TypeError, ValueError, IndexError, NotImplementedError):
+                # a kernel needs a part of the torch API that the tape doesn't mirror, e.g. a missing function or a
+                # method that the tensors of the tape don't have
+                matches = False
+            finally:
+                TapeAutograd.clear_tape()
+                # the optimization starts with the first run again
+                schedule.reset()
+        return tape_graph if matches else None
+
+    def __call__(self, input_values):
+        """
+        Execute the graph on the tape with the current annealing constant and temperature
+
+        :param input_values: tensors of TapeAutograd, in the order of the sorted input ids
+        :return: (controlFlowMultiplicative of the target node, sum of the node penalties)
+        """
+        with self.activate():
+            self.schedule.run(input_values)
+            return self.graph[self.output_id].controlFlowMultiplicative, \
+                TapeAutograd.as_tensor(self.get_penalties(self.graph))
+
+    def reaches_target(self, input_values):
+        """
+        Execute the graph concretely on the tape, see ConcreteInterpreter.reaches_target
+
+        :param input_values: concrete torch values of the input nodes, in the order of the sorted input ids
+        :return: whether the execution reaches the target node
+        """
+        with self.activate():
+            return ConcreteInterpreter(self.schedule, self.output_id).reaches_target(self.to_tape(input_values))
+
+    def sync_nodes(self, input_values):
+        """
+        Execute the schedule once with torch, so that the node objects hold the values of the given inputs again
+
+        :param input_values: torch values of the input nodes, in the order of the sorted input ids
+        """
+        with activation_lock:
+            TapeAutograd.clear_tape()
+            # the frozen nodes keep the values of the tape
+            self.schedule.reset()
+            self.schedule.run(input_values)
@@ -0,0 +1,136 @@
+import atexit
+import os
+import select
+import shutil
+import subprocess
+import tempfile
+
+DAEMON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'svHelpers', 'daemon')
+DAEMON_CLASS = 'ValidationDaemon'
+
+# running daemons of this process, keyed by (class path, main class)
+daemons = {}
+
+
+class ValidationDaemon:
+    """
+    Long-running JVM that executes the test for candidate inputs.
+
+    Starting a new JVM for every candidate takes far longer than the test itself. The daemon (svHelpers/daemon) loads
+    the test in a fresh class loader for every input instead, which gives the test a fresh Verifier and fresh static
+    state. If the test ends the JVM (Verifier.assume, System.exit), its exit code is returned and the next run starts
+    a new daemon.
+    Daemons belong to the process that started them, forked workers start their own.
+    """
+    enabled = True
+
+    def __init__(self, class_path, main_class):
+        self.class_path = class_path
+        self.main_class = main_class
+        self.process = None
+        self.work_dir = None
+        self.pid = os.getpid()
+
+    @staticmethod
+    def set_enabled(enabled):
+        ValidationDaemon.enabled = enabled
+
+    @staticmethod
+    def run_test(class_path, main_class, func_input, timeout=None):
+        """
+        Run the test with the given input in the daemon of the class path
+
+        :param class_path: class path of the test, separated by ':'
+        :param main_class: name of the class with the main method
+        :param func_input: input of Verifier as bytes
+        :param timeout: seconds after which the daemon is killed and subprocess.TimeoutExpired is raised, like
+                        subprocess.run
+        :return: CompletedProcess like subprocess.run or None if no daemon can be started
+        """
+        if not ValidationDaemon.enabled:
+            return None
+        key = (class_path, main_class)
+        daemon = daemons.get(key)
+        if daemon is None or daemon.pid != os.getpid():
+            daemon = daemons[key] = ValidationDaemon(class_path, main_class)
+        try:
+            return daemon.run(func_input, timeout)
+        except (OSError, subprocess.CalledProcessError):
+            # e.g. no JDK on the path, the tests are run by separate java processes from now on
+            daemon.stop()
+            ValidationDaemon.set_enabled(False)
+            return None
+
+    @staticmethod
+    def stop_all():
+        for daemon in daemons.values():
+            if daemon.pid == os.getpid():
+                daemon.stop()
+        daemons.clear()
+
+    @staticmethod
+    def compile():
+        source = os.path.join(DAEMON_DIR, DAEMON_CLASS + '.java')
+        target = os.path.join(DAEMON_DIR, DAEMON_CLASS + '.class')
+        if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+            return
+        # compile into a temporary directory first, so that concurrent workers never load a partially written class
+        build_dir = tempfile.mkdtemp(prefix='dasa-daemon-build-')
+        try:
+            subprocess.run(['javac', '-d', build_dir, source], check=True, capture_output=True)
+            os.replace(os.path.join(build_dir, DAEMON_CLASS + '.class'), target)
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+    def start(self):
+        ValidationDaemon.compile()
+        self.work_dir = tempfile.mkdtemp(prefix='dasa-validation-')
+        self.process = subprocess.Popen(['java', '-cp', DAEMON_DIR, DAEMON_CLASS, self.class_path, self.main_class,
+                                         self.get_output_file('stdout'), self.get_output_file('stderr')],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def stop(self, kill=False):
+        if self.process is not None:
+            if kill:
+                self.process.kill()
+            self.process.stdin.close() # the daemon ends at the end of its input
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process.stdout.close()
+            self.process = None
+        if self.work_dir is not None:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            self.work_dir = None
+
+    def get_output_file(self, name):
+        return os.path.join(self.work_dir, name)
+
+    def run(self, func_input, timeout=None):
+        if self.process is None:
+            self.start()
+        try:
+            self.process.stdin.write(f"{len(func_input)}\n".encode('ascii') + func_input)
+            self.process.stdin.flush()
+            if timeout is not None and not select.select([self.process.stdout], [], [], timeout)[0]:
+                # the test doesn't end (e.g. an endless loop), the next run starts a new daemon
+                self.stop(kill=True)
+                raise subprocess.TimeoutExpired([DAEMON_CLASS, self.main_class], timeout)
+            reply = self.process.stdout.readline()
+        except BrokenPipeError:
+            reply = b''
+
+        running = bool(reply)
+        returncode = int(reply) if running else self.process.wait()
+        with open(self.get_output_file('stdout'), 'rb') as file:
+            stdout = file.read()
+        with open(self.get_output_file('stderr'), 'rb') as file:
+            stderr = file.read()
+        if not running:
+            # the test ended the JVM, the next run starts a new one
+            self.stop()
+        return subprocess.CompletedProcess([DAEMON_CLASS, self.main_class], returncode, stdout, stderr)
+
+
+atexit.register(ValidationDaemon.stop_all)
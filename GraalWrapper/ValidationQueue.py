@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+
+class ValidationQueue:
+    """
+    Validates candidates in a background thread while the optimization of the next tries continues.
+
+    A single thread runs the validations one after the other in the order they were submitted, since a test can only
+    run once at a time in the JVM of ValidationDaemon. Candidates whose concretized inputs were already submitted are
+    skipped. As soon as a validation confirms a violation, the validations that didn't start yet are cancelled.
+    The messages of a validation are printed by the thread that collects its result, so they don't interleave with the
+    output of the optimization.
+    """
+
+    def __init__(self, validate):
+        """
+        :param validate: function that validates a candidate and returns the output of the test execution if it
+                         found a violation, else None. It gets the arguments of submit and the keyword argument log,
+                         a function that is called instead of print.
+        """
+        self.validate = validate
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.submitted = set()
+        self.futures = []
+        self.violation = None
+
+    def submit(self, key, *args):
+        """
+        Queue the validation of a candidate
+
+        :param key: hashable concretized inputs of the candidate, e.g. the values after the TYPE_CONV_* conversion
+        :param args: arguments of the validate function
+        :return: False if the candidate was skipped as a duplicate or a violation was already found
+        """
+        if self.violation is not None or key in self.submitted:
+            return False
+        self.submitted.add(key)
+        self.futures.append(self.executor.submit(self.run_validation, args))
+        return True
+
+    def run_validation(self, args):
+        # runs in the background thread
+        messages = []
+        try:
+            return self.validate(*args, log=messages.append), messages, None
+        except Exception as e:
+            return None, messages, e
+
+    def get_violation(self, wait=False, timeout=None):
+        """
+        Check the finished validations and print their messages
+
+        :param wait: wait for all submitted validations to finish
+        :param timeout: seconds to wait at most, the validations that didn't start by then are cancelled. A running
+                        validation isn't interrupted, validate has to bound it itself (test.validate_try kills the
+                        test at its deadline).
+        :return: output of the first confirmed violation or None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.violation is None and self.futures:
+            if wait and not self.futures[0].done():
+                wait_futures([self.futures[0]], None if deadline is None else max(deadline - time.monotonic(), 0))
+            if not self.futures[0].done():
+                break
+            output, messages, error = self.futures.pop(0).result()
+            for message in messages:
+                print(message)
+            if error is not None:
+                raise error  # the exception of a failed validation
+            self.violation = output
+        if self.violation is not None or wait:
+            self.close()
+        return self.violation
+
+    def close(self):
+        """
+        Cancel the validations that didn't start yet
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.futures.clear()
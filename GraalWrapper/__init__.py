@@ -1,2 +1,12 @@
 from .GraphBuilder import GraphBuilder
-from .MethodRegister import MethodRegister
\ No newline at end of file
+from .GraphCache import GraphCache
+from .GraphArtifact import GraphArtifact
+from .GraphIndex import GraphIndex
+from .IdNamespace import IdNamespace
+from .MethodRegister import MethodRegister
+from .ExecutionSchedule import ExecutionSchedule
+from .CompiledGraph import CompiledGraph
+from .TapeGraph import TapeGraph
+from .ValidationDaemon import ValidationDaemon
+from .ValidationQueue import ValidationQueue
+from .ConcreteInterpreter import ConcreteInterpreter
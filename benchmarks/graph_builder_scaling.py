@@ -0,0 +1,76 @@
+"""
+Scaling of the graph algorithms of the GraphBuilder on synthetic graphs
+
+Every node i has a control edge to i - 1 and value edges to i - 2 and i - 3, so the walks from the last and the first
+node reach the whole graph. The graph is a single method, i.e. all nodes share one id block. The time per node should stay roughly constant for growing graphs.
+
+Usage: python benchmarks/graph_builder_scaling.py [num_nodes ...]
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import nodes
+import GraalWrapper
+
+DEFAULT_SIZES = [10000, 20000, 50000, 100000]
+
+
+def create_json_graph(num_nodes):
+    json_nodes = []
+    json_edges = []
+    for node_id in range(num_nodes):
+        node_class = 'jdk.graal.compiler.nodes.ConstantNode' if node_id % 10 == 0 else \
+            'jdk.graal.compiler.nodes.calc.AddNode'
+        json_nodes.append({'id': node_id, 'props': {'id': node_id, 'node_class': {'node_class': node_class},
+                                                    'stamp': 'i32', 'rawvalue': '1'}})
+        for distance, name in [(1, 'next'), (2, 'x'), (3, 'y')]:
+            if node_id >= distance:
+                json_edges.append({'from': node_id, 'to': node_id - distance,
+                                   'props': {'direct': True, 'name': name, 'type': 'Value', 'index': 0}})
+    return {'nodes': json_nodes, 'edges': json_edges}
+
+
+def measure(function):
+    # like timeit, the garbage collector would otherwise scan the large json graph again and again
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def run(num_nodes, work_dir):
+    graph_json_file = f"graph_{num_nodes}.json"
+    with open(os.path.join(work_dir, graph_json_file), 'w') as file:
+        json.dump(create_json_graph(num_nodes), file)
+    graph_builder = GraalWrapper.GraphBuilder(graph_json_file, work_dir=work_dir + os.sep)
+
+    times = {'load': measure(graph_builder.load_graph),
+             'index': measure(graph_builder.get_index),
+             'slicing': measure(lambda: graph_builder.do_backward_slicing(graph_builder.json_graph, 0)),
+             'string length': measure(lambda: graph_builder.infer_string_length(0))}
+    graph_builder.graph = {node['id']: nodes.BaseNode(node) for node in graph_builder.json_graph['nodes']}
+    times['connect'] = measure(lambda: graph_builder.connect_nodes(start_node=num_nodes - 1))
+    return times
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as work_dir:
+        for num_nodes in sizes:
+            times = run(num_nodes, work_dir)
+            summary = ', '.join(f"{name} {duration * 1000:8.1f} ms ({duration / num_nodes * 1e6:5.2f} us/node)"
+                                for name, duration in times.items())
+            print(f"{num_nodes:7d} nodes: {summary}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
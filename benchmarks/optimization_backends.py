@@ -0,0 +1,71 @@
+"""
+Iterations per second of the optimization loop with the torch and the tape backend
+
+For every end node of the given SUTs, the same try is optimized once with the node by node execution of the schedule
+on torch and once on the NumPy tape of GraalWrapper.TapeAutograd. Both runs start from the same values, so they should
+stop at the same iteration with the same loss. A graph that the tape doesn't support falls back to torch, which is
+marked in the output. Like timeit, the fastest of several runs is reported.
+
+Usage: python benchmarks/optimization_backends.py [sut_dir ...]
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import test
+import GraalWrapper
+
+DEFAULT_SUTS = ['SUTs/Smoketest1', 'SUTs/Smoketest2']
+BACKENDS = [test.BACKEND_SCHEDULE, test.BACKEND_TAPE]
+REPEAT = 3
+
+
+def get_try(sut_dir, end_node, start_nodes, constant_nodes):
+    graph_builder = test.get_graph_builder('Main.main.json', sut_dir + os.sep)
+    graph = graph_builder.get_graph(0, end_node, reset=True)
+    needed_start_nodes = [n for n in start_nodes if n.node_id in graph]
+    random.seed(42)
+    I_all = test.get_start_values(needed_start_nodes, constant_nodes)
+    return graph_builder, graph, [n.node_id for n in needed_start_nodes], I_all
+
+
+def supports_tape(sut_dir, end_node, start_nodes, constant_nodes):
+    graph_builder, graph, input_ids, I_all = get_try(sut_dir, end_node, start_nodes, constant_nodes)
+    schedule = graph_builder.get_schedule(input_ids, graph, [end_node])
+    return GraalWrapper.TapeGraph.compile(schedule, end_node, I_all) is not None
+
+
+def run(sut_dir, end_node, start_nodes, constant_nodes, backend):
+    durations = []
+    for _ in range(REPEAT):
+        graph_builder, graph, input_ids, I_all = get_try(sut_dir, end_node, start_nodes, constant_nodes)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = test.run_optimization(graph, input_ids, end_node, graph_builder, I_all=I_all, backend=backend)
+            durations.append(time.perf_counter() - start)
+    return result, min(durations)
+
+
+def main(sut_dirs):
+    for sut_dir in sut_dirs:
+        graph_builder = test.get_graph_builder('Main.main.json', sut_dir + os.sep)
+        with contextlib.redirect_stdout(io.StringIO()):
+            graph_builder.get_graph(0, -1, reset=True)
+        start_nodes, end_nodes, constant_nodes = graph_builder.get_start_end_constant_nodes()
+        for end_node in end_nodes:
+            fallback = not supports_tape(sut_dir, end_node, start_nodes, constant_nodes)
+            for backend in BACKENDS:
+                result, duration = run(sut_dir, end_node, start_nodes, constant_nodes, backend)
+                iterations = result['iteration'] + 1
+                print(f"{sut_dir} end node {end_node:4d} {backend:>8}: {iterations / duration:8.0f} it/s "
+                      f"({iterations} iterations, loss {result['loss']:.6g})"
+                      f"{' (fell back to torch)' if backend == test.BACKEND_TAPE and fallback else ''}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or DEFAULT_SUTS)
@@ -1,8 +1,28 @@
 import torch
 import re
 
+from nodes.custom.sigmoid import Sigmoid
+
 class BaseNode:
 
+    # Whether the output only depends on the inputs of the node and the concrete mode, i.e. not on the annealing, the
+    # string temperature or randomness. Such nodes are evaluated once per try if none of their inputs depends on the
+    # input values, see ExecutionSchedule. The concrete execution evaluates them again (see ConcreteInterpreter).
+    foldable = False
+    # Name of the input that the node passes on unchanged ('*' for its only input), None if the node computes its
+    # output. The execution schedule delivers the input of such nodes directly to their children.
+    passthrough_input = None
+    # Whether the pass-through node passes on its controlFlowMultiplicative as value instead of the input
+    passthrough_control_flow = False
+    # Whether the output only depends on the inputs and the props named in key_props within one run, i.e. the node has
+    # no randomness, penalties or other state. The execution schedule only executes one of several equal pure nodes
+    # with the same inputs.
+    pure = False
+    key_props = ()
+    # Whether exec computes the output elementwise by compute() from the operands of get_operands(), so that several
+    # nodes of the class can be executed by a single tensor operation, see exec_batch
+    batchable = False
+
     # constructor
     def __init__(self, node):
         self.node = node
@@ -37,44 +57,139 @@ class BaseNode:
         self.output = None
         self.executed = False
 
+    def reset_state(self):
+        """
+        Reset everything that an execution changed, so that the node can be used for a new try.
+        In contrast to reset_inputs, this also resets values that are kept between the iterations of a try.
+        """
+        self.reset_inputs()
+        self.node_penalty = 0
+
+    def triggers_without_inputs(self):
+        """
+        Whether the node is executed by pass_constant_value, i.e. before any input arrived
+
+        :return: True if the node fires on its own
+        """
+        return self.desired_inputs == 0
+
     def pass_constant_value(self):
-        if self.desired_inputs == 0:
-            self.executed = 1
+        if self.triggers_without_inputs():
             # print(f'Auto Executing node ', self.node['id'])
-            self.exec()
-            self.set_output()
+            self.fire()
 
-    def add_input(self, input, edge, controlFlowMultiplicative):
-        #if input is None:
-        #    raise Exception(f"Invalid input for node {self.node['id']} {self} with edge {edge}")
+    @staticmethod
+    def get_input_slot(inputs, edge):
+        """
+        Name under which an input arriving over edge is stored, given the already received inputs
 
-        if edge not in self.inputs:
-            self.inputs[edge] = input
-        else:
-            self.inputs[f"{edge}_{len(self.inputs)}"] = input
+        :param inputs: the received inputs (anything supporting `in` and `len`)
+        :param edge: name of the incoming edge
+        :return: the key of the input
+        """
+        if edge not in inputs:
+            return edge
+        return f"{edge}_{len(inputs)}"
+
+    def receive_input(self, input, slot, edge, controlFlowMultiplicative):
+        self.inputs[slot] = input
 
         #if self.node['id'] == 26:
         #    print('Adding controlFlowMultiplicative', controlFlowMultiplicative, 'to node', self.node['id'], 'with edge', edge)
         self.controlFlowMultiplicative = torch.min(controlFlowMultiplicative, self.controlFlowMultiplicative)
 
+    def add_input(self, input, edge, controlFlowMultiplicative):
+        #if input is None:
+        #    raise Exception(f"Invalid input for node {self.node['id']} {self} with edge {edge}")
+
+        self.receive_input(input, self.get_input_slot(self.inputs, edge), edge, controlFlowMultiplicative)
+
         if len(self.inputs) == self.desired_inputs:
-            try:
-                manually_set_output = self.exec()
-                self.executed = True
-            except Exception as e:
-                print(f"Error for node {self.node['id']} {self}")
-                print('Inputs', self.inputs)
-                raise e
-            if manually_set_output is None:
-                self.set_output()
+            self.fire()
 
-    def set_output(self, forced_output = None):
-        self.executed = True
-        if forced_output is not None:
-            self.output = forced_output
+    def run_exec(self):
+        try:
+            self.exec()
+            self.executed = True
+        except Exception as e:
+            print(f"Error for node {self.node['id']} {self}")
+            print('Inputs', self.inputs)
+            raise e
+
+    def get_operands(self):
+        """
+        :return: the operands of compute(), taken from the inputs
+        """
+        raise NotImplementedError("Method not implemented for ", self)
 
+    @staticmethod
+    def compute(*operands):
+        """
+        Elementwise computation of the output of a batchable node
+
+        :param operands: operands as returned by get_operands(), possibly stacked for several nodes
+        :return: the output
+        """
+        raise NotImplementedError("Method not implemented")
+
+    @classmethod
+    def exec_batch(cls, batch):
+        """
+        Execute several nodes of a batchable class whose inputs are complete
+
+        The operands of all nodes are stacked, so that compute() runs once for the whole batch and every node gets its
+        slice of the result. If the operands aren't tensors of the same shape or in the concrete mode, which computes
+        integers like Java (see MathFunctions.java_integer), the nodes are executed one by one.
+
+        :param batch: list of nodes of the class
+        """
+        try:
+            operands = [node.get_operands() for node in batch]
+        except Exception:
+            operands = None # the nodes report the error themselves
+        if operands is not None and not Sigmoid.is_concrete():
+            first = operands[0][0]
+            if all(isinstance(operand, torch.Tensor) and operand.shape == first.shape and operand.dtype == first.dtype
+                   for node_operands in operands for operand in node_operands):
+                outputs = cls.compute(*[torch.stack(column) for column in zip(*operands)])
+                for node, output in zip(batch, outputs.unbind(0)):
+                    node.output = output
+                    node.executed = True
+                return
+        for node in batch:
+            node.run_exec()
+
+    def fire(self):
+        self.run_exec()
+        self.set_output()
+
+    def get_output_edges(self):
+        """
+        The outgoing edges of the node in the order they are served
+
+        :return: list of (edge name, child node) tuples
+        """
+        output_edges = []
         for edge, c in self.children.items():
             if edge.count("_") > 1:
                 edge = edge.rsplit('__', 1)[0] # Rename the output to its original name if the node outputs to multiple nodes
-            c.add_input(self.output, edge, self.controlFlowMultiplicative)
+            output_edges.append((edge, c))
+        return output_edges
+
+    def get_output_for(self, edge):
+        """
+        Value and control flow multiplicative that are passed on over the given outgoing edge
+
+        :param edge: name of the outgoing edge
+        :return: (value, controlFlowMultiplicative)
+        """
+        return self.output, self.controlFlowMultiplicative
+
+    def set_output(self, forced_output = None):
+        self.executed = True
+        if forced_output is not None:
+            self.output = forced_output
 
+        for edge, c in self.get_output_edges():
+            value, controlFlowMultiplicative = self.get_output_for(edge)
+            c.add_input(value, edge, controlFlowMultiplicative)
@@ -1,6 +1,9 @@
 import nodes.BaseNode
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.BeginNode')
 class BeginNode(nodes.BaseNode):
+    passthrough_input = '*'
+    passthrough_control_flow = True
 
     def exec(self):
         if "trueSuccessor" or "falseSuccessor" in self.inputs:
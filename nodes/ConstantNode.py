@@ -3,7 +3,11 @@ import nodes.types.String
 import torch
 import re
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.ConstantNode')
 class ConstantNode(nodes.BaseNode):
+    foldable = True
+    pure = True
+    key_props = ('stampKind', 'stamp', 'rawvalue')
 
     def __init__(self, node):
         super().__init__(node)
@@ -22,28 +26,26 @@ class ConstantNode(nodes.BaseNode):
         elif "java.lang.String" in self.node['props']['stamp']:
             raw_value = self.node['props']['rawvalue']
             string_length = len(raw_value)
-            string_obj = nodes.types.String(length=string_length)
 
-            # Pre-initialize logits to strongly favor target characters
+            # Pre-initialize logits to strongly favor target characters, set as a whole without random values, since
+            # the constant node is pure and foldable
+            logits = torch.full((string_length, len(nodes.types.String.vocab)), -20.0)
             for pos, char in enumerate(raw_value):
                 if char in nodes.types.String.vocab:
                     char_idx = nodes.types.String.vocab.index(char)
                     # Set logits: target char = +20, others = -20 (very strong bias)
-                    string_obj.logits.data[pos, :] = -20.0
-                    string_obj.logits.data[pos, char_idx] = 20.0
+                    logits[pos, char_idx] = 20.0
                 else:
                     #print(f"WARNING: Character '{char}' (ord={ord(char)}) not in vocab for constant '{raw_value}'")
                     # Default to first character in vocab
-                    string_obj.logits.data[pos, :] = -20.0
-                    string_obj.logits.data[pos, 0] = 20.0
+                    logits[pos, 0] = 20.0
 
-            # Freeze the logits so constants don't change during optimization
-            string_obj.logits.requires_grad = False
-            self.output = string_obj
+            # the logits don't require grad, so constants don't change during optimization
+            self.output = nodes.types.String(length=string_length, logits=logits)
 
         elif "byte[]" in self.node['props']['stamp']:
             raw_value = self.node['props']['rawvalue']
             array = raw_value.split("{")[1].replace("}","")
-            array = [torch.tensor(float(v.strip())) for v in array.split(",")]
+            array = torch.tensor([float(v.strip()) for v in array.split(",")])
             self.output = nodes.types.Array(array, torch.tensor(float(len(array))))
 
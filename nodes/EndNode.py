@@ -1,6 +1,8 @@
 import nodes.BaseNode
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.EndNode')
 class EndNode(nodes.BaseNode):
+    passthrough_input = 'next'
 
     def exec(self):
         self.output = self.inputs['next']
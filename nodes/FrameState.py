@@ -1,5 +1,6 @@
 import nodes.BaseNode
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.FrameState')
 class FrameState(nodes.BaseNode):
 
     def __init__(self, node):
@@ -9,7 +10,7 @@ class FrameState(nodes.BaseNode):
     def exec(self):
         pass # Do nothing
 
-    def pass_constant_value(self):
+    def triggers_without_inputs(self):
         # make it always triggering
         self.desired_inputs = 0
-        super().pass_constant_value()
\ No newline at end of file
+        return super().triggers_without_inputs()
\ No newline at end of file
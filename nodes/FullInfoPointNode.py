@@ -1,6 +1,10 @@
 import nodes.BaseNode
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.FullInfopointNode')
 class FullInfoPointNode(nodes.BaseNode):
+    foldable = True
+    passthrough_input = '*'
+    pure = True
 
     def exec(self):
         key = [x for x in self.inputs.keys()][0]
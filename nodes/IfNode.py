@@ -1,15 +1,20 @@
 import nodes.BaseNode
 import torch
+from nodes.custom.MathFunctions import MathFunctions
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.IfNode')
 class IfNode(nodes.BaseNode):
     def __init__(self, node):
         super().__init__(node)
         self.c = 0
+
+    def reset_state(self):
+        super().reset_state()
+        self.c = 0
+
     def exec(self):
 
-        self.c = self.inputs['condition']
-        if not self.c:
-            self.c = torch.tensor(0.0, requires_grad=True)
+        self.c = MathFunctions.value_or(self.inputs['condition'], 0.0)
         #if c < -0.1 or c > 1.1:
         #    raise Exception('Invalid range for IF: ', c)
         #if self.node['id'] == 26:
@@ -18,10 +23,11 @@ class IfNode(nodes.BaseNode):
         #c = torch.min(c, torch.tensor(1.0))
         #c = torch.max(c, torch.tensor(0.0))
 
+    def get_output_edges(self):
         # It can happen that during slicing, one of the branches is not used
-        if 'trueSuccessor' in self.children:
-            self.children['trueSuccessor'].add_input(-999, 'trueSuccessor', self.controlFlowMultiplicative * self.c)
-        if 'falseSuccessor' in self.children:
-            self.children['falseSuccessor'].add_input(-999, 'falseSuccessor', self.controlFlowMultiplicative * (1-self.c))
+        return [(edge, self.children[edge]) for edge in ('trueSuccessor', 'falseSuccessor') if edge in self.children]
 
-        return False # don't set output automatically
\ No newline at end of file
+    def get_output_for(self, edge):
+        if edge == 'trueSuccessor':
+            return -999, self.controlFlowMultiplicative * self.c
+        return -999, self.controlFlowMultiplicative * (1-self.c)
@@ -1,6 +1,7 @@
 import nodes.BaseNode
 import torch
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.MergeNode')
 class MergeNode(nodes.BaseNode):
     def __init__(self, node):
         super().__init__(node)
@@ -10,14 +11,17 @@ class MergeNode(nodes.BaseNode):
         ends = [item for item in self.inputs.items() if "ends" in item[0] and item[1] is not None]
         ends = [v for k,v in sorted(ends, key=lambda k: k[0])]
         if ends:
-            self.output = torch.tensor(float(ends.index(max(ends))))
+            # index of the strongest incoming path (for each restart of a batch)
+            ends = [torch.as_tensor(end, dtype=torch.get_default_dtype()) for end in ends]
+            ends = torch.stack(torch.broadcast_tensors(*ends))
+            self.output = torch.argmax(ends, dim=0).to(torch.get_default_dtype())
         else:
             self.output = torch.tensor(0.0)
 
-    def add_input(self, input, edge, controlFlowMultiplicative):
+    def receive_input(self, input, slot, edge, controlFlowMultiplicative):
         if "ends" in edge:
             if self.node["id"] == 38:
                 pass
             controlFlowMultiplicative = torch.max(controlFlowMultiplicative, self.controlFlowMultiplicative)
-        super().add_input(input, edge, controlFlowMultiplicative)
+        super().receive_input(input, slot, edge, controlFlowMultiplicative)
 
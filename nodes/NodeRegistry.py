@@ -0,0 +1,38 @@
+# (Graal node class, operation) -> node class
+node_classes = {}
+
+
+class NodeRegistry:
+    """
+    Mapping from the Graal node classes to the node implementations.
+
+    Node classes register themselves with the decorator. Graal classes that stand for several operations (math
+    intrinsics, invoked methods) are registered together with the operation, e.g. the 'operation' prop of a math
+    intrinsic or the target method of an invoke.
+    """
+    INVOKE_NODE_CLASSES = ['jdk.graal.compiler.nodes.InvokeNode', 'jdk.graal.compiler.nodes.InvokeWithExceptionNode']
+    UNARY_MATH_INTRINSIC = 'jdk.graal.compiler.replacements.nodes.UnaryMathIntrinsicNode'
+    BINARY_MATH_INTRINSIC = 'jdk.graal.compiler.replacements.nodes.BinaryMathIntrinsicNode'
+    # invoked FdLibm$<function>.compute methods, the operation is the name of the function
+    FDLIBM = 'FdLibm'
+
+    @staticmethod
+    def register(*graal_classes, operation=None):
+        """
+        Class decorator that registers a node implementation
+
+        :param graal_classes: names of the Graal node classes that are implemented by the class
+        :param operation: operation of the Graal node classes, None if they only have a single one
+        """
+        def decorator(cls):
+            for graal_class in graal_classes:
+                node_classes[(graal_class, operation)] = cls
+            return cls
+        return decorator
+
+    @staticmethod
+    def get(graal_class, operation=None):
+        """
+        :return: the registered node class or None
+        """
+        return node_classes.get((graal_class, operation))
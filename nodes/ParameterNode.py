@@ -1,5 +1,6 @@
 import nodes.BaseNode
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.ParameterNode')
 class ParameterNode(nodes.BaseNode):
 
     def exec(self):
@@ -10,5 +11,5 @@ class ParameterNode(nodes.BaseNode):
         else:
             self.output = list(self.inputs.values())[0]
 
-    def pass_constant_value(self):
-        pass # don't execute parameter nodes of main
+    def triggers_without_inputs(self):
+        return False # don't execute parameter nodes of main
@@ -1,6 +1,10 @@
 import nodes.BaseNode
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.PiNode')
 class PiNode(nodes.BaseNode):
+    foldable = True
+    passthrough_input = 'object'
+    pure = True
 
 
     def exec(self):
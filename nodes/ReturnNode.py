@@ -1,5 +1,6 @@
 import nodes.BaseNode
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.ReturnNode')
 class ReturnNode(nodes.BaseNode):
 
     def exec(self):
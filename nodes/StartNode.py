@@ -1,6 +1,7 @@
 import nodes.BaseNode
 import torch
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.StartNode')
 class StartNode(nodes.BaseNode):
 
     def __init__(self, node):
@@ -11,5 +12,5 @@ class StartNode(nodes.BaseNode):
     def exec(self):
         pass
 
-    def pass_constant_value(self):
-        pass # Don't auto execute!!!
+    def triggers_without_inputs(self):
+        return False # Don't auto execute!!!
@@ -1,12 +1,14 @@
 import nodes.BaseNode
 import torch
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.ValuePhiNode')
 class ValuePhiNode(nodes.BaseNode):
 
     def exec(self):
         vals = [val for key, val in self.inputs.items() if "values" in key]
-        if self.inputs.get('merge', -1) >= 0:
-            merge_factor = self.inputs['merge']
+        merge_factor = self.inputs.get('merge', -1)
+        # a merge input is the index of the taken path and, thus, never negative
+        if isinstance(merge_factor, torch.Tensor) or merge_factor >= 0:
             try:
                 self.output = (1-merge_factor)*vals[0] + merge_factor*vals[1]
             except TypeError:
@@ -14,7 +16,7 @@ class ValuePhiNode(nodes.BaseNode):
         else:
             sum = torch.tensor(0.0)
             for val in vals:
-                sum += val
+                sum = sum + val
 
             self.output = sum
             # TODO: add punishment for having too many non-zero inputs
@@ -1,4 +1,5 @@
 from .BaseNode import BaseNode
+from .NodeRegistry import NodeRegistry
 
 from .calc import *
 from .custom import *
@@ -1,7 +1,9 @@
 import nodes.BaseNode
 import torch
 
+@nodes.NodeRegistry.register(nodes.NodeRegistry.FDLIBM, operation='Asin')
 class AsinNode(nodes.BaseNode):
+    foldable = True
 
 
     def exec(self):
@@ -10,12 +12,9 @@ class AsinNode(nodes.BaseNode):
         key = self.inputs['callTarget']['arguments'] \
             if 'callTarget' in self.inputs else torch.tensor(0.0, requires_grad=True)
 
-        if key < -1:
-            self.node_penalty = 10 - key
-            self.output = torch.tensor(-2.0, requires_grad=True)
-        elif key > 1:
-            self.node_penalty = 10 + key
-            self.output = torch.tensor(2.0, requires_grad=True)
-        else:
-            self.node_penalty = None
-            self.output = torch.asin(key)
+        # evaluated elementwise, so that a batch of restarts can be handled at once
+        below = key < -1
+        above = key > 1
+        valid_key = torch.where(below | above, torch.zeros_like(key), key)
+        self.node_penalty = torch.where(below, 10 - key, torch.where(above, 10 + key, torch.zeros_like(key)))
+        self.output = torch.where(below, torch.tensor(-2.0), torch.where(above, torch.tensor(2.0), torch.asin(valid_key)))
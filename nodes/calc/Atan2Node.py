@@ -1,7 +1,10 @@
 import nodes.BaseNode
 import torch
 
+@nodes.NodeRegistry.register(nodes.NodeRegistry.FDLIBM, operation='Atan2')
 class Atan2Node(nodes.BaseNode):
+    foldable = True
+    pure = True
 
 
     def exec(self):
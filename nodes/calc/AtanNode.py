@@ -1,7 +1,10 @@
 import nodes.BaseNode
 import torch
 
+@nodes.NodeRegistry.register(nodes.NodeRegistry.FDLIBM, operation='Atan')
 class AtanNode(nodes.BaseNode):
+    foldable = True
+    pure = True
 
 
     def exec(self):
@@ -1,6 +1,8 @@
 import nodes.BaseNode
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.calc.ConditionalNode')
 class ConditionalNode(nodes.BaseNode):
+    pure = True
 
     def exec(self):
         # get input
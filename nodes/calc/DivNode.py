@@ -1,7 +1,13 @@
 import nodes.BaseNode
+from nodes.custom.MathFunctions import MathFunctions
 import torch
 
+INTEGER_DIV_NODE_CLASS = 'jdk.graal.compiler.nodes.calc.SignedFloatingIntegerDivNode'
+
+@nodes.NodeRegistry.register(INTEGER_DIV_NODE_CLASS, 'jdk.graal.compiler.nodes.calc.FloatDivNode')
 class DivNode(nodes.BaseNode):
+    pure = True
+    key_props = ('node_class',) # integer and float divisions share the class
 
 
     def exec(self):
@@ -13,10 +19,13 @@ class DivNode(nodes.BaseNode):
         x = self.inputs[x_key]
         y = self.inputs[y_key]
 
-        if not x:
-            x = torch.tensor(0.0, requires_grad=True)
-        if not y:
-            y = torch.tensor(1.0, requires_grad=True)
+        x = MathFunctions.value_or(x, 0.0)
+        y = MathFunctions.value_or(y, 1.0)
 
-        self.output = x / y
+        bits = MathFunctions.concrete_integer_bits(self)
+        if bits is not None and self.node['props']['node_class']['node_class'] == INTEGER_DIV_NODE_CLASS:
+            # Java rounds the quotient of two integers towards zero, Integer.MIN_VALUE / -1 overflows
+            self.output = MathFunctions.java_integer(MathFunctions.java_div, bits, x, y)
+        else:
+            self.output = x / y
 
@@ -1,7 +1,11 @@
 import nodes.BaseNode
 import torch
 
+@nodes.NodeRegistry.register(nodes.NodeRegistry.UNARY_MATH_INTRINSIC, operation='EXP')
+@nodes.NodeRegistry.register(nodes.NodeRegistry.FDLIBM, operation='Exp')
 class ExpNode(nodes.BaseNode):
+    foldable = True
+    pure = True
 
 
     def exec(self):
@@ -1,23 +1,38 @@
 import nodes.BaseNode
+from nodes.custom.MathFunctions import MathFunctions
 import torch
 from nodes.custom.sigmoid import Sigmoid
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.calc.IntegerBelowNode')
 class IntegerBelowNode(nodes.BaseNode):
+    pure = True
+    batchable = True
 
 
-    def exec(self):
+    def get_operands(self):
+        x_key = [key for key in self.inputs.keys() if 'x' in key][0]
+        y_key = [key for key in self.inputs.keys() if 'y' in key][0]
+        x = self.inputs[x_key]
+        y = self.inputs[y_key]
+        x = MathFunctions.value_or(x, 0.0)
+        y = MathFunctions.value_or(y, 0.0)
+        return x, y
+
+    @staticmethod
+    def compute(x, y):
         """
         Check if x is below y and greater than 0
 
+        In the concrete mode, x and y are compared as unsigned integers like Integer.compareUnsigned: the negative
+        values lie above all non-negative ones.
+
         :return:
         """
-        x_key = [key for key in self.inputs.keys() if 'x' in key][0]
-        y_key = [key for key in self.inputs.keys() if 'y' in key][0]
-        x = self.inputs[x_key]
-        y = self.inputs[y_key]
-        if not x:
-            x = torch.tensor(0.0, requires_grad=True)
-        if not y:
-            y = torch.tensor(0.0, requires_grad=True)
-        self.output = Sigmoid.sigmoid(0.1*(y - x)) * Sigmoid.sigmoid(0.1*x)
+        if Sigmoid.is_concrete():
+            x, y = torch.as_tensor(x), torch.as_tensor(y)
+            # the signed comparison is inverted if exactly one of the operands is negative
+            return ((x < y) ^ (x < 0) ^ (y < 0)).to(torch.get_default_dtype())
+        return Sigmoid.sigmoid(0.1*(y - x)) * Sigmoid.sigmoid(0.1*x)
 
+    def exec(self):
+        self.output = self.compute(*self.get_operands())
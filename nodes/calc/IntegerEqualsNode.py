@@ -4,14 +4,21 @@ import nodes.BaseNode
 from nodes.custom.MathFunctions import MathFunctions
 from nodes.custom.sigmoid import Sigmoid
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.calc.IntegerEqualsNode')
 class IntegerEqualsNode(nodes.BaseNode):
+    pure = True
+    batchable = True
 
-    def exec(self):
+    def get_operands(self):
         x = self.inputs['x']
         y = self.inputs['y']
-        if not x:
-            x = torch.tensor(0.0, requires_grad=True)
-        if not y:
-            y = torch.tensor(0.0, requires_grad=True)
-        v = MathFunctions.equals(x, y)
-        self.output = v
+        x = MathFunctions.value_or(x, 0.0)
+        y = MathFunctions.value_or(y, 0.0)
+        return x, y
+
+    @staticmethod
+    def compute(x, y):
+        return MathFunctions.equals(x, y)
+
+    def exec(self):
+        self.output = self.compute(*self.get_operands())
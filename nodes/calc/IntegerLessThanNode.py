@@ -2,21 +2,27 @@ import nodes.BaseNode
 import torch
 from nodes.custom.MathFunctions import MathFunctions
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.calc.IntegerLessThanNode')
 class IntegerLessThanNode(nodes.BaseNode):
+    pure = True
+    batchable = True
 
 
-    def exec(self):
+    def get_operands(self):
         x_key = [key for key in self.inputs.keys() if 'x' in key][0]
         y_key = [key for key in self.inputs.keys() if 'y' in key][0]
         x = self.inputs[x_key]
         y = self.inputs[y_key]
-        if not x:
-            x = torch.tensor(0.0, requires_grad=True)
-        if not y:
-            y = torch.tensor(0.0, requires_grad=True)
+        x = MathFunctions.value_or(x, 0.0)
+        y = MathFunctions.value_or(y, 0.0)
 
         #if self.node['id'] == 32:
         #print('Less than: ', y, ' is less than ', x, MathFunctions.less_than(y, x))
+        return x, y
 
-        self.output = MathFunctions.less_than(x, y)
+    @staticmethod
+    def compute(x, y):
+        return MathFunctions.less_than(x, y)
 
+    def exec(self):
+        self.output = self.compute(*self.get_operands())
@@ -2,6 +2,7 @@ import nodes.BaseNode
 from nodes.custom.sigmoid import Sigmoid
 from nodes.custom.sigmoid import Sigmoid
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.calc.IsNullNode')
 class IsNullNode(nodes.BaseNode):
 
     def exec(self):
@@ -1,8 +1,12 @@
 import nodes.BaseNode
+from nodes.custom.MathFunctions import MathFunctions
 import torch
 import re
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.calc.LeftShiftNode')
 class LeftShiftNode(nodes.BaseNode):
+    foldable = True
+    pure = True
 
     def __init__(self, node):
         super().__init__(node)
@@ -25,5 +29,10 @@ class LeftShiftNode(nodes.BaseNode):
 
         x = self.inputs[x_key]
         y = self.inputs[y_key]
-        self.output = x * (2 ** (y % 32))
+        bits = MathFunctions.concrete_integer_bits(self)
+        if bits is None:
+            self.output = x * (2 ** (y % 32))
+        else:
+            # Java only uses the lowest 5 (int) or 6 (long) bits of the shift distance
+            self.output = MathFunctions.java_integer(lambda a, b: a << (b & (bits - 1)), bits, x, y)
 
@@ -1,7 +1,10 @@
 import nodes.BaseNode
 import torch
 
+@nodes.NodeRegistry.register(nodes.NodeRegistry.UNARY_MATH_INTRINSIC, operation='LOG10')
+@nodes.NodeRegistry.register(nodes.NodeRegistry.FDLIBM, operation='Log10')
 class Log10Node(nodes.BaseNode):
+    foldable = True
 
 
     def exec(self):
@@ -12,10 +15,9 @@ class Log10Node(nodes.BaseNode):
         else:
             key = self.inputs["value"]
 
-        if key <= 0:
-            self.node_penalty = 10 - key
-            self.output = torch.tensor(-1e20, requires_grad=True)
-        else:
-            self.node_penalty = None
-            self.output = torch.log10(key)
+        # evaluated elementwise, so that a batch of restarts can be handled at once
+        invalid = key <= 0
+        valid_key = torch.where(invalid, torch.ones_like(key), key)
+        self.node_penalty = torch.where(invalid, 10 - key, torch.zeros_like(key))
+        self.output = torch.where(invalid, torch.tensor(-1e20), torch.log10(valid_key))
 
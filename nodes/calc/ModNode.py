@@ -1,6 +1,11 @@
 import nodes.BaseNode
+from nodes.custom.MathFunctions import MathFunctions
+from nodes.custom.sigmoid import Sigmoid
+import torch
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.calc.SignedFloatingIntegerRemNode')
 class ModNode(nodes.BaseNode):
+    pure = True
 
 
     def exec(self):
@@ -12,5 +17,12 @@ class ModNode(nodes.BaseNode):
         x = self.inputs[x_key]
         y = self.inputs[y_key]
 
-        self.output = x % y
+        bits = MathFunctions.concrete_integer_bits(self)
+        if bits is not None:
+            # the remainder of Java has the sign of the dividend
+            self.output = MathFunctions.java_integer(MathFunctions.java_rem, bits, x, y)
+        elif Sigmoid.is_concrete():
+            self.output = torch.fmod(x, y)
+        else:
+            self.output = x % y
 
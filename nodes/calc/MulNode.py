@@ -1,20 +1,33 @@
 import nodes.BaseNode
+from nodes.custom.MathFunctions import MathFunctions
 import torch
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.calc.MulNode')
 class MulNode(nodes.BaseNode):
+    foldable = True
+    pure = True
+    batchable = True
 
 
-    def exec(self):
-
+    def get_operands(self):
         #print(self.node['id'], self.inputs)
         x_key = [key for key in self.inputs.keys() if 'x' in key][0]
         y_key = [key for key in self.inputs.keys() if 'y' in key][0]
 
         x = self.inputs[x_key]
         y = self.inputs[y_key]
-        if not x:
-            x = torch.tensor(1.0, requires_grad=True)
-        if not y:
-            y = torch.tensor(1.0, requires_grad=True)
-        self.output = x * y
+        x = MathFunctions.value_or(x, 1.0)
+        y = MathFunctions.value_or(y, 1.0)
+        return x, y
 
+    @staticmethod
+    def compute(x, y):
+        return x * y
+
+    def exec(self):
+        bits = MathFunctions.concrete_integer_bits(self)
+        if bits is None:
+            self.output = self.compute(*self.get_operands())
+        else:
+            # int and long values overflow like in Java
+            self.output = MathFunctions.java_integer(self.compute, bits, *self.get_operands())
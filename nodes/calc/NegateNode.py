@@ -1,6 +1,10 @@
 import nodes.BaseNode
+from nodes.custom.MathFunctions import MathFunctions
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.calc.NegateNode')
 class NegateNode(nodes.BaseNode):
+    foldable = True
+    pure = True
 
 
     def exec(self):
@@ -10,5 +14,10 @@ class NegateNode(nodes.BaseNode):
 
         val = self.inputs[val_key]
 
-        self.output = -val
+        bits = MathFunctions.concrete_integer_bits(self)
+        if bits is None:
+            self.output = -val
+        else:
+            # -Integer.MIN_VALUE overflows to Integer.MIN_VALUE
+            self.output = MathFunctions.java_integer(lambda x: -x, bits, val)
 
@@ -3,6 +3,7 @@ import nodes.BaseNode
 from nodes.custom.MathFunctions import MathFunctions
 from nodes.types.String import String
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.calc.ObjectEqualsNode')
 class ObjectEqualsNode(nodes.BaseNode):
 
 
@@ -13,10 +14,13 @@ class ObjectEqualsNode(nodes.BaseNode):
             x = self.inputs['x']
             y = self.inputs['y']
             v_len = MathFunctions.equals(torch.tensor(x.length), torch.tensor(y.length)) * MathFunctions.equals(x.is_null, y.is_null)
-            v_data = 0
-            for i in range(x.length):
-                v_data += MathFunctions.equals(x.charAt(i, use_gumbel=False), y.charAt(i, use_gumbel=False))
-            v_data /= x.length
+            if x.length > 0:
+                # compare the characters of x with those of y at the same indices in one elementwise operation
+                x_chars = x.get_indexed_char_codes(use_gumbel=False)
+                y_chars = y.get_indexed_char_codes(use_gumbel=False, count=x.length)
+                v_data = torch.mean(MathFunctions.equals(x_chars, y_chars))
+            else:
+                v_data = 1.0 # no characters to compare, only the lengths decide
             self.output = v_len * v_data
         else: # We have some unknown type
             print(f"Currently the ObjectEqualsNode only supports String, "
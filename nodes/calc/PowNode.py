@@ -1,7 +1,11 @@
 import nodes.BaseNode
 import torch
 
+@nodes.NodeRegistry.register(nodes.NodeRegistry.BINARY_MATH_INTRINSIC, operation='POW')
+@nodes.NodeRegistry.register(nodes.NodeRegistry.FDLIBM, operation='Pow')
 class PowNode(nodes.BaseNode):
+    foldable = True
+    pure = True
 
 
     def exec(self):
@@ -16,8 +20,8 @@ class PowNode(nodes.BaseNode):
             x = self.inputs[x_key]
             y = self.inputs[y_key]
 
-        if x < 0:
-            self.output = torch.pow(x, torch.round(y))
-        else:
-            self.output = torch.pow(x, y)
+        # negative bases only allow integer exponents, evaluated elementwise for a batch of restarts
+        negative = x < 0
+        self.output = torch.where(negative, torch.pow(x, torch.round(y)),
+                                  torch.pow(torch.where(negative, torch.ones_like(x), x), y))
 
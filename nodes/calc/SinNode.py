@@ -1,7 +1,11 @@
 import nodes.BaseNode
 import torch
 
+@nodes.NodeRegistry.register(nodes.NodeRegistry.UNARY_MATH_INTRINSIC, operation='SIN')
+@nodes.NodeRegistry.register(nodes.NodeRegistry.FDLIBM, operation='Sin')
 class SinNode(nodes.BaseNode):
+    foldable = True
+    pure = True
 
 
     def exec(self):
@@ -1,7 +1,9 @@
 import nodes.BaseNode
 import torch
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.calc.SqrtNode')
 class SqrtNode(nodes.BaseNode):
+    foldable = True
 
 
     def exec(self):
@@ -9,10 +11,9 @@ class SqrtNode(nodes.BaseNode):
         #print(self.node['id'], self.inputs)
         key = self.inputs["value"]
 
-        if key < 0:
-            self.node_penalty = 10 - key
-            self.output = torch.tensor(0.0, requires_grad=True)
-        else:
-            self.node_penalty = None
-            self.output = torch.sqrt(key)
+        # evaluated elementwise, so that a batch of restarts can be handled at once
+        invalid = key < 0
+        valid_key = torch.where(invalid, torch.ones_like(key), key)
+        self.node_penalty = torch.where(invalid, 10 - key, torch.zeros_like(key))
+        self.output = torch.where(invalid, torch.tensor(0.0), torch.sqrt(valid_key))
 
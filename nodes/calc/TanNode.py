@@ -1,7 +1,11 @@
 import nodes.BaseNode
 import torch
 
+@nodes.NodeRegistry.register(nodes.NodeRegistry.UNARY_MATH_INTRINSIC, operation='TAN')
+@nodes.NodeRegistry.register(nodes.NodeRegistry.FDLIBM, operation='Tan')
 class TanNode(nodes.BaseNode):
+    foldable = True
+    pure = True
 
 
     def exec(self):
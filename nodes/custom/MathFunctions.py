@@ -1,10 +1,92 @@
+import math
+import re
+
 import torch
 from nodes.custom.sigmoid import Sigmoid
 
 class MathFunctions:
 
+    @staticmethod
+    def value_or(x, default):
+        """
+        Replace a missing or zero input by a default value. The concrete mode keeps zeros, like Java.
+
+        :param x: input value, either a scalar or a batch of values
+        :param default: value used instead
+        :return: x or the default value
+        """
+        if x is None:
+            return torch.tensor(default, requires_grad=True)
+        if Sigmoid.is_concrete():
+            return x
+        if isinstance(x, torch.Tensor):
+            # elementwise, so that it works for a batch of restarts and without a python branch on the value
+            return torch.where(x == 0, torch.tensor(default), x)
+        if not x:
+            return torch.tensor(default, requires_grad=True)
+        return x
+
+    @staticmethod
+    def concrete_integer_bits(node):
+        """
+        Bit width of the Java integer arithmetic of a node in the concrete mode
+
+        :param node: node with a stamp, e.g. 'i32 [0 - 10]'. Graal computes byte, short and char values as i32.
+        :return: 32 or 64 for int and long stamps in the concrete mode, else None
+        """
+        if not Sigmoid.is_concrete():
+            return None
+        match = re.match(r'i(32|64)\b', node.node['props'].get('stamp') or '')
+        return int(match.group(1)) if match else None
+
+    @staticmethod
+    def java_integer(operation, bits, *operands):
+        """
+        Apply an integer operation like Java: exactly on the rounded operands, the result wrapped to the two's
+        complement range of the bit width. Operations that Java can't compute (e.g. a division by zero) result in nan.
+
+        :param operation: function of python ints
+        :param bits: bit width of the result, 32 or 64
+        :param operands: tensors or numbers, scalars are broadcast to the batch of the other operands
+        :return: tensor of the results
+        """
+        half = 1 << (bits - 1)
+
+        def apply(*values):
+            if any(isinstance(value, list) for value in values):
+                length = max(len(value) for value in values if isinstance(value, list))
+                return [apply(*(value[i] if isinstance(value, list) else value for value in values))
+                        for i in range(length)]
+            if not all(math.isfinite(value) for value in values):
+                return math.nan
+            try:
+                result = operation(*(round(value) for value in values))
+            except ZeroDivisionError:
+                return math.nan
+            return (result + half) % (2 * half) - half
+
+        values = [torch.as_tensor(operand).tolist() for operand in operands]
+        return torch.tensor(apply(*values), dtype=torch.get_default_dtype())
+
+    @staticmethod
+    def java_div(x, y):
+        """
+        Integer division of Java, the quotient is rounded towards zero
+        """
+        quotient = abs(x) // abs(y)
+        return quotient if (x < 0) == (y < 0) else -quotient
+
+    @staticmethod
+    def java_rem(x, y):
+        """
+        Integer remainder of Java, it has the sign of the dividend
+        """
+        return x - y * MathFunctions.java_div(x, y)
+
     @staticmethod
     def equals(a, b):
+        if Sigmoid.is_concrete():
+            return (torch.as_tensor(a) == torch.as_tensor(b)).to(torch.get_default_dtype())
         #return Sigmoid.sigmoid(-torch.abs(a - b)) * 2 # problem: if equal non-equality can not be reached
         equality = Sigmoid.sigmoid(a - b) * Sigmoid.sigmoid(b - a) * 4
         return equality
@@ -1,3 +1,5 @@
+import threading
+
 import torch
 
 
@@ -6,6 +8,17 @@ import torch
 
 annealing_constant = 0.001
 
+
+class ConcreteMode(threading.local):
+    """
+    Hard decisions and Java integer arithmetic of the concrete execution (see GraalWrapper.ConcreteInterpreter). The
+    mode is set per thread, so a concrete execution doesn't change the relaxed one of another thread.
+    """
+    enabled = False
+
+
+concrete_mode = ConcreteMode()
+
 class Sigmoid:
 
     @staticmethod
@@ -13,6 +26,20 @@ class Sigmoid:
         global annealing_constant
         annealing_constant = constant
 
+    @staticmethod
+    def get_annealing_constant():
+        return annealing_constant
+
+    @staticmethod
+    def set_concrete(enabled):
+        concrete_mode.enabled = enabled
+
+    @staticmethod
+    def is_concrete():
+        return concrete_mode.enabled
+
     @staticmethod
     def sigmoid(x):
+        if concrete_mode.enabled:
+            return (torch.as_tensor(x) > 0).to(torch.get_default_dtype())
         return torch.sigmoid(annealing_constant * x)
@@ -3,6 +3,7 @@ import nodes.BaseNode
 from nodes.custom.MathFunctions import MathFunctions
 from nodes.types.String import String
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.replacements.nodes.ArrayEqualsNode')
 class ArrayEqualsNode(nodes.BaseNode):
 
 
@@ -13,8 +14,10 @@ class ArrayEqualsNode(nodes.BaseNode):
             x = self.inputs['array1']
             y = self.inputs['array2']
             v_len = MathFunctions.equals(x.length, y.length) * MathFunctions.equals(x.is_null, y.is_null)
+            count = int(round(x.length.item()))
             v_data = 0
-            for i in range(int(round(x.length.item()))):
-                v_data += MathFunctions.equals(x.data[i], y.data[i])
-            v_data /= x.length
+            if count > 0:
+                # compare all elements within the length of x in one elementwise operation
+                v_data = torch.sum(MathFunctions.equals(x.data[:count], y.data[:count]), dim=0)
+            v_data = v_data / x.length
             self.output = v_len * v_data
@@ -2,6 +2,7 @@ import nodes.BaseNode
 from nodes.custom.sigmoid import Sigmoid
 import torch
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.java.ArrayLengthNode')
 class ArrayLengthNode(nodes.BaseNode):
 
     def exec(self):
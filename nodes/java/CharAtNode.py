@@ -2,6 +2,7 @@ import nodes.BaseNode
 import torch
 
 
+@nodes.NodeRegistry.register(*nodes.NodeRegistry.INVOKE_NODE_CLASSES, operation='String.charAt')
 class CharAtNode(nodes.BaseNode):
 
     def exec(self):
@@ -4,6 +4,7 @@ from nodes.custom.MathFunctions import MathFunctions
 from nodes.custom.sigmoid import Sigmoid
 
 
+@nodes.NodeRegistry.register(*nodes.NodeRegistry.INVOKE_NODE_CLASSES, operation='String.indexOf')
 class IndexOfNode(nodes.BaseNode):
     """
     Implements differentiable String.indexOf() operation.
@@ -40,46 +41,27 @@ class IndexOfNode(nodes.BaseNode):
             self.output = torch.tensor(-1.0, requires_grad=True)
             return
 
-        match_scores = []
-        position_values = []
-
-        for start_pos in range(haystack.length - needle.length + 1):
-            char_matches = []
-            for i in range(needle.length):
-                hay_char = haystack.charAt(start_pos + i, use_gumbel=False)
-                needle_char = needle.charAt(i, use_gumbel=False)
-
-                match = MathFunctions.equals(hay_char, needle_char)
-                char_matches.append(match)
-
-            if len(char_matches) > 0:
-                char_matches_stack = torch.stack(char_matches)
-
-                epsilon = 1e-10
-                char_matches_clipped = torch.clamp(char_matches_stack, min=epsilon)
-
-                log_mean = torch.mean(torch.log(char_matches_clipped))
-                position_match = torch.exp(log_mean)
-            else:
-                # Empty needle - should match at position 0
-                position_match = torch.tensor(1.0, requires_grad=True)
-
-            match_scores.append(position_match)
-            position_values.append(torch.tensor(float(start_pos), requires_grad=True))
-
-        best_match_score = torch.max(torch.stack(match_scores))
-
-        weighted_positions = []
-        for score, pos in zip(match_scores, position_values):
-            weighted_positions.append(score * pos)
+        start_positions = haystack.length - needle.length + 1
+        if needle.length > 0:
+            # the characters of every alignment of the needle, one row per start position
+            hay_chars = haystack.get_indexed_char_codes(use_gumbel=False).unfold(0, needle.length, 1)
+            needle_chars = needle.get_indexed_char_codes(use_gumbel=False)
+            char_matches = MathFunctions.equals(hay_chars, needle_chars.unsqueeze(0))
+
+            # geometric mean of the character matches of each alignment
+            epsilon = 1e-10
+            char_matches_clipped = torch.clamp(char_matches, min=epsilon)
+            match_scores = torch.exp(torch.mean(torch.log(char_matches_clipped), dim=1))
+        else:
+            # Empty needle - matches at every position
+            match_scores = torch.ones(start_positions, dtype=torch.float64)
+        position_values = torch.arange(start_positions, dtype=torch.float64)
 
-        if len(weighted_positions) > 0:
-            weighted_sum = torch.sum(torch.stack(weighted_positions))
-            total_weight = torch.sum(torch.stack(match_scores))
+        best_match_score = torch.max(match_scores)
 
-            epsilon = torch.tensor(1e-10, requires_grad=True)
-            found_index = weighted_sum / (total_weight + epsilon)
-        else:
-            found_index = torch.tensor(0.0, requires_grad=True)
+        weighted_sum = torch.sum(match_scores * position_values)
+        total_weight = torch.sum(match_scores)
+        epsilon = 1e-10
+        found_index = weighted_sum / (total_weight + epsilon)
 
         self.output = -1.0 + (found_index + 1.0) * best_match_score
@@ -1,6 +1,7 @@
 import torch
 import nodes.BaseNode
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.java.LoadFieldNode')
 class LoadFieldNode(nodes.BaseNode):
 
     def exec(self):
@@ -12,6 +13,6 @@ class LoadFieldNode(nodes.BaseNode):
                 obj_arr = nodes.types.Array()
                 obj_arr.is_null = torch.tensor(1.0, requires_grad=True)
             else:
-                obj_arr = nodes.types.Array([obj_str.charAt(i) for i in range(obj_str.length)],
-                                        torch.tensor(float(obj_str.length)))
+                # one Gumbel sample for all characters, its rows are independent anyway
+                obj_arr = nodes.types.Array(obj_str.get_indexed_char_codes(), torch.tensor(float(obj_str.length)))
             self.output = obj_arr
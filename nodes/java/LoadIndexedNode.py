@@ -4,6 +4,7 @@ from nodes.custom.sigmoid import Sigmoid
 import torch
 
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.java.LoadIndexedNode')
 class LoadIndexedNode(nodes.BaseNode):
 
 
@@ -21,16 +22,6 @@ class LoadIndexedNode(nodes.BaseNode):
         self.node_penalty = self.node_penalty + Sigmoid.sigmoid((idx + 1.0) - input_array.length)
         #input_array.length = torch.max(input_array.length, (idx + 1.0) * self.controlFlowMultiplicative) # zero based
 
-        # Find a weighted distance value for the given index
-        distance_values = []
-        for i in range(len(input_array.data)):
-            distance_values.append(MathFunctions.equals(i, idx))
-
-        weighted_distance_values = torch.softmax(torch.tensor(distance_values), dim=0)
-
-        if isinstance(input_array.data[0], torch.Tensor):
-            final_value = 0
-            for i in range(len(input_array.data)):
-                final_value += input_array.data[i] * weighted_distance_values[i]
-            self.output = final_value
+        # weighted sum of all elements, weighted by how well their position matches the index
+        self.output = input_array.load(idx)
 
@@ -1,18 +1,38 @@
 from nodes.types import BaseType
+from nodes.custom.MathFunctions import MathFunctions
+from nodes.custom.sigmoid import Sigmoid
 import torch
 
 class Array(BaseType):
+    """
+    Array of numbers backed by a single tensor.
 
-    length = torch.tensor(0.0, requires_grad=True)
-    data = []
+    The tensor holds `capacity` elements, of which the first `length` belong to the array. The length is a tensor on its
+    own, so it stays differentiable while the storage keeps its size. Elements are accessed by a soft gather over all
+    elements, so an index that is still being optimized gets a gradient.
+    """
+    default_capacity = 10
+    default_value = 42.0
 
-    def __init__(self, data=None, length=torch.tensor(0.0, requires_grad=True)):
+    def __init__(self, data=None, length=None, capacity=None):
+        """
+        :param data: tensor or list of scalar tensors with the first elements
+        :param length: length of the array as a tensor
+        :param capacity: number of stored elements, Array.default_capacity by default, at least the size of the data
+        """
         super().__init__()
-        self.length = length
-        if not data:
-            data = [torch.tensor(42.0, requires_grad=True) for _ in range(10)]
-        if len(data) < 10:
-            data.extend([torch.tensor(42.0, requires_grad=True) for _ in range(10 - len(data))])
+        self.length = length if length is not None else torch.tensor(0.0, requires_grad=True)
+        if capacity is None:
+            capacity = Array.default_capacity
+        if data is None or len(data) == 0:
+            self.data = torch.full((capacity,), Array.default_value, requires_grad=True)
+            return
+        if not isinstance(data, torch.Tensor):
+            data = torch.stack(list(data))
+        if len(data) < capacity:
+            padding = torch.full((capacity - len(data),) + tuple(data.shape[1:]), Array.default_value,
+                                 dtype=data.dtype)
+            data = torch.cat([data, padding])
         self.data = data
 
     def reset(self):
@@ -20,23 +40,41 @@ class Array(BaseType):
         #if self.length < 0:
         #    self.length = torch.tensor(0.1) # length < 0 is not possible
 
+    def get_index_weights(self, index):
+        """
+        Weight of every element for an access at the given index
+
+        :param index: index as a tensor, either a scalar or a batch of indices
+        :return: tensor of the shape (capacity, *index.shape) that sums up to 1 along the first dimension
+        """
+        index = torch.as_tensor(index)
+        positions = torch.arange(len(self.data), dtype=torch.get_default_dtype())
+        positions = positions.reshape((-1,) + (1,) * index.dim())
+        matches = MathFunctions.equals(positions, index)
+        if Sigmoid.is_concrete():
+            return matches # exactly one element matches
+        return torch.softmax(matches, dim=0)
+
+    def load(self, index):
+        """
+        Soft gather of the element at the given index
+
+        :param index: index as a tensor, either a scalar or a batch of indices
+        :return: the weighted sum of all elements
+        """
+        weights = self.get_index_weights(index)
+        data = self.data.reshape(self.data.shape + (1,) * (weights.dim() - self.data.dim()))
+        return torch.sum(weights * data, dim=0)
+
     def to_string(self):
         result = f"[Array length: {self.length}, is_null: {self.is_null}, data="
         for d in self.data:
-            if isinstance(d, torch.Tensor):
-                result += ', ' + str(d.item())
-            elif isinstance(d, BaseType):
-                result += ', ' + str(d.to_string())
+            result += ', ' + str(d.tolist())
         result += ']'
 
         return result
 
     def get_optimize_parameter(self):
-        data_optimize_parameter = []
-        for d in self.data:
-            # check if the data is a tensor
-            if isinstance(d, torch.Tensor):
-                data_optimize_parameter.append(d)
-            elif isinstance(d, BaseType):
-                data_optimize_parameter += d.get_optimize_parameter()
-        return super().get_optimize_parameter() + [self.length] + data_optimize_parameter
\ No newline at end of file
+        # the data is only optimized if it isn't computed from other values
+        data_optimize_parameter = [self.data] if self.data.is_leaf and self.data.requires_grad else []
+        return super().get_optimize_parameter() + [self.length] + data_optimize_parameter
@@ -19,12 +19,23 @@ class String(BaseType):
         " !\"'(),-./:;?[]_"
     )
     vocab_codes = None  # Will be initialized on first use
-
-    def __init__(self, length=10, initialization_bias='uniform', initialization_words=[]):
+    # position weights of charAt, they only depend on the length and the index, keyed by (length, index) for the
+    # integral indices within the string and by (length, None, number of indices) for get_position_weights. Other
+    # indices are computed on every call, so the size stays bounded by the lengths in use.
+    position_weights = {}
+
+    def __init__(self, length=10, initialization_bias='uniform', initialization_words=[], logits=None):
+        """
+        :param logits: matrix of the initial logits with one row per character, e.g. of a constant. The logits are
+                       drawn at random and biased by initialization_bias and initialization_words if None.
+        """
         super().__init__()
 
         self.length = length
         self.vocab_size = len(String.vocab)
+        # values derived from the logits, valid until the optimizer changes them (see get_cache)
+        self.cache_key = None
+        self.cache = {}
 
         # Initialize vocab_codes tensor if not already done
         if String.vocab_codes is None:
@@ -33,6 +44,11 @@ class String(BaseType):
                 dtype=torch.float64
             )
 
+        if logits is not None:
+            # no random numbers are drawn, e.g. for the pure constant nodes
+            self.logits = logits
+            return
+
         # Initialize logits matrix with small random values
         # IMPORTANT: Must create as leaf tensor for optimizer
         self.logits = torch.randn(length, self.vocab_size, requires_grad=True)
@@ -78,39 +94,94 @@ class String(BaseType):
 
         return soft_samples
 
+    def get_cache(self):
+        """
+        Values that only depend on the logits and the temperature, so they are computed once per iteration.
+        The optimizer changes the logits in place, which increments their version and thereby invalidates the cache.
+        """
+        key = (self.logits._version, String.temperature, torch.is_grad_enabled())
+        if key != self.cache_key:
+            self.cache_key = key
+            self.cache = {}
+        return self.cache
+
     def get_char_probs(self):
-        return F.softmax(self.logits / String.temperature, dim=1)
+        cache = self.get_cache()
+        if 'char_probs' not in cache:
+            cache['char_probs'] = F.softmax(self.logits / String.temperature, dim=1)
+        return cache['char_probs']
 
     def get_char_codes(self, use_gumbel=True):
         if use_gumbel:
-            char_probs = self.gumbel_softmax()
-        else:
-            char_probs = self.get_char_probs()
-        char_codes = torch.matmul(char_probs, String.vocab_codes)
-        return char_codes
+            # a new sample for every call
+            return torch.matmul(self.gumbel_softmax(), String.vocab_codes)
+        cache = self.get_cache()
+        if 'char_codes' not in cache:
+            cache['char_codes'] = torch.matmul(self.get_char_probs(), String.vocab_codes)
+        return cache['char_codes']
 
     def charAt(self, index, use_gumbel=True):
         # For string charAt operations, we want SHARP indexing, not soft blending
         # Use temperature-controlled selection that becomes sharp during optimization
+        key = self.get_position_key(index)
+        if key is None:
+            position_weights = self.compute_position_weights(index)
+        else:
+            if key not in String.position_weights:
+                String.position_weights[key] = self.compute_position_weights(key[1])
+            position_weights = String.position_weights[key]
+
+        # the code of every position, blended by the weights of the positions
+        return torch.sum(position_weights * self.get_char_codes(use_gumbel=use_gumbel), dim=-1)
+
+    def get_position_key(self, index):
+        """
+        :return: key of the cached position weights of the index, None if they aren't cached
+        """
+        if isinstance(index, torch.Tensor):
+            if index.requires_grad or index.dim() != 0:
+                return None
+            index = index.item()
+        if index != int(index) or not 0 <= index < self.length:
+            return None
+        return self.length, int(index)
+
+    def compute_position_weights(self, index):
+        """
+        :param index: single index or tensor of indices
+        :return: weights of the positions in the last dimension, one row for every index of a tensor of indices
+        """
         temperature_scale = 0.1  # Controls sharpness (lower = sharper)
 
         # Compute distances from each position to target index
         positions = torch.arange(self.length, dtype=torch.float64)
-        distances = -torch.abs(positions - index) / temperature_scale
-        position_weights = torch.softmax(distances, dim=0)
-
-        if use_gumbel:
-            char_probs = self.gumbel_softmax()
-        else:
-            char_probs = self.get_char_probs()
-
-        blended_probs = torch.sum(
-            char_probs * position_weights.unsqueeze(1),
-            dim=0
-        )
-
-        expected_code = torch.sum(blended_probs * String.vocab_codes)
-        return expected_code
+        index = torch.as_tensor(index, dtype=torch.float64)
+        distances = -torch.abs(positions - index.unsqueeze(-1)) / temperature_scale
+        return torch.softmax(distances, dim=-1)
+
+    def get_position_weights(self, count=None):
+        """
+        Position weights of charAt for several indices at once, row i holds the weights of charAt(i)
+
+        :param count: number of indices, the length of the string by default
+        """
+        key = (self.length, None, self.length if count is None else count)
+        if key not in String.position_weights:
+            temperature_scale = 0.1  # same sharpness as in charAt
+            positions = torch.arange(self.length, dtype=torch.float64)
+            indices = torch.arange(key[2], dtype=torch.float64)
+            distances = -torch.abs(indices.unsqueeze(1) - positions.unsqueeze(0)) / temperature_scale
+            String.position_weights[key] = torch.softmax(distances, dim=1)
+        return String.position_weights[key]
+
+    def get_indexed_char_codes(self, use_gumbel=True, count=None):
+        """
+        charAt(i) for the indices 0 to count - 1 with a single matrix product
+
+        :param count: number of indices, the length of the string by default
+        :return: tensor with the expected character code of every index
+        """
+        return torch.matmul(self.get_position_weights(count), self.get_char_codes(use_gumbel=use_gumbel))
 
     def to_string(self, use_gumbel=False):
         if use_gumbel:
@@ -127,6 +198,13 @@ class String(BaseType):
     def get_optimize_parameter(self):
         return super().get_optimize_parameter() + [self.logits]
 
+    def __getstate__(self):
+        # the cached tensors belong to the autograd graph of an iteration, they can't be copied
+        state = self.__dict__.copy()
+        state['cache_key'] = None
+        state['cache'] = {}
+        return state
+
     def reset(self):
         pass
 
@@ -1,5 +1,6 @@
 import nodes
 
+@nodes.NodeRegistry.register('com.oracle.svm.core.graal.nodes.ThrowBytecodeExceptionNode', 'jdk.graal.compiler.nodes.extended.BytecodeExceptionNode')
 class ThrowBytecodeExceptionNode(nodes.BaseNode):
 
     def exec(self):
@@ -1,6 +1,7 @@
 import nodes.BaseNode
 import nodes
 
+@nodes.NodeRegistry.register('com.oracle.svm.core.nodes.SubstrateMethodCallTargetNode')
 class SubstrateMethodCallTargetNode(nodes.BaseNode):
 
 
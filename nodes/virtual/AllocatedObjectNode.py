@@ -1,6 +1,8 @@
 import nodes.BaseNode
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.virtual.AllocatedObjectNode')
 class AllocatedObjectNode(nodes.BaseNode):
+    passthrough_input = 'commit'
 
     def exec(self):
         self.output = self.inputs['commit']
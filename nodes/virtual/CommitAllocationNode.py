@@ -1,5 +1,6 @@
 import nodes.BaseNode
 
+@nodes.NodeRegistry.register('jdk.graal.compiler.nodes.virtual.CommitAllocationNode')
 class CommitAllocationNode(nodes.BaseNode):
 
     def exec(self):
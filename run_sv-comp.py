@@ -19,7 +19,7 @@ def main():
         output = None
         res = test.main(start_file, None, None, auto_detect_start_end=True,
                         test_dir="SUT/", use_sv_helpers=False, test_class="Main", return_successfull_output=True,
-                        num_iterations=500, verbose=False)
+                        num_iterations=500, verbose=False, batch_size=1)
         if type(res) == tuple:
             res, output = res
         match res:
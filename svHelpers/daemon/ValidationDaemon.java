@@ -0,0 +1,94 @@
+import java.io.BufferedInputStream;
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.DataInputStream;
+import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+
+/**
+ * Runs the main method of a test class for many inputs in a single JVM.
+ *
+ * Usage: java ValidationDaemon <class path> <main class> <stdout file> <stderr file>
+ *
+ * Every request on stdin is a line with the number of bytes of the input, followed by the input (the lines that
+ * Verifier reads from System.in). The main class is loaded by a new class loader with assertions enabled for every
+ * request, so the static state of the test and of Verifier starts fresh. The output of the test is written to the
+ * given files, since the test can end the JVM (e.g. Verifier.assume) before the reply is sent. The reply is a line
+ * with the exit code that "java -ea <main class>" would have returned.
+ */
+public final class ValidationDaemon {
+    public static void main(String[] args) throws IOException {
+        String[] classPath = args[0].split(File.pathSeparator);
+        URL[] urls = new URL[classPath.length];
+        for (int i = 0; i < classPath.length; i++) {
+            urls[i] = new File(classPath[i]).toURI().toURL();
+        }
+        String mainClass = args[1];
+        File stdoutFile = new File(args[2]);
+        File stderrFile = new File(args[3]);
+
+        DataInputStream requests = new DataInputStream(new BufferedInputStream(System.in));
+        PrintStream replies = new PrintStream(new FileOutputStream(FileDescriptor.out), true);
+        String line;
+        while ((line = readLine(requests)) != null) {
+            byte[] input = new byte[Integer.parseInt(line.trim())];
+            requests.readFully(input);
+            replies.println(run(urls, mainClass, input, stdoutFile, stderrFile));
+        }
+    }
+
+    private static int run(URL[] urls, String mainClass, byte[] input, File stdoutFile, File stderrFile)
+            throws IOException {
+        InputStream originalIn = System.in;
+        PrintStream originalOut = System.out;
+        PrintStream originalErr = System.err;
+        // the output streams are not buffered, everything that was printed is in the files when the test halts
+        try (PrintStream out = new PrintStream(new FileOutputStream(stdoutFile), true);
+             PrintStream err = new PrintStream(new FileOutputStream(stderrFile), true);
+             URLClassLoader loader = new URLClassLoader(urls, ClassLoader.getPlatformClassLoader())) {
+            loader.setDefaultAssertionStatus(true);
+            System.setIn(new ByteArrayInputStream(input));
+            System.setOut(out);
+            System.setErr(err);
+            try {
+                Method main = loader.loadClass(mainClass).getMethod("main", String[].class);
+                main.setAccessible(true); // the main class is usually package-private
+                main.invoke(null, (Object) new String[0]);
+                return 0;
+            } catch (InvocationTargetException e) {
+                err.print("Exception in thread \"main\" ");
+                e.getCause().printStackTrace(err);
+                return 1;
+            } catch (ReflectiveOperationException | LinkageError e) {
+                err.println("Error: Could not find or load main class " + mainClass);
+                e.printStackTrace(err);
+                return 1;
+            }
+        } finally {
+            System.setIn(originalIn);
+            System.setOut(originalOut);
+            System.setErr(originalErr);
+        }
+    }
+
+    private static String readLine(DataInputStream stream) throws IOException {
+        ByteArrayOutputStream line = new ByteArrayOutputStream();
+        int b;
+        while ((b = stream.read()) != '\n') {
+            if (b < 0) {
+                return line.size() > 0 ? line.toString(StandardCharsets.US_ASCII) : null;
+            }
+            line.write(b);
+        }
+        return line.toString(StandardCharsets.US_ASCII);
+    }
+}
@@ -1,6 +1,5 @@
 from collections import defaultdict
 
-import copy
 import traceback
 
 import torch
@@ -16,6 +15,8 @@ from GraalWrapper.InputNodeTypes import input_node_tuple, TYPE_CONV_INT, TYPE_CO
 import random
 from datetime import datetime, timedelta
 import math
+import multiprocessing
+import sys
 
 # create graph for TEst 1:
 # docker run --rm -v $(pwd)/SUTs/Test1:/SUT graph-extractor
@@ -27,6 +28,18 @@ STATE_CORRECT = 3
 STATE_INCORRECT = 4
 STATE_ERROR = 5
 
+BACKEND_SCHEDULE = 'schedule' # execute the nodes one by one
+BACKEND_TORCHSCRIPT = 'torchscript' # trace the graph once into a TorchScript function if possible
+BACKEND_BATCHED = 'batched' # execute nodes of the same class whose inputs are complete with one tensor operation
+BACKEND_TAPE = 'tape' # execute the graph on the NumPy tape of GraalWrapper.TapeAutograd if possible
+
+TIME_BUDGET = timedelta(minutes=10)
+CONCRETE_CHECK_INTERVAL = 50 # iterations between two concrete executions of the rounded inputs
+PARALLEL_SEED = 42
+
+# state of main_parallel, inherited by the forked workers
+worker_context = {}
+
 
 def print_has_output(original_seafom_graph, graph):
 
@@ -46,7 +59,8 @@ def print_has_output(original_seafom_graph, graph):
 
         print(f'{edge["from"]} -> {edge["to"]}')
 
-def run_optimization(graph, input_ids, output_id, graph_builder, verbose=False, I_all=None):
+def run_optimization(graph, input_ids, output_id, graph_builder, verbose=False, I_all=None, backend=BACKEND_SCHEDULE,
+                     concretize=None):
     # Set input
     input_ids = sorted(input_ids)
     #I_all = [torch.tensor(42.0, requires_grad=True) for _ in range(len(input_ids))]
@@ -54,7 +68,53 @@ def run_optimization(graph, input_ids, output_id, graph_builder, verbose=False,
         I_all = get_start_values(len(input_ids))
     #I_1 = torch.tensor(21.0, requires_grad=True)
     #input_obj = nodes.types.Array(initialization_fct=lambda : nodes.types.String())
-
+    return optimize_tries(graph, input_ids, output_id, graph_builder, I_all, verbose=verbose, backend=backend,
+                          concretize=concretize)[0]
+
+def run_optimization_batched(graph, input_ids, output_id, graph_builder, verbose=False, I_batch=None,
+                             backend=BACKEND_SCHEDULE):
+    """
+    Run several independent tries of run_optimization at once. The start values of all tries are stacked into one
+    tensor per input, so every iteration executes the graph only once for the whole batch.
+    Only scalar inputs are supported.
+
+    :param I_batch: list of start values (as returned by get_start_values), one entry per try
+    :return: list of results, one per try
+    """
+    input_ids = sorted(input_ids)
+    I_all = [torch.tensor([float(I[idx].detach()) for I in I_batch], requires_grad=True) for idx in range(len(input_ids))]
+    return optimize_tries(graph, input_ids, output_id, graph_builder, I_all, batch_size=len(I_batch), verbose=verbose,
+                          backend=backend)
+
+def get_try_values(I_all, batch_index=None):
+    """
+    :param batch_index: index of the try in batched inputs, None for the inputs of a single try
+    :return: the values of a try, numbers for scalar inputs and the objects of complex types (e.g. String)
+    """
+    if batch_index is not None:
+        return [x[batch_index].item() for x in I_all]
+    return [x.item() if hasattr(x, 'item') else x for x in I_all]
+
+def format_value(value):
+    return value.to_string() if hasattr(value, 'to_string') else value
+
+def optimize_tries(graph, input_ids, output_id, graph_builder, I_all, batch_size=None, verbose=False,
+                   backend=BACKEND_SCHEDULE, concretize=None):
+    """
+    Optimization loop of run_optimization and run_optimization_batched
+
+    With a batch_size, every input holds the values of batch_size independent tries along its only dimension. The
+    graph computes one loss per try, Adam updates every value on its own and every try stops on its own once its loss
+    converged, so a try ends with the same result as if it was optimized alone.
+
+    :param input_ids: sorted ids of the input nodes
+    :param I_all: start values of the inputs, in the order of the input ids
+    :param batch_size: number of tries in the inputs, None for a single try
+    :param concretize: maps the inputs to the values the test receives, the optimization stops once they reach the
+                       target. Only supported for a single try.
+    :return: list of results, one per try
+    """
+    tries = range(1 if batch_size is None else batch_size)
 
     # Number of iterations
     iteration_factor = 1 # use iteration_factor to increase number of iterations while maintaining sigmoid annealing
@@ -74,9 +134,26 @@ def run_optimization(graph, input_ids, output_id, graph_builder, verbose=False,
         else:
             # Scalar tensor
             optimize_params.append(inp)
+    # Adam works elementwise, hence, the tries of a batch don't influence each other
     optimizer = optim.Adam(optimize_params, lr=initial_lr)
 
 
+    # precompute the order in which the nodes are executed
+    schedule = graph_builder.get_schedule(input_ids, graph, [output_id], batched=backend == BACKEND_BATCHED)
+    compiled = None
+    if backend == BACKEND_TORCHSCRIPT:
+        compiled = GraalWrapper.CompiledGraph.compile(schedule, output_id, I_all)
+    elif backend == BACKEND_TAPE and batch_size is None:
+        compiled = GraalWrapper.TapeGraph.compile(schedule, output_id, I_all)
+        if compiled is not None:
+            # the tape optimizes its own copies of the inputs
+            I_all = compiled.input_values
+            optimizer = GraalWrapper.TapeAutograd.Adam(I_all, lr=initial_lr)
+    interpreter = None
+    if concretize is not None and batch_size is None:
+        interpreter = compiled if isinstance(compiled, GraalWrapper.TapeGraph) \
+            else GraalWrapper.ConcreteInterpreter(schedule, output_id)
+
     # calculate the delta
     sigmoid_annealing_delta = sigmoid_annealing_end - sigmoid_annealing_start
 
@@ -84,7 +161,19 @@ def run_optimization(graph, input_ids, output_id, graph_builder, verbose=False,
     temp_start = 2.0  # High temperature: smooth, exploratory
     temp_end = 0.1    # Low temperature: sharp, exploitative
 
-    previous_loss = 100.0
+    previous_loss = [100.0 for _ in tries]
+    results = [None for _ in tries] # results of the tries that stopped
+
+    def stop_try(b, iteration, loss_value):
+        # the nodes have to hold the state of the last run, which was executed with the current values
+        torch_values = compiled.to_torch(I_all) if isinstance(compiled, GraalWrapper.TapeGraph) else I_all
+        if compiled is not None:
+            compiled.sync_nodes(torch_values)
+        batch_index = None if batch_size is None else b
+        walked_graph = graph_builder.reconstruct_path_through_graph(0, output_id, batch_index=batch_index)
+        all_values = get_try_values(torch_values, batch_index)
+        values = [x if idx in walked_graph else None for idx, x in zip(input_ids, all_values)]
+        results[b] = {"iteration": iteration, "loss": loss_value, "values": values, "all_values": all_values}
 
     for i in range(num_iterations):
         optimizer.zero_grad()  # Zero the gradients
@@ -99,92 +188,67 @@ def run_optimization(graph, input_ids, output_id, graph_builder, verbose=False,
         nodes.types.String.set_temperature(temperature)
 
         #input_obj.reset()
-        for node in graph.values():
-            node.reset_inputs()
-
-        # Don't let the start node auto-trigger
-        for start_node in input_ids:
-            graph[start_node].desired_inputs = -1
-
-        # trigger all constant values to pass on values
-        for node in graph.values():
-            if node.node['id'] in input_ids:
-                continue
-
-            node.pass_constant_value()
-
-
-        # set the input of the start node, thus, triggering the overall execution
-        for idx in range(len(input_ids)):
-            graph[input_ids[idx]].controlFlowMultiplicative = torch.tensor(1.0, requires_grad=True)
-            graph[input_ids[idx]].set_output(I_all[idx]) # set input
+        if compiled is not None:
+            target_multiplicative, penalities = compiled(I_all)
+            loss = -target_multiplicative
+        else:
+            # set the input of the start node, thus, triggering the overall execution
+            schedule.run(I_all)
 
-        # print_has_output(original_seafom_graph, graph)
-        # return
+            # print_has_output(original_seafom_graph, graph)
+            # return
 
-        #print_has_output(original_seafom_graph=original_seafom_graph, graph=graph)
-        #return
-        #print(graph[56].controlFlowMultiplicative)
-        #return
+            #print_has_output(original_seafom_graph=original_seafom_graph, graph=graph)
+            #return
+            #print(graph[56].controlFlowMultiplicative)
+            #return
 
-        # Compute the loss
-        loss = -graph[output_id].controlFlowMultiplicative
-        penalities = 0.0
-        for node in graph.values():
-            if node.node_penalty is not None:
-                penalities += node.node_penalty
+            # Compute the loss
+            loss = -graph[output_id].controlFlowMultiplicative
+            penalities = 0.0
+            for node in graph.values():
+                if node.node_penalty is not None:
+                    penalities += node.node_penalty
 
         #print('Output loss:', -graph[output_id].controlFlowMultiplicative)
         #print('Penalities:', penalities)
         loss += penalities
+        if batch_size is None:
+            loss_values = [loss.item()]
+        else:
+            # nodes that don't depend on the inputs compute a single value for all tries
+            loss = torch.broadcast_to(loss, (batch_size,))
+            loss_values = loss.detach().tolist()
         # Print the progress
-        if i >= 1000 and (abs(previous_loss-loss.item()) < min_loss_delta or math.isnan(loss.item())):
-            values_str = []
-            for x in I_all:
-                if hasattr(x, 'item'):
-                    values_str.append(x.item())
-                elif hasattr(x, 'to_string'):
-                    values_str.append(x.to_string())
-                else:
-                    values_str.append(str(x))
-            print(f'Stopped early at iteration {i}: Values={values_str} Loss={loss.item()}')
-            break
+        if i >= 1000:
+            for b in tries:
+                if results[b] is None and (abs(previous_loss[b] - loss_values[b]) < min_loss_delta
+                                           or math.isnan(loss_values[b])):
+                    stop_try(b, i, loss_values[b])
+                    values_str = [format_value(x) for x in results[b]['all_values']]
+                    print(f'Stopped early at iteration {i}: Values={values_str} Loss={loss_values[b]}')
+            if all(result is not None for result in results):
+                break
         if verbose:
-            values_str = []
-            for x in I_all:
-                if hasattr(x, 'item'):
-                    values_str.append(f"{x.item():.2f}")
-                elif hasattr(x, 'to_string'):
-                    values_str.append(x.to_string())
-                else:
-                    values_str.append(str(x))
-            print(f"Iteration {i}: Values={values_str} Loss={loss.item()}")
-        previous_loss = loss.item()
-        loss.backward()  # Compute gradients
+            values_str = [[f"{x:.2f}" if isinstance(x, float) else format_value(x)
+                           for x in get_try_values(I_all, None if batch_size is None else b)] for b in tries]
+            print(f"Iteration {i}: Values={values_str[0] if batch_size is None else values_str} "
+                  f"Loss={loss_values[0] if batch_size is None else loss_values}")
+        if interpreter is not None and i % CONCRETE_CHECK_INTERVAL == CONCRETE_CHECK_INTERVAL - 1:
+            concrete_values = concretize(I_all)
+            if concrete_values is not None and interpreter.reaches_target(concrete_values):
+                print(f'Target reached at iteration {i}: Values={[v.item() for v in concrete_values]} '
+                      f'Loss={loss_values[0]}')
+                stop_try(0, i, loss_values[0])
+                break
+        previous_loss = loss_values
+        (loss if batch_size is None else loss.sum()).backward()  # Compute gradients
         optimizer.step()  # Update parameters
 
-
-    walked_graph = graph_builder.reconstruct_path_through_graph(0, output_id)
-    #
-    # for node in graph.values():
-    #     # node id and penalty
-    #     label = f"{node.node['id']}: {node.controlFlowMultiplicative}"
-    #     if node.executed:
-    #         print(f'{node.node["id"]}[style=filled, label="{label}"]')
-    #     else:
-    #         print(f'{node.node["id"]}[label="{label}"]')
-    # Final value of I_0
-    values = []
-    for idx, x in zip(input_ids, I_all):
-        if idx not in walked_graph:
-            values.append(None)
-        elif hasattr(x, 'item'):
-            values.append(x.item())
-        else:
-            # Complex object (String, etc.)
-            values.append(x)
-    return {"iteration": i, "loss": loss.item(), "values": values,
-            "all_values": [x.item() if hasattr(x, 'item') else x for x in I_all]}
+    for b in tries:
+        if results[b] is None:
+            stop_try(b, i, loss_values[b])
+    return results
 
 def get_start_values(start_nodes, constant_nodes):
     if not constant_nodes:
@@ -354,12 +418,17 @@ def get_graph_builder(target_file, work_dir):
     return graph_builder
 
 def main(target_file, start_nodes, end_nodes, auto_detect_start_end=False, test_dir=None, test_class=None,
-         use_sv_helpers=True, return_successfull_output=False, num_iterations=1, verbose=False):
+         use_sv_helpers=True, return_successfull_output=False, num_iterations=1, verbose=False, batch_size=1,
+         backend=BACKEND_SCHEDULE, workers=1, concrete_screening=False, artifact_dir=None):
     start_time = datetime.now()
+    if artifact_dir is not None:
+        # reuse the built graphs and schedules of earlier analyses, see GraalWrapper.GraphArtifact
+        GraalWrapper.GraphArtifact.set_directory(artifact_dir)
+        GraalWrapper.GraphArtifact.set_enabled(True)
     graph_builder = get_graph_builder(target_file, work_dir=test_dir.replace('dasa_eval/', '') if test_dir else "")
     constant_nodes = {}
     if auto_detect_start_end:
-        graph_builder.get_graph(0, -1, reset=True)
+        graph_builder.get_graph(0, -1, reset=True, verbose=verbose)
         start_nodes, end_nodes, constant_nodes = graph_builder.get_start_end_constant_nodes()
     else:
         new_start_nodes = []
@@ -376,95 +445,390 @@ def main(target_file, start_nodes, end_nodes, auto_detect_start_end=False, test_
         return STATE_NO_START_NODES_FOUND
     if not end_nodes:
         return STATE_NO_END_NODES_FOUND
+    # the graph is built once, every target executes its slice of it
+    graph_builder.get_graph(0, -1, verbose=verbose)
+    if workers > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+        print(f"The worker processes have to be forked, which isn't supported on {sys.platform}, "
+              f"running all tries in the main process")
+        workers = 1
+    if workers > 1:
+        return main_parallel(graph_builder, start_nodes, end_nodes, constant_nodes, start_time, test_dir, test_class,
+                             use_sv_helpers, return_successfull_output, num_iterations, verbose, batch_size, backend,
+                             workers, concrete_screening)
     random.seed(42)
     errors = False
+    # the next tries are optimized while the JVM checks the previous ones
+    validation_queue = GraalWrapper.ValidationQueue(
+        lambda run_res, iteration, applied_values, log: validate_try(run_res, iteration, applied_values, test_dir,
+                                                                     test_class, use_sv_helpers, verbose, log,
+                                                                     deadline=start_time + TIME_BUDGET))
     for end_node in end_nodes:
-        graph_builder_unchanged = get_graph_builder(target_file, work_dir=test_dir.replace('dasa_eval', '') if test_dir else "")
-        new_graph_unchanged = graph_builder_unchanged.get_graph(0, end_node, reset=True, verbose=verbose)
+        graph_builder_unchanged = graph_builder.get_slice(end_node)
+        new_graph_unchanged = graph_builder_unchanged.graph
+        end_node_batch_size = batch_size
+        pending_results = [] # results of a batched run that were not checked yet
         for iteration in range(num_iterations):
-            if datetime.now() - start_time >= timedelta(minutes=10):
+            if datetime.now() - start_time >= TIME_BUDGET:
                 break
             try:
-                graph_builder = copy.deepcopy(graph_builder_unchanged)
-                new_graph = copy.deepcopy(new_graph_unchanged)
                 # we might not need all input variables to find an Exception
-                needed_start_nodes = [n for n in start_nodes if n.node_id in new_graph.keys()]
+                needed_start_nodes = [n for n in start_nodes if n.node_id in new_graph_unchanged.keys()]
+                needed_start_node_ids = [n.node_id for n in needed_start_nodes]
 
-                I_all = get_start_values(needed_start_nodes, constant_nodes)
+                # Run the next tries at once if all inputs are scalars
+                tries = min(end_node_batch_size, num_iterations - iteration)
+                if (not pending_results and tries > 1
+                        and all(n.func != TYPE_CONV_STRING for n in needed_start_nodes)):
+                    # the schedule resets the state of the nodes, so all tries share the graph
+                    graph_builder = graph_builder_unchanged
+                    new_graph = new_graph_unchanged
+                    I_batch = [get_start_values(needed_start_nodes, constant_nodes) for _ in range(tries)]
+                    try:
+                        pending_results = run_optimization_batched(new_graph, needed_start_node_ids, end_node,
+                                                                   graph_builder, verbose=verbose, I_batch=I_batch,
+                                                                   backend=backend)
+                    except Exception as e:
+                        # some nodes can't handle a batch of values, continue with single tries
+                        end_node_batch_size = 1
+                        if verbose:
+                            traceback.print_exc()
+
+                if pending_results:
+                    run_res = pending_results.pop(0)
+                else:
+                    # the schedule resets the state of the nodes, so all tries share the graph
+                    graph_builder = graph_builder_unchanged
+                    new_graph = new_graph_unchanged
 
-                # Run optimization with inputs
-                needed_start_node_ids = [n.node_id for n in needed_start_nodes]
-                run_res = run_optimization(new_graph, needed_start_node_ids, end_node, graph_builder, verbose=verbose, I_all=I_all)
+                    I_all = get_start_values(needed_start_nodes, constant_nodes)
+
+                    # Run optimization with inputs
+                    run_res = run_optimization(new_graph, needed_start_node_ids, end_node, graph_builder, verbose=verbose,
+                                               I_all=I_all, backend=backend,
+                                               concretize=get_concretize(needed_start_nodes, concrete_screening))
                 run_res['start_nodes'] = needed_start_nodes
                 run_res['end_node'] = end_node
                 results.append(run_res)
-
-                # Extract values for conversion
-                applied_values = []
-                for start_node, value in zip(needed_start_nodes, run_res['values']):
-                    if value is None:
-                        continue
-                    else:
-                        applied_values.append(start_node.func(value))
-
-                print(f"Target {run_res['end_node']} Try {iteration}: "
-                      f"Inputs={[n.node_id for n, v in zip(run_res['start_nodes'], run_res['values']) if v is not None]} "
-                      f"Values={applied_values} "
-                      f"Loss={run_res['loss']} Iteration={run_res['iteration']} "
-                      f"Real Values={[v for v in run_res['values'] if v is not None]}")
+                applied_values = print_try(run_res, iteration)
                 if test_dir:
-                    func_input = ("\n".join([f"INPUT_{idx:03d} {v}".replace("\n", "\\n")
-                                             for idx, v in enumerate(applied_values)])).encode("utf-8")
-                    res = subprocess.run(["java",
-                                          "-cp", f"{test_dir}:svHelpers/evaluation/" if use_sv_helpers else test_dir,
-                                          "-ea", test_class if test_class else "Main"],
-                                         capture_output=True, input=func_input)
-                    if verbose or res.returncode != 0:
-                        print("----------- Input of the test execution ------------")
-                        print(func_input)
-                        print("----------- Output of the test execution -----------")
-                        print(res.stdout.decode("utf-8").replace("[WITNESS]", "[POSSIBLE WITNESS]"))
-                        print(res.stderr.decode("utf-8"))
-                        print("----------------------------------------------------")
-                        if "java.lang.AssertionError" in res.stderr.decode("utf-8"):
-                            for line in res.stdout.decode("utf-8").split("\n"):
-                                if "[WITNESS]" in line:
-                                    print(line)
-                            return STATE_CORRECT if not return_successfull_output else (STATE_CORRECT, res.stdout.decode("utf-8"))
-                    if ("[CANNOT PARSE NULL STRING]" in res.stdout.decode("utf-8")
-                            and run_res['values'] != run_res['all_values']):
-                        print("Failed to hand over all needed variables, retrying with all variables")
-                        applied_values = []
-                        for start_node, value in zip(needed_start_nodes, run_res['all_values']):
-                            if value is None:
-                                continue
-                            else:
-                                applied_values.append(start_node.func(value))
-
-                        print(f"Target {run_res['end_node']} Try {iteration}_all: "
-                              f"Inputs={[n.node_id for n in run_res['start_nodes']]} "
-                              f"Values={applied_values} "
-                              f"Loss={run_res['loss']} Iteration={run_res['iteration']} "
-                              f"Real Values={run_res['all_values']}")
-
-                        func_input = ("\n".join([f"INPUT_{idx:03d} {v}".replace("\n", "\\n")
-                                                 for idx, v in enumerate(applied_values)])).encode("utf-8")
-                        res = subprocess.run(["java",
-                                              "-cp", f"{test_dir}:svHelpers/evaluation/" if use_sv_helpers else test_dir,
-                                              "-ea", test_class if test_class else "Main"],
-                                             capture_output=True, input=func_input)
-                        if res.returncode != 0 and "java.lang.AssertionError" in res.stderr.decode("utf-8"):
-                            for line in res.stdout.decode("utf-8").split("\n"):
-                                if "[WITNESS]" in line:
-                                    print(line)
-                            return STATE_CORRECT if not return_successfull_output else (STATE_CORRECT, res.stdout.decode("utf-8"))
+                    if concrete_screening and not screen_try(graph_builder_unchanged, new_graph_unchanged, run_res):
+                        print(f"Target {end_node} Try {iteration}: Inputs miss the target, skipped the validation")
+                    elif not validation_queue.submit(get_candidate_key(run_res, applied_values), run_res, iteration,
+                                                     applied_values):
+                        print(f"Target {end_node} Try {iteration}: Inputs were already validated")
+                    output = validation_queue.get_violation()
+                    if output is not None:
+                        return STATE_CORRECT if not return_successfull_output else (STATE_CORRECT, output)
             except Exception as e:
                 errors = True
                 if verbose:
                     traceback.print_exc()
 
+    while True:
+        try:
+            # the validations that didn't start within the time budget are cancelled, the running test is killed at
+            # the same deadline
+            output = validation_queue.get_violation(wait=True, timeout=get_timeout(start_time + TIME_BUDGET))
+            break
+        except Exception as e:
+            errors = True
+            if verbose:
+                traceback.print_exc()
+    if output is not None:
+        return STATE_CORRECT if not return_successfull_output else (STATE_CORRECT, output)
+    return print_final_results(results, errors, iteration + 1)
+
+
+def main_parallel(graph_builder, start_nodes, end_nodes, constant_nodes, start_time, test_dir, test_class,
+                  use_sv_helpers, return_successfull_output, num_iterations, verbose, batch_size, backend, workers,
+                  concrete_screening=False):
+    """
+    Run the tries of all end nodes in a pool of worker processes.
+
+    The tries are split into work units of batch_size tries of one end node. Every work unit seeds the random number
+    generators from its end node and first try, so its start values don't depend on the worker that runs it. The
+    workers are forked after the slices of all end nodes were taken from the built graph, hence, they share the graph
+    with the main process until they execute it. As soon as a worker finds a violation, the pool is terminated.
+
+    The workers only get the graphs and the state of the analysis through worker_context, which is inherited by
+    forking. Hence, this mode requires the 'fork' start method (not available on Windows, main runs all tries in the
+    main process there).
+    """
+    errors = False
+    worker_context.clear()
+    worker_context.update(start_nodes=start_nodes, constant_nodes=constant_nodes, start_time=start_time,
+                          test_dir=test_dir, test_class=test_class, use_sv_helpers=use_sv_helpers, verbose=verbose,
+                          backend=backend, concrete_screening=concrete_screening, graphs={})
+    for end_node in end_nodes:
+        try:
+            graph_slice = graph_builder.get_slice(end_node)
+            worker_context['graphs'][end_node] = (graph_slice, graph_slice.graph)
+        except Exception as e:
+            errors = True
+            if verbose:
+                traceback.print_exc()
+
+    work_units = [(end_node, iteration, min(batch_size, num_iterations - iteration))
+                  for end_node in worker_context['graphs']
+                  for iteration in range(0, num_iterations, batch_size)]
+    unit_results = {} # (end node, first try) -> results, printed in the order of the work units at the end
+    # the buffered output would be written again by every worker
+    sys.stdout.flush()
+    # leaving the with statement terminates the workers that are still running
+    with multiprocessing.get_context('fork').Pool(workers, initializer=init_worker) as pool:
+        pending = pool.imap_unordered(run_work_unit, work_units)
+        for _ in work_units:
+            remaining = start_time + TIME_BUDGET - datetime.now()
+            try:
+                end_node, iteration, run_results, output, error = pending.next(max(remaining.total_seconds(), 0))
+            except multiprocessing.TimeoutError:
+                break
+            except Exception as e:
+                # e.g. a result that can't be sent back to the main process
+                errors = True
+                if verbose:
+                    traceback.print_exc()
+                continue
+            errors = errors or error
+            for run_res in run_results:
+                run_res['start_nodes'] = [n for n in start_nodes if n.node_id in worker_context['graphs'][end_node][1]]
+                run_res['end_node'] = end_node
+            unit_results[(end_node, iteration)] = run_results
+            if output is not None:
+                return STATE_CORRECT if not return_successfull_output else (STATE_CORRECT, output)
+    results = [run_res for end_node, iteration, _ in work_units for run_res in unit_results.get((end_node, iteration), [])]
+    return print_final_results(results, errors, len(results))
+
+
+def init_worker():
+    # the workers already run in parallel, more threads per worker only compete for the cores
+    torch.set_num_threads(1)
+    sys.stdout.reconfigure(line_buffering=True)
+
+
+def run_work_unit(work_unit):
+    """
+    Run the tries of a work unit in a worker process
+
+    :param work_unit: (end node, first try, number of tries)
+    :return: (end node, first try, results, output of the test execution if it found a violation, whether an error
+             occurred)
+    """
+    end_node, first_iteration, tries = work_unit
+    context = worker_context
+    run_results = []
+    if datetime.now() - context['start_time'] >= TIME_BUDGET:
+        return end_node, first_iteration, run_results, None, False
+    random.seed(f"{PARALLEL_SEED}:{end_node}:{first_iteration}")
+    torch.manual_seed(random.getrandbits(63))
+    try:
+        graph_builder, graph = context['graphs'][end_node]
+        # we might not need all input variables to find an Exception
+        needed_start_nodes = [n for n in context['start_nodes'] if n.node_id in graph.keys()]
+        needed_start_node_ids = [n.node_id for n in needed_start_nodes]
+
+        # Run the tries at once if all inputs are scalars
+        if tries > 1 and all(n.func != TYPE_CONV_STRING for n in needed_start_nodes):
+            I_batch = [get_start_values(needed_start_nodes, context['constant_nodes']) for _ in range(tries)]
+            try:
+                run_results = run_optimization_batched(graph, needed_start_node_ids, end_node, graph_builder,
+                                                       verbose=context['verbose'], I_batch=I_batch,
+                                                       backend=context['backend'])
+            except Exception as e:
+                # some nodes can't handle a batch of values, continue with single tries
+                if context['verbose']:
+                    traceback.print_exc()
+        while len(run_results) < tries:
+            I_all = get_start_values(needed_start_nodes, context['constant_nodes'])
+            run_results.append(run_optimization(graph, needed_start_node_ids, end_node, graph_builder,
+                                                verbose=context['verbose'], I_all=I_all, backend=context['backend'],
+                                                concretize=get_concretize(needed_start_nodes,
+                                                                          context['concrete_screening'])))
+
+        for iteration, run_res in enumerate(run_results, start=first_iteration):
+            run_res['start_nodes'] = needed_start_nodes
+            run_res['end_node'] = end_node
+            applied_values = print_try(run_res, iteration)
+            if context['test_dir']:
+                if context['concrete_screening'] and not screen_try(graph_builder, graph, run_res):
+                    print(f"Target {end_node} Try {iteration}: Inputs miss the target, skipped the validation")
+                    continue
+                output = validate_try(run_res, iteration, applied_values, context['test_dir'], context['test_class'],
+                                      context['use_sv_helpers'], context['verbose'],
+                                      deadline=context['start_time'] + TIME_BUDGET)
+                if output is not None:
+                    return end_node, first_iteration, [], output, False
+    except Exception as e:
+        if context['verbose']:
+            traceback.print_exc()
+        return end_node, first_iteration, [], None, True
+    # the conversion functions of the start nodes can't be pickled, the main process adds them again
+    for run_res in run_results:
+        del run_res['start_nodes']
+    return end_node, first_iteration, run_results, None, False
+
+
+def print_try(run_res, iteration):
+    """
+    Print the result of a try
+
+    :return: values of the used inputs, converted for the test execution
+    """
+    # Extract values for conversion
+    applied_values = []
+    for start_node, value in zip(run_res['start_nodes'], run_res['values']):
+        if value is None:
+            continue
+        else:
+            applied_values.append(start_node.func(value))
+
+    print(f"Target {run_res['end_node']} Try {iteration}: "
+          f"Inputs={[n.node_id for n, v in zip(run_res['start_nodes'], run_res['values']) if v is not None]} "
+          f"Values={applied_values} "
+          f"Loss={run_res['loss']} Iteration={run_res['iteration']} "
+          f"Real Values={[v for v in run_res['values'] if v is not None]}")
+    return applied_values
+
+
+def get_concrete_values(start_nodes, values):
+    """
+    Convert the values of a try like for the test execution
+
+    :param start_nodes: start nodes of the values
+    :param values: tensors or numbers, in the order of the start nodes
+    :return: tensors of the converted values or None if an input isn't a number (e.g. a String)
+    """
+    concrete_values = []
+    for start_node, value in zip(start_nodes, values):
+        if hasattr(value, 'item'):
+            value = value.item()
+        if not isinstance(value, (int, float)):
+            return None
+        value = start_node.func(value)
+        if not isinstance(value, (int, float)):
+            return None
+        concrete_values.append(torch.tensor(float(value)))
+    return concrete_values
+
+
+def get_concretize(start_nodes, concrete_screening):
+    """
+    :return: the concretize function of run_optimization or None if the concrete execution is disabled
+    """
+    if not concrete_screening:
+        return None
+    return lambda values: get_concrete_values(start_nodes, values)
+
+
+def screen_try(graph_builder, graph, run_res):
+    """
+    Execute the graph of a try concretely with its converted inputs
+
+    :return: False if the inputs miss the target, True if they reach it or can't be executed concretely
+    """
+    concrete_values = get_concrete_values(run_res['start_nodes'], run_res['all_values'])
+    if concrete_values is None:
+        return True
+    schedule = graph_builder.get_schedule([n.node_id for n in run_res['start_nodes']], graph,
+                                          [run_res['end_node']])
+    return GraalWrapper.ConcreteInterpreter(schedule, run_res['end_node']).reaches_target(concrete_values)
+
+
+def get_candidate_key(run_res, applied_values):
+    """
+    :return: the inputs of a try as they are passed to the test, tries with the same key give the same test result
+    """
+    # the test is executed again with all values if it runs out of inputs
+    all_applied_values = [start_node.func(value) for start_node, value in zip(run_res['start_nodes'],
+                                                                              run_res['all_values'])
+                          if value is not None]
+    return tuple(applied_values), tuple(all_applied_values)
+
+
+def get_timeout(deadline):
+    """
+    :return: seconds until the deadline (0 if it passed) or None without a deadline
+    """
+    return None if deadline is None else max((deadline - datetime.now()).total_seconds(), 0)
+
+
+def run_test(applied_values, test_dir, test_class, use_sv_helpers, timeout=None):
+    """
+    Execute the test with the given inputs
+
+    :param timeout: seconds after which the test is killed and subprocess.TimeoutExpired is raised
+    :return: (input of Verifier, CompletedProcess of the test execution)
+    """
+    func_input = ("\n".join([f"INPUT_{idx:03d} {v}".replace("\n", "\\n")
+                             for idx, v in enumerate(applied_values)])).encode("utf-8")
+    class_path = f"{test_dir}:svHelpers/evaluation/" if use_sv_helpers else test_dir
+    # a running JVM only has to load the test again, starting a new one takes far longer
+    res = GraalWrapper.ValidationDaemon.run_test(class_path, test_class if test_class else "Main", func_input,
+                                                 timeout=timeout)
+    if res is None:
+        res = subprocess.run(["java", "-cp", class_path, "-ea", test_class if test_class else "Main"],
+                             capture_output=True, input=func_input, timeout=timeout)
+    return func_input, res
+
+
+def validate_try(run_res, iteration, applied_values, test_dir, test_class, use_sv_helpers, verbose, log=print,
+                 deadline=None):
+    """
+    Execute the test with the inputs of a try
+
+    :param log: called instead of print, e.g. to print the messages of a background validation later
+    :param deadline: datetime at which a running test is killed, e.g. the end of the time budget
+    :return: output of the test execution if it failed with an AssertionError, else None
+    """
+    try:
+        func_input, res = run_test(applied_values, test_dir, test_class, use_sv_helpers, get_timeout(deadline))
+    except subprocess.TimeoutExpired:
+        log(f"Target {run_res['end_node']} Try {iteration}: The test didn't end within the time budget")
+        return None
+    if verbose or res.returncode != 0:
+        log("----------- Input of the test execution ------------")
+        log(func_input)
+        log("----------- Output of the test execution -----------")
+        log(res.stdout.decode("utf-8").replace("[WITNESS]", "[POSSIBLE WITNESS]"))
+        log(res.stderr.decode("utf-8"))
+        log("----------------------------------------------------")
+        if "java.lang.AssertionError" in res.stderr.decode("utf-8"):
+            for line in res.stdout.decode("utf-8").split("\n"):
+                if "[WITNESS]" in line:
+                    log(line)
+            return res.stdout.decode("utf-8")
+    if ("[CANNOT PARSE NULL STRING]" in res.stdout.decode("utf-8")
+            and run_res['values'] != run_res['all_values']):
+        log("Failed to hand over all needed variables, retrying with all variables")
+        applied_values = []
+        for start_node, value in zip(run_res['start_nodes'], run_res['all_values']):
+            if value is None:
+                continue
+            else:
+                applied_values.append(start_node.func(value))
+
+        log(f"Target {run_res['end_node']} Try {iteration}_all: "
+            f"Inputs={[n.node_id for n in run_res['start_nodes']]} "
+            f"Values={applied_values} "
+            f"Loss={run_res['loss']} Iteration={run_res['iteration']} "
+            f"Real Values={run_res['all_values']}")
+
+        try:
+            func_input, res = run_test(applied_values, test_dir, test_class, use_sv_helpers, get_timeout(deadline))
+        except subprocess.TimeoutExpired:
+            log(f"Target {run_res['end_node']} Try {iteration}_all: The test didn't end within the time budget")
+            return None
+        if res.returncode != 0 and "java.lang.AssertionError" in res.stderr.decode("utf-8"):
+            for line in res.stdout.decode("utf-8").split("\n"):
+                if "[WITNESS]" in line:
+                    log(line)
+            return res.stdout.decode("utf-8")
+    return None
+
+
+def print_final_results(results, errors, tries):
     if not results:
-        print(f"No result found after {iteration + 1} tries")
+        print(f"No result found after {tries} tries")
         return STATE_ERROR if errors else STATE_DEFAULT
     print(f"Final results:")
     for result in results:
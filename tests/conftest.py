@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import GraalWrapper
+import graphs
+
+# like test.py, the nodes compute in double precision
+torch.set_default_dtype(torch.float64)
+
+
+@pytest.fixture(autouse=True)
+def fresh_build_state():
+    # every test builds its graphs, the artifacts of earlier runs would hide the build
+    enabled = GraalWrapper.GraphArtifact.enabled
+    GraalWrapper.GraphArtifact.set_enabled(False)
+    GraalWrapper.MethodRegister.clear()
+    yield
+    GraalWrapper.GraphArtifact.set_enabled(enabled)
+
+
+@pytest.fixture
+def program(tmp_path):
+    """
+    :return: (work dir, ids of the inputs and targets) of the program of graphs.py, written to a new directory
+    """
+    return str(tmp_path) + os.sep, graphs.write_program(tmp_path)
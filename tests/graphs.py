@@ -0,0 +1,198 @@
+"""
+Synthetic bgv2json graphs of a small program with several methods
+
+The program has two targets. Target A needs the callee Calc.twice, which calls Calc.inc. Target B lies behind the
+false branch of target A and chains eleven invokes of Calc.inc and one of the recursive Calc.loop. The nodes of target B
+come first in the node list, so a build of the whole program inlines them before the ones of target A.
+
+The builder only keeps the nodes that are reachable from the start node without walking through an inlined callee.
+Hence, every node that uses the result of an invoke also uses a value that is reachable otherwise.
+"""
+import json
+import os
+
+import GraalWrapper
+import nodes
+
+ROOT_FILE = 'Main.main.json'
+
+START = 'jdk.graal.compiler.nodes.StartNode'
+PARAMETER = 'jdk.graal.compiler.nodes.ParameterNode'
+RETURN = 'jdk.graal.compiler.nodes.ReturnNode'
+CONSTANT = 'jdk.graal.compiler.nodes.ConstantNode'
+INVOKE = 'jdk.graal.compiler.nodes.InvokeNode'
+CALL_TARGET = 'com.oracle.svm.core.nodes.SubstrateMethodCallTargetNode'
+FRAME_STATE = 'jdk.graal.compiler.nodes.FrameState'
+IF = 'jdk.graal.compiler.nodes.IfNode'
+BEGIN = 'jdk.graal.compiler.nodes.BeginNode'
+PI = 'jdk.graal.compiler.nodes.PiNode'
+ADD = 'jdk.graal.compiler.nodes.calc.AddNode'
+MUL = 'jdk.graal.compiler.nodes.calc.MulNode'
+LESS_THAN = 'jdk.graal.compiler.nodes.calc.IntegerLessThanNode'
+EXCEPTION = 'jdk.graal.compiler.nodes.extended.BytecodeExceptionNode'
+
+# number of invokes of Calc.inc on the path of target B, one more than the inlining limit of a method below an invoke
+# of the root graph
+INC_CHAIN = 11
+
+
+class MethodGraph:
+    """
+    json graph of a method, the node ids are given in the order the nodes are added
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.nodes = []
+        self.edges = []
+
+    def add(self, node_class, **props):
+        node_id = len(self.nodes)
+        self.nodes.append({'id': node_id, 'props': dict(props, id=node_id, node_class={'node_class': node_class})})
+        return node_id
+
+    def connect(self, src, dest, name, edge_type='Value', index=0):
+        self.edges.append({'from': src, 'to': dest,
+                           'props': {'direct': True, 'name': name, 'type': edge_type, 'index': index}})
+
+    def constant(self, value):
+        return self.add(CONSTANT, stampKind='i32', stamp=f'i32 [{value}]', rawvalue=str(value))
+
+    def binary(self, node_class, x, y):
+        node_id = self.add(node_class)
+        self.connect(x, node_id, 'x')
+        self.connect(y, node_id, 'y')
+        return node_id
+
+    def invoke(self, target_method, *arguments, after=None):
+        call_target = self.add(CALL_TARGET)
+        for index, argument in enumerate(arguments):
+            self.connect(argument, call_target, 'arguments', index=index)
+        node_id = self.add(INVOKE, targetMethod=target_method)
+        self.connect(call_target, node_id, 'callTarget', 'Extension')
+        if after is not None:
+            self.connect(after, node_id, 'next', None)
+        return node_id
+
+    def branch(self, condition, after):
+        """
+        :return: the begin nodes of the true and the false successor
+        """
+        node_id = self.add(IF)
+        self.connect(condition, node_id, 'condition', 'Condition')
+        self.connect(after, node_id, 'next', None)
+        true_begin = self.add(BEGIN)
+        false_begin = self.add(BEGIN)
+        self.connect(node_id, true_begin, 'trueSuccessor', None)
+        self.connect(node_id, false_begin, 'falseSuccessor', None)
+        return true_begin, false_begin
+
+    def ret(self, result, after):
+        node_id = self.add(RETURN)
+        self.connect(after, node_id, 'next', None)
+        if result is not None:
+            self.connect(result, node_id, 'result')
+        return node_id
+
+    def to_json(self):
+        return {'name': self.name, 'props': {}, 'nodes': self.nodes, 'edges': self.edges}
+
+
+def create_inc():
+    method = MethodGraph('Calc.inc')
+    start = method.add(START)
+    parameter = method.add(PARAMETER, index=0)
+    method.ret(method.binary(ADD, parameter, method.constant(1)), start)
+    return method
+
+
+def create_twice():
+    method = MethodGraph('Calc.twice')
+    start = method.add(START)
+    parameter = method.add(PARAMETER, index=0)
+    incremented = method.invoke('Calc.inc', parameter, after=start)
+    method.ret(method.binary(MUL, incremented, parameter), incremented)
+    return method
+
+
+def create_loop():
+    method = MethodGraph('Calc.loop')
+    start = method.add(START)
+    parameter = method.add(PARAMETER, index=0)
+    recursion = method.invoke('Calc.loop', parameter, after=start)
+    method.ret(method.binary(ADD, recursion, parameter), recursion)
+    return method
+
+
+def create_main():
+    method = MethodGraph('Main.main')
+    start = method.add(START)
+    a = method.invoke('Verifier.nondetInt', after=start)
+    frame_state = method.add(FRAME_STATE)
+    method.connect(a, frame_state, 'values')
+    b = method.invoke('Verifier.nondetInt', after=a)
+    method.connect(frame_state, b, 'stateAfter', 'State')
+    ten = method.constant(10)
+
+    # target B, added first
+    value = b
+    for _ in range(INC_CHAIN):
+        value = method.binary(ADD, method.invoke('Calc.inc', value), b)
+    sum_b = method.binary(ADD, value, method.invoke('Calc.loop', b))
+    # an equal constant and comparison, merged by the simplified schedules, and another comparison of the same level,
+    # executed in one batch with the first one by the batched schedules
+    condition_b = method.binary(LESS_THAN, method.constant(10), sum_b)
+    same_condition_b = method.binary(LESS_THAN, method.constant(10), sum_b)
+    other_condition_b = method.binary(LESS_THAN, method.constant(-20), sum_b)
+    both_b = method.binary(MUL, method.binary(MUL, condition_b, same_condition_b), other_condition_b)
+
+    # target A
+    pi = method.add(PI)
+    method.connect(a, pi, 'object')
+    sum_a = method.binary(ADD, method.invoke('Calc.twice', a), pi)
+    condition_a = method.binary(MUL, method.binary(LESS_THAN, sum_a, ten),
+                                method.binary(LESS_THAN, sum_a, method.constant(30)))
+    true_a, false_a = method.branch(condition_a, b)
+    target_a = method.add(EXCEPTION)
+    method.connect(true_a, target_a, 'next', None)
+
+    true_b, false_b = method.branch(both_b, false_a)
+    target_b = method.add(EXCEPTION)
+    method.connect(true_b, target_b, 'next', None)
+    method.ret(None, false_b)
+    return method, a, b, target_a, target_b
+
+
+def write_program(work_dir):
+    """
+    Write the json files of all methods of the program
+
+    :param work_dir: directory of the json files
+    :return: dict with the ids of the inputs ('a', 'b') and the targets ('target_a', 'target_b') of the root graph
+    """
+    main, a, b, target_a, target_b = create_main()
+    for method in (main, create_inc(), create_twice(), create_loop()):
+        with open(os.path.join(work_dir, f"{method.name}.json"), 'w') as file:
+            json.dump(method.to_json(), file)
+    return {'a': a, 'b': b, 'target_a': target_a, 'target_b': target_b}
+
+
+def get_graph_builder(work_dir):
+    """
+    :return: GraphBuilder of the root graph, like test.get_graph_builder
+    """
+    GraalWrapper.MethodRegister.clear()
+    return GraalWrapper.GraphBuilder(ROOT_FILE, work_dir=work_dir)
+
+
+def describe_ops(ops):
+    """
+    :return: the operations of a schedule with the ids of their nodes, to compare the schedules of different builds
+    """
+    def describe(item):
+        if isinstance(item, nodes.BaseNode):
+            return item.node['id']
+        if isinstance(item, list):
+            return [describe(element) for element in item]
+        return item
+    return [tuple(describe(item) for item in op) for op in ops]
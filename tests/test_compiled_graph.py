@@ -0,0 +1,61 @@
+import pytest
+import torch
+
+import GraalWrapper
+import nodes
+import graphs
+from test_execution_schedule import RUNS, get_input_values, replay
+
+
+def compile_target(work_dir, end_node, input_ids, shape):
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph_builder.get_graph(0, end_node)
+    schedule = graph_builder.get_schedule(input_ids, output_ids=[end_node])
+    return GraalWrapper.CompiledGraph.compile(schedule, end_node, get_input_values(0, len(input_ids), shape))
+
+
+@pytest.mark.parametrize('shape', [(), (3,)])
+@pytest.mark.parametrize('end_node', ['target_a', 'target_b'])
+def test_compiled_graphs_match_the_replay(program, end_node, shape):
+    work_dir, ids = program
+    end_node = ids[end_node]
+    input_ids = [ids['a']] if end_node == ids['target_a'] else [ids['a'], ids['b']]
+    nodes.custom.Sigmoid.set_annealing_constant(0.5)
+    _, expected = replay(work_dir, end_node, input_ids, shape, fold=False)
+    compiled = compile_target(work_dir, end_node, input_ids, shape)
+    assert compiled is not None
+    for run, (expected_loss, expected_grads) in zip(range(RUNS), expected):
+        input_values = get_input_values(run, len(input_ids), shape)
+        target_multiplicative, penalities = compiled(input_values)
+        loss = -target_multiplicative + penalities
+        grads = torch.autograd.grad(loss.sum(), input_values, allow_unused=True)
+        torch.testing.assert_close(loss.detach(), expected_loss)
+        for grad, expected_grad in zip(grads, expected_grads):
+            torch.testing.assert_close(torch.zeros(shape) if grad is None else grad, expected_grad)
+
+
+def test_compiled_graphs_take_the_annealing_constant_as_an_argument(program):
+    work_dir, ids = program
+    nodes.custom.Sigmoid.set_annealing_constant(0.5)
+    compiled = compile_target(work_dir, ids['target_a'], [ids['a']], ())
+    input_values = get_input_values(0, 1, ())
+    for annealing_constant in (0.1, 2.0):
+        nodes.custom.Sigmoid.set_annealing_constant(annealing_constant)
+        _, expected = replay(work_dir, ids['target_a'], [ids['a']], (), fold=False)
+        target_multiplicative, penalities = compiled(input_values)
+        torch.testing.assert_close((-target_multiplicative + penalities).detach(), expected[0][0])
+
+
+def test_graphs_with_other_inputs_than_tensors_are_not_compiled(program):
+    work_dir, ids = program
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph_builder.get_graph(0, ids['target_a'])
+    schedule = graph_builder.get_schedule([ids['a']], output_ids=[ids['target_a']])
+    assert GraalWrapper.CompiledGraph.compile(schedule, ids['target_a'], [nodes.types.String(3)]) is None
+
+
+def test_graphs_that_branch_on_a_value_are_not_compiled(program, monkeypatch):
+    work_dir, ids = program
+    # a kernel that computes on python numbers, its trace would only be valid for the traced values
+    monkeypatch.setattr(nodes.calc.AddNode, 'compute', staticmethod(lambda x, y: torch.tensor(float(x + y))))
+    assert compile_target(work_dir, ids['target_a'], [ids['a']], ()) is None
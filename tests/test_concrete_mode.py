@@ -0,0 +1,130 @@
+import threading
+
+import pytest
+import torch
+
+import GraalWrapper
+import nodes
+import graphs
+
+INT_MIN, INT_MAX = -2**31, 2**31 - 1
+
+CALC = 'jdk.graal.compiler.nodes.calc.'
+INTEGER_DIV = CALC + 'SignedFloatingIntegerDivNode'
+INTEGER_REM = CALC + 'SignedFloatingIntegerRemNode'
+
+
+@pytest.fixture
+def concrete():
+    nodes.custom.Sigmoid.set_concrete(True)
+    yield
+    nodes.custom.Sigmoid.set_concrete(False)
+
+
+def execute(node_class, stamp, **inputs):
+    """
+    :return: output of a node of the class with the stamp for the given inputs
+    """
+    node = nodes.NodeRegistry.get(node_class)({'id': 0, 'props': {'id': 0, 'stamp': stamp,
+                                                                  'node_class': {'node_class': node_class}}})
+    node.inputs = {name: torch.as_tensor(float(value) if isinstance(value, int) else value)
+                   for name, value in inputs.items()}
+    node.exec()
+    return node.output
+
+
+# results of the Java expressions in the comments
+@pytest.mark.parametrize('node_class, stamp, x, y, expected', [
+    (CALC + 'AddNode', 'i32', INT_MAX, 1, INT_MIN),  # Integer.MAX_VALUE + 1
+    (CALC + 'SubNode', 'i32', INT_MIN, 1, INT_MAX),  # Integer.MIN_VALUE - 1
+    (CALC + 'MulNode', 'i32', 46341, 46341, -2147479015),  # 46341 * 46341
+    (CALC + 'MulNode', 'i32', 65536, 65536, 0),  # 65536 * 65536
+    (CALC + 'MulNode', 'i32', 0, 7, 0),  # 0 * 7, the relaxed mode replaces the zero
+    (CALC + 'MulNode', 'i64', 2**62, 4, 0),  # (1L << 62) * 4
+    (CALC + 'MulNode', 'i64', 2**32, 2**31, -2**63),  # (1L << 32) * (1L << 31)
+    (INTEGER_DIV, 'i32', -7, 2, -3),  # -7 / 2
+    (INTEGER_DIV, 'i32', 7, -2, -3),  # 7 / -2
+    (INTEGER_DIV, 'i32', INT_MIN, -1, INT_MIN),  # Integer.MIN_VALUE / -1
+    (INTEGER_REM, 'i32', -7, 2, -1),  # -7 % 2
+    (INTEGER_REM, 'i32', 7, -2, 1),  # 7 % -2
+    (INTEGER_REM, 'i32', INT_MIN, -1, 0),  # Integer.MIN_VALUE % -1
+    (CALC + 'LeftShiftNode', 'i32', 1, 31, INT_MIN),  # 1 << 31
+    (CALC + 'LeftShiftNode', 'i32', 1, 33, 2),  # 1 << 33
+    (CALC + 'LeftShiftNode', 'i64', 1, 65, 2),  # 1L << 65
+    (CALC + 'LeftShiftNode', 'i32', 3, -1, INT_MIN),  # 3 << -1
+])
+def test_integer_arithmetic_matches_java(concrete, node_class, stamp, x, y, expected):
+    assert execute(node_class, stamp, x=x, y=y).item() == expected
+
+
+def test_division_by_zero_is_nan(concrete):
+    # Java throws an ArithmeticException
+    assert execute(INTEGER_DIV, 'i32', x=7, y=0).isnan()
+    assert execute(INTEGER_REM, 'i32', x=7, y=0).isnan()
+
+
+def test_negation_overflows(concrete):
+    assert execute(CALC + 'NegateNode', 'i32', value=INT_MIN).item() == INT_MIN  # -Integer.MIN_VALUE
+
+
+@pytest.mark.parametrize('x, y, expected', [
+    (0, 5, True),  # Integer.compareUnsigned(0, 5) < 0
+    (-1, 5, False),  # Integer.compareUnsigned(-1, 5) < 0
+    (5, -1, True),  # Integer.compareUnsigned(5, -1) < 0
+    (-2, -1, True),  # Integer.compareUnsigned(-2, -1) < 0
+    (0, 0, False),  # Integer.compareUnsigned(0, 0) < 0
+    (7, 3, False),  # Integer.compareUnsigned(7, 3) < 0
+])
+def test_integer_below_compares_unsigned(concrete, x, y, expected):
+    assert execute(CALC + 'IntegerBelowNode', 'i1', x=x, y=y).item() == float(expected)
+
+
+def test_batches_are_computed_elementwise(concrete):
+    output = execute(CALC + 'AddNode', 'i32', x=torch.tensor([float(INT_MAX), 1.0, -5.0]), y=1)
+    assert output.tolist() == [INT_MIN, 2, -4]
+    # the batched schedules execute the nodes one by one in the concrete mode
+    add = nodes.NodeRegistry.get(CALC + 'AddNode')
+    batch = [add({'id': idx, 'props': {'id': idx, 'stamp': 'i32'}}) for idx in range(2)]
+    for node, value in zip(batch, [INT_MAX, INT_MIN]):
+        node.inputs = {'x': torch.tensor(float(value)), 'y': torch.tensor(float(value))}
+    add.exec_batch(batch)
+    assert [node.output.item() for node in batch] == [-2, 0]
+
+
+def test_relaxed_mode_doesnt_wrap():
+    assert execute(CALC + 'AddNode', 'i32', x=INT_MAX, y=1).item() == 2**31
+    assert execute(INTEGER_DIV, 'i32', x=-7, y=2).item() == -3.5
+    assert execute(CALC + 'FloatDivNode', 'f64', x=-7, y=2).item() == -3.5
+
+
+def test_concrete_mode_is_set_per_thread(concrete):
+    modes = []
+    thread = threading.Thread(target=lambda: modes.append(nodes.custom.Sigmoid.is_concrete()))
+    thread.start()
+    thread.join()
+    assert modes == [False]
+    assert nodes.custom.Sigmoid.is_concrete()
+
+
+def test_concrete_execution_keeps_the_state_of_the_try(program):
+    work_dir, ids = program
+    nodes.custom.Sigmoid.set_annealing_constant(0.5)
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph = graph_builder.get_graph(0, ids['target_a'])
+    input_ids = sorted([ids['a'], ids['b']])
+    schedule = graph_builder.get_schedule(input_ids)
+    values = [torch.tensor(3.0, requires_grad=True), torch.tensor(4.0, requires_grad=True)]
+    for _ in range(3):
+        schedule.run(values)
+    assert schedule.captured and schedule.frozen
+    frozen = {node: node.output for node in schedule.frozen}
+    penalties = [node.node_penalty for node in schedule.nodes]
+    interpreter = GraalWrapper.ConcreteInterpreter(schedule, ids['target_a'])
+    # Calc.twice(a) + a = (a + 1) * a + a is below 10 and 30 for a = 1, but not for a = 5
+    assert interpreter.reaches_target([torch.tensor(1.0), torch.tensor(0.0)])
+    assert not interpreter.reaches_target([torch.tensor(5.0), torch.tensor(0.0)])
+    assert schedule.captured and not nodes.custom.Sigmoid.is_concrete()
+    assert all(node.output is output for node, output in frozen.items())
+    assert [node.node_penalty for node in schedule.nodes] == penalties
+    schedule.run(values)
+    assert graph[ids['target_a']].controlFlowMultiplicative.requires_grad
@@ -0,0 +1,22 @@
+import torch
+
+import nodes
+import graphs
+
+
+def create_constant(stamp_kind, stamp, raw_value):
+    return nodes.NodeRegistry.get(graphs.CONSTANT)({'id': 0, 'props': {'id': 0, 'stampKind': stamp_kind, 'stamp': stamp,
+                                                                       'rawvalue': raw_value}})
+
+
+def test_string_constants_are_deterministic():
+    # constant nodes are pure and foldable, they must not draw random numbers
+    state = torch.get_rng_state()
+    node = create_constant('a', 'a# java.lang.String', 'ab?~')
+    node.exec()
+    assert torch.equal(torch.get_rng_state(), state)
+    assert node.output.to_string() == 'ab?a'  # a character outside of the vocabulary becomes the first one
+    assert not node.output.logits.requires_grad
+    other = create_constant('a', 'a# java.lang.String', 'ab?~')
+    other.exec()
+    assert torch.equal(other.output.logits, node.output.logits)
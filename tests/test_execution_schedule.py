@@ -0,0 +1,120 @@
+import pytest
+import torch
+
+import GraalWrapper
+import nodes
+import graphs
+from GraalWrapper.ExecutionSchedule import OP_EXEC, OP_EXEC_BATCH, OP_FORWARD
+
+RUNS = 4
+
+
+def get_input_values(run, count, shape):
+    # new values in every run, the frozen nodes must not depend on them
+    return [torch.full(shape, 1.0 + run + 2.5 * idx, requires_grad=True) for idx in range(count)]
+
+
+def replay(work_dir, end_node, input_ids, shape, fold=True, **kwargs):
+    """
+    Execute a new build of the target for some runs
+
+    :param fold: whether the frozen nodes are folded, else every run executes all nodes
+    :return: (schedule, list with the loss and the gradients of the inputs of every run)
+    """
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph = graph_builder.get_graph(0, end_node)
+    schedule = graph_builder.get_schedule(input_ids, **kwargs)
+    if not fold:
+        schedule.frozen = set()
+    results = []
+    for run in range(RUNS):
+        input_values = get_input_values(run, len(input_ids), shape)
+        schedule.run(input_values)
+        loss = -graph[end_node].controlFlowMultiplicative + GraalWrapper.TapeGraph.get_penalties(graph)
+        grads = torch.autograd.grad(loss.sum(), input_values, allow_unused=True)
+        results.append((loss.detach(), [torch.zeros(shape) if grad is None else grad for grad in grads]))
+    return schedule, results
+
+
+def push(work_dir, end_node, input_ids, shape):
+    """
+    Execute a new build of the target for some runs by the push protocol, like the optimization loop before the
+    schedules: every run resets the nodes, triggers the constants and sets the outputs of the inputs
+
+    :return: list with the loss and the gradients of the inputs of every run
+    """
+    graph = graphs.get_graph_builder(work_dir).get_graph(0, end_node)
+    results = []
+    for run in range(RUNS):
+        input_values = get_input_values(run, len(input_ids), shape)
+        for node in graph.values():
+            node.reset_inputs()
+        for input_id in input_ids:
+            graph[input_id].desired_inputs = -1
+        for node in graph.values():
+            if node.node['id'] not in input_ids:
+                node.pass_constant_value()
+        for input_id, input_value in zip(sorted(input_ids), input_values):
+            graph[input_id].controlFlowMultiplicative = torch.tensor(1.0, requires_grad=True)
+            graph[input_id].set_output(input_value)
+        loss = -graph[end_node].controlFlowMultiplicative + GraalWrapper.TapeGraph.get_penalties(graph)
+        grads = torch.autograd.grad(loss.sum(), input_values, allow_unused=True)
+        results.append((loss.detach(), [torch.zeros(shape) if grad is None else grad for grad in grads]))
+    return results
+
+
+def count_ops(ops, kind):
+    return sum(op[0] == kind for op in ops)
+
+
+@pytest.fixture(params=['target_a', 'target_b'])
+def target(request, program):
+    """
+    :return: (work dir, end node, input ids)
+    """
+    work_dir, ids = program
+    nodes.custom.Sigmoid.set_annealing_constant(0.5)
+    input_ids = [ids['a']] if request.param == 'target_a' else [ids['a'], ids['b']]
+    return work_dir, ids[request.param], input_ids
+
+
+@pytest.mark.parametrize('shape', [(), (3,)])
+def test_schedules_match_the_push_execution(target, shape):
+    work_dir, end_node, input_ids = target
+    expected = push(work_dir, end_node, input_ids, shape)
+    _, results = replay(work_dir, end_node, input_ids, shape, fold=False)
+    for (loss, grads), (expected_loss, expected_grads) in zip(results, expected):
+        torch.testing.assert_close(loss, expected_loss)
+        for grad, expected_grad in zip(grads, expected_grads):
+            torch.testing.assert_close(grad, expected_grad)
+
+
+@pytest.mark.parametrize('shape', [(), (3,)])
+def test_simplified_schedules_match_the_replay(target, shape):
+    work_dir, end_node, input_ids = target
+    reference, expected = replay(work_dir, end_node, input_ids, shape, fold=False)
+    simplified, results = replay(work_dir, end_node, input_ids, shape, output_ids=[end_node])
+    # equal nodes were merged, pass-through nodes skipped and the constants folded
+    assert count_ops(simplified.ops, OP_EXEC) < count_ops(reference.ops, OP_EXEC)
+    assert count_ops(simplified.ops, OP_FORWARD) > 0
+    assert simplified.frozen and len(simplified.folded_ops) < len(simplified.ops)
+    for (loss, grads), (expected_loss, expected_grads) in zip(results, expected):
+        torch.testing.assert_close(loss, expected_loss)
+        for grad, expected_grad in zip(grads, expected_grads):
+            torch.testing.assert_close(grad, expected_grad)
+
+
+@pytest.mark.parametrize('output_ids', [None, 'target'])
+@pytest.mark.parametrize('shape', [(), (3,)])
+def test_batched_schedules_match_the_replay(target, shape, output_ids):
+    work_dir, end_node, input_ids = target
+    output_ids = None if output_ids is None else [end_node]
+    reference, expected = replay(work_dir, end_node, input_ids, shape, fold=False, output_ids=output_ids)
+    batched, results = replay(work_dir, end_node, input_ids, shape, output_ids=output_ids, batched=True)
+    assert count_ops(batched.ops, OP_EXEC_BATCH) > 0
+    assert count_ops(batched.ops, OP_EXEC) + count_ops(batched.ops, OP_EXEC_BATCH) < \
+           count_ops(reference.ops, OP_EXEC)
+    for (loss, grads), (expected_loss, expected_grads) in zip(results, expected):
+        torch.testing.assert_close(loss, expected_loss)
+        for grad, expected_grad in zip(grads, expected_grads):
+            torch.testing.assert_close(grad, expected_grad)
@@ -0,0 +1,175 @@
+import os
+import subprocess
+import sys
+
+import pytest
+import torch
+
+import GraalWrapper
+import graphs
+from GraalWrapper.GraphArtifact import ARTIFACT_DIR, ARTIFACT_DIR_VARIABLE, ARTIFACT_SIZE_LIMIT, ARTIFACT_SUFFIX
+from GraalWrapper.IdNamespace import namespaces
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    directory = os.path.join(tmp_path, 'artifacts')
+    GraalWrapper.GraphArtifact.set_enabled(True)
+    GraalWrapper.GraphArtifact.set_directory(directory)
+    yield directory
+    GraalWrapper.GraphArtifact.set_enabled(False)
+    GraalWrapper.GraphArtifact.set_directory(ARTIFACT_DIR)
+    GraalWrapper.GraphArtifact.set_size_limit(ARTIFACT_SIZE_LIMIT)
+
+
+def get_artifact(directory):
+    names = [name for name in os.listdir(directory) if name.endswith(ARTIFACT_SUFFIX)]
+    assert len(names) == 1
+    with open(os.path.join(directory, names[0]), 'rb') as file:
+        return file.read()
+
+
+def get_new_process_builder(work_dir):
+    """
+    :return: GraphBuilder of the root graph with the global state of a new process
+    """
+    namespaces.clear()
+    return graphs.get_graph_builder(work_dir)
+
+
+def record_schedules(graph_builder, ids):
+    """
+    :return: the ops of the schedules of the full graph and of the slice of target A and the results of two runs
+    """
+    graph_slice = graph_builder.get_slice(ids['target_a'])
+    schedule = graph_builder.get_schedule([ids['a'], ids['b']], output_ids=[ids['target_b']])
+    slice_schedule = graph_slice.get_schedule([ids['a']], output_ids=[ids['target_a']])
+    results = []
+    for _ in range(2):
+        schedule.run([torch.tensor(2.0), torch.tensor(5.0)])
+        slice_schedule.run([torch.tensor(2.0)])
+        results.append((graph_builder.graph[ids['target_b']].controlFlowMultiplicative.item(),
+                        graph_slice.graph[ids['target_a']].controlFlowMultiplicative.item()))
+    return graphs.describe_ops(schedule.ops), graphs.describe_ops(slice_schedule.ops), results
+
+
+def test_schedules_are_appended_to_the_graph(program, artifacts, monkeypatch):
+    work_dir, ids = program
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph_builder.get_graph(0, -1)
+    built = get_artifact(artifacts)
+    expected = record_schedules(graph_builder, ids)
+    # the graph is written once, the schedules follow it
+    recorded = get_artifact(artifacts)
+    assert recorded.startswith(built) and len(recorded) > len(built)
+
+    # a new process loads the graph and the schedules instead of building and recording them again
+    monkeypatch.setattr(GraalWrapper.GraphBuilder, 'build', lambda *args: pytest.fail('the graph was built'))
+    monkeypatch.setattr(GraalWrapper.ExecutionSchedule, 'record', lambda *args: pytest.fail('a schedule was recorded'))
+    graph_builder = get_new_process_builder(work_dir)
+    graph_builder.get_graph(0, -1)
+    assert record_schedules(graph_builder, ids) == expected
+    assert get_artifact(artifacts) == recorded
+
+
+def test_an_incomplete_record_is_ignored(program, artifacts, monkeypatch):
+    work_dir, ids = program
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph_builder.get_graph(0, -1)
+    expected = record_schedules(graph_builder, ids)
+    with open(GraalWrapper.GraphArtifact.get_path(graph_builder.artifact_key), 'ab') as file:
+        file.write(b'\x80\x05\x95')  # a record that another process is still writing
+    graph_builder = get_new_process_builder(work_dir)
+    graph_builder.get_graph(0, -1)
+    monkeypatch.setattr(GraalWrapper.ExecutionSchedule, 'record', lambda *args: pytest.fail('a schedule was recorded'))
+    assert record_schedules(graph_builder, ids) == expected
+
+
+def test_artifacts_are_enabled_by_the_environment(tmp_path):
+    def get_settings(environment):
+        env = {name: value for name, value in os.environ.items() if name != ARTIFACT_DIR_VARIABLE}
+        output = subprocess.run([sys.executable, '-c', 'import GraalWrapper; a = GraalWrapper.GraphArtifact; '
+                                                       'print(a.enabled, a.directory)'],
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                env=dict(env, **environment), capture_output=True, text=True, check=True).stdout
+        return output.split()
+
+    assert get_settings({}) == ['False', ARTIFACT_DIR]
+    assert get_settings({ARTIFACT_DIR_VARIABLE: str(tmp_path)}) == ['True', str(tmp_path)]
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason="the permissions are checked on POSIX systems")
+def test_artifacts_of_a_shared_directory_are_not_loaded(program, artifacts, monkeypatch):
+    work_dir, ids = program
+    graphs.get_graph_builder(work_dir).get_graph(0, -1)
+    artifact = get_artifact(artifacts)
+    # other users could replace the artifact by a pickle that runs their code
+    os.chmod(artifacts, 0o777)
+    builds = []
+    build = GraalWrapper.GraphBuilder.build
+    monkeypatch.setattr(GraalWrapper.GraphBuilder, 'build', lambda *args: builds.append(1) or build(*args))
+    graph_builder = get_new_process_builder(work_dir)
+    graph_builder.get_graph(0, -1)
+    assert builds and graph_builder.artifact_key is None
+    graph_builder.get_schedule([ids['a'], ids['b']])
+    assert get_artifact(artifacts) == artifact
+
+
+def test_schedules_dont_depend_on_the_schedules_before(program):
+    work_dir, ids = program
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph_builder.get_graph(0, -1)
+    expected = graphs.describe_ops(graph_builder.get_schedule([ids['a']]).ops)
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph_builder.get_graph(0, -1)
+    # the recorded schedule sets b as an input, which no longer waits for a
+    graph_builder.get_schedule([ids['a'], ids['b']])
+    assert graphs.describe_ops(graph_builder.get_schedule([ids['a']]).ops) == expected
+
+
+def test_node_state_of_runs_is_not_saved(program):
+    work_dir, ids = program
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph = graph_builder.get_graph(0, -1)
+    schedule = graph_builder.get_schedule([ids['a'], ids['b']])
+    schedule.run([torch.tensor(2.0), torch.tensor(5.0)])
+    assert any(node.output is not None for node in graph.values())
+    for node in graph.values():
+        state = GraalWrapper.GraphArtifact.get_node_state(node)
+        assert state['output'] is None and state['inputs'] == {} and state['node_penalty'] == 0
+        assert state['desired_inputs'] == node.desired_inputs
+    # the nodes themselves keep their state
+    assert any(node.output is not None for node in graph.values())
+
+
+def write_old_files(directory):
+    paths = []
+    for idx in range(3):
+        paths.append(os.path.join(directory, f"{idx}{ARTIFACT_SUFFIX}"))
+        with open(paths[-1], 'wb') as file:
+            file.write(b'0' * 1000)
+        os.utime(paths[-1], (1000 + idx, 1000 + idx))
+    # left behind by a process that died while saving
+    paths.append(f"{paths[0]}.1.tmp")
+    open(paths[-1], 'wb').close()
+    os.utime(paths[-1], (1000, 1000))
+    return paths
+
+
+def test_least_recently_used_artifacts_are_removed(program, artifacts):
+    work_dir, ids = program
+    os.makedirs(artifacts)
+    write_old_files(artifacts)
+    GraalWrapper.GraphArtifact.set_size_limit(1500)
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph_builder.get_graph(0, -1)
+    path = GraalWrapper.GraphArtifact.get_path(graph_builder.artifact_key)
+    # the new artifact is kept even though it exceeds the limit on its own
+    assert os.listdir(artifacts) == [os.path.basename(path)]
+
+    old = write_old_files(artifacts)
+    GraalWrapper.GraphArtifact.set_size_limit(os.path.getsize(path) + 1500)
+    # a load marks the artifact as used
+    get_new_process_builder(work_dir).get_graph(0, -1)
+    GraalWrapper.GraphArtifact.prune()
+    assert sorted(os.listdir(artifacts)) == sorted([os.path.basename(path), os.path.basename(old[2])])
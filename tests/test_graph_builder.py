@@ -0,0 +1,43 @@
+import pytest
+
+import GraalWrapper
+import graphs
+
+
+def describe_graph(graph):
+    return {node_id: (type(node), sorted(child.node['id'] for child in node.children.values() if child.node['id'] in graph))
+            for node_id, node in graph.items()}
+
+
+@pytest.mark.parametrize('batched', [False, True])
+def test_slices_match_the_builds_for_their_targets(program, batched):
+    work_dir, ids = program
+    full = graphs.get_graph_builder(work_dir)
+    full.get_graph(0, -1)
+    for end_node in (ids['target_a'], ids['target_b']):
+        graph_builder = GraalWrapper.GraphBuilder(graphs.ROOT_FILE, work_dir=work_dir)
+        built = graph_builder.get_graph(0, end_node)
+        graph_slice = full.get_slice(end_node)
+        assert list(graph_slice.graph) == list(built)
+        assert describe_graph(graph_slice.graph) == describe_graph(built)
+        input_ids = [input_id for input_id in (ids['a'], ids['b']) if input_id in built]
+        for output_ids in (None, [end_node]):
+            expected = graph_builder.get_schedule(input_ids, output_ids=output_ids, batched=batched)
+            schedule = graph_slice.get_schedule(input_ids, output_ids=output_ids, batched=batched)
+            assert graphs.describe_ops(schedule.ops) == graphs.describe_ops(expected.ops)
+            assert graphs.describe_ops(schedule.folded_ops) == graphs.describe_ops(expected.folded_ops)
+
+
+def test_every_root_invoke_has_its_own_inlining_limit(program):
+    work_dir, ids = program
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph = graph_builder.get_graph(0, -1)
+    inlined = {}
+    for node_id in graph:
+        call_path, local_id = graph_builder.namespace.get_local_id(node_id)
+        if call_path and local_id == 0:
+            inlined.setdefault(call_path[0], []).append(call_path)
+    # every invoke of Calc.inc on the path of target B inlines it, Calc.loop stops recursing after 10 inlinings and
+    # Calc.twice still inlines Calc.inc
+    assert sorted(len(call_paths) for call_paths in inlined.values()) == [1] * graphs.INC_CHAIN + [2, 10]
+    assert max(len(call_path) for call_paths in inlined.values() for call_path in call_paths) == 10
@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+import GraalWrapper
+import graphs
+
+
+@pytest.fixture
+def graph_file(tmp_path):
+    GraalWrapper.GraphCache.clear()
+    path = os.path.join(tmp_path, 'Calc.inc.json')
+    with open(path, 'w') as file:
+        json.dump(graphs.create_inc().to_json(), file)
+    yield path
+    GraalWrapper.GraphCache.clear()
+
+
+def parse_only_from_json(monkeypatch):
+    parsed = []
+    parse = GraalWrapper.GraphCache.parse
+    monkeypatch.setattr(GraalWrapper.GraphCache, 'parse', staticmethod(lambda data: parsed.append(data) or parse(data)))
+    return parsed
+
+
+def test_cache_file_is_used(graph_file, monkeypatch):
+    parsed = parse_only_from_json(monkeypatch)
+    graph = GraalWrapper.GraphCache.load(graph_file)
+    assert os.path.exists(graph_file + '.cache')
+    assert len(parsed) == 1
+    # another process only reads the cache file
+    GraalWrapper.GraphCache.clear()
+    assert GraalWrapper.GraphCache.load(graph_file) == graph
+    assert len(parsed) == 1
+
+
+def test_every_load_returns_a_new_copy(graph_file):
+    graph = GraalWrapper.GraphCache.load(graph_file)
+    graph['nodes'][0]['props']['id'] = 1000
+    graph['edges'].clear()
+    assert GraalWrapper.GraphCache.load(graph_file) == graphs.create_inc().to_json()
+
+
+def test_changed_json_invalidates_the_cache(graph_file, monkeypatch):
+    GraalWrapper.GraphCache.load(graph_file)
+    changed = graphs.create_inc().to_json()
+    changed['nodes'][2]['props']['rawvalue'] = '2'
+    with open(graph_file, 'w') as file:
+        json.dump(changed, file)
+    parsed = parse_only_from_json(monkeypatch)
+    # in the same process and in a new one
+    assert GraalWrapper.GraphCache.load(graph_file) == changed
+    GraalWrapper.GraphCache.clear()
+    assert GraalWrapper.GraphCache.load(graph_file) == changed
+    assert len(parsed) == 1
+
+
+def test_outdated_cache_file_is_rebuilt(graph_file, monkeypatch):
+    GraalWrapper.GraphCache.load(graph_file)
+    with open(graph_file + '.cache', 'r+b') as file:
+        file.write(b'0')  # a cache file of another version
+    GraalWrapper.GraphCache.clear()
+    parsed = parse_only_from_json(monkeypatch)
+    assert GraalWrapper.GraphCache.load(graph_file) == graphs.create_inc().to_json()
+    assert len(parsed) == 1
+    GraalWrapper.GraphCache.clear()
+    GraalWrapper.GraphCache.load(graph_file)
+    assert len(parsed) == 1
+
+
+def test_only_the_first_graph_is_read(graph_file):
+    first = graphs.create_inc().to_json()
+    later = graphs.create_twice().to_json()
+    with open(graph_file, 'w') as file:
+        file.write(json.dumps(first) + '\n' + json.dumps(later))
+    assert GraalWrapper.GraphCache.load(graph_file) == first
+
+
+def test_unused_props_are_dropped(graph_file):
+    graph = graphs.create_inc().to_json()
+    graph['nodes'][0]['props']['nodeSourcePosition'] = {'bci': 1}
+    with open(graph_file, 'w') as file:
+        json.dump(graph, file)
+    assert 'nodeSourcePosition' not in GraalWrapper.GraphCache.load(graph_file)['nodes'][0]['props']
@@ -0,0 +1,69 @@
+import GraalWrapper
+import nodes
+import graphs
+
+
+def scan_ancestors(json_graph, end_node):
+    # fixpoint over the full edge list, without any index
+    ancestors = {end_node}
+    changed = True
+    while changed:
+        changed = False
+        for edge in json_graph['edges']:
+            if edge['to'] in ancestors and edge['from'] not in ancestors:
+                ancestors.add(edge['from'])
+                changed = True
+    return ancestors
+
+
+def check_index(index, json_graph):
+    node_ids = {node['id'] for node in json_graph['nodes']} | {edge[key] for edge in json_graph['edges']
+                                                              for key in ('from', 'to')}
+    for node_id in node_ids:
+        assert index.get_outgoing(node_id) == [edge for edge in json_graph['edges'] if edge['from'] == node_id]
+        assert index.get_incoming(node_id) == [edge for edge in json_graph['edges'] if edge['to'] == node_id]
+        assert index.get_nodes(node_id) == [(position, node) for position, node in enumerate(json_graph['nodes'])
+                                            if node['id'] == node_id]
+    assert index.get_outgoing(-5) == [] and index.get_incoming(-5) == [] and index.get_nodes(-5) == []
+
+
+def test_index_matches_the_edge_list(program):
+    work_dir, ids = program
+    graph_builder = graphs.get_graph_builder(work_dir)
+    check_index(GraalWrapper.GraphIndex(graph_builder.load_graph()), graph_builder.json_graph)
+
+
+def test_index_is_rebuilt_after_inlining(program):
+    work_dir, ids = program
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph_builder.get_graph(0, -1)
+    # the inlining added the nodes and edges of the callees to the json graph of the root graph
+    assert any(not graph_builder.owns(node['id']) for node in graph_builder.json_graph['nodes'])
+    check_index(graph_builder.get_index(), graph_builder.json_graph)
+
+
+def test_backward_slicing_matches_a_scan(program):
+    work_dir, ids = program
+    graph_builder = graphs.get_graph_builder(work_dir)
+    json_graph = graph_builder.load_graph()
+    for end_node in (ids['target_a'], ids['target_b']):
+        assert graph_builder.do_backward_slicing(json_graph, end_node) == scan_ancestors(json_graph, end_node)
+    # a graph that isn't the json graph of the builder gets its own index
+    graph_builder.get_graph(0, -1)
+    inlined = graph_builder.json_graph
+    for end_node in (ids['target_a'], ids['target_b']):
+        assert graph_builder.do_backward_slicing(dict(inlined), end_node) == scan_ancestors(inlined, end_node)
+
+
+def test_connected_edges_match_the_edge_list(program):
+    work_dir, ids = program
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph = graph_builder.get_graph(0, -1)
+    connected = [(edge['from'], edge['to']) for edge in graph_builder.json_graph['edges']
+                 if edge['from'] in graph and edge['to'] in graph]
+    # a call target node adds a reverse edge to the invoke nodes among its parents
+    call_target = nodes.NodeRegistry.get(graphs.CALL_TARGET)
+    connected += [(dest, src) for src, dest in connected
+                  if isinstance(graph[src], nodes.InvokeNode) and isinstance(graph[dest], call_target)]
+    children = [(node_id, child.node['id']) for node_id, node in graph.items() for child in node.children.values()]
+    assert sorted(children) == sorted(connected)
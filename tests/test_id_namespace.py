@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+import GraalWrapper
+import graphs
+
+
+def test_blocks_are_dense_and_disjoint():
+    namespace = GraalWrapper.IdNamespace()
+    sizes = {(): 30, (4,): 5, (4, 2): 1, (7,): 0, (4, 3): 12}
+    firsts = {call_path: namespace.get_block(call_path, size) for call_path, size in sizes.items()}
+    # allocated in the order of the first use, a method without ids still takes one
+    assert list(firsts.values()) == [0, 30, 35, 36, 37]
+    assert namespace.get_block((4,), 5) == 30
+    for call_path, size in sizes.items():
+        for local_id in range(size):
+            assert namespace.get_local_id(firsts[call_path] + local_id) == (call_path, local_id)
+    assert namespace.get_call_path(36) is None
+    assert namespace.get_local_id(49) == (None, 49)
+    assert namespace.get_local_id(-1) == (None, -1)
+
+
+def test_a_block_cannot_grow():
+    namespace = GraalWrapper.IdNamespace()
+    namespace.get_block((1,), 3)
+    assert namespace.get_block((1,), 2) == 0
+    with pytest.raises(ValueError):
+        namespace.get_block((1,), 4)
+
+
+def test_state_round_trip():
+    namespace = GraalWrapper.IdNamespace()
+    for call_path, size in [((), 10), ((3,), 4), ((3, 1), 2)]:
+        namespace.get_block(call_path, size)
+    restored = GraalWrapper.IdNamespace()
+    restored.set_state(namespace.get_state())
+    assert restored.get_state() == namespace.get_state()
+    assert [restored.get_local_id(node_id) for node_id in range(18)] == \
+           [namespace.get_local_id(node_id) for node_id in range(18)]
+    assert restored.get_block((5,), 1) == 16
+
+
+def test_namespace_is_shared_per_root_file(tmp_path):
+    root_file = os.path.join(tmp_path, 'Main.main.json')
+    assert GraalWrapper.IdNamespace.get_namespace(root_file) is \
+           GraalWrapper.IdNamespace.get_namespace(os.path.join(tmp_path, '.', 'Main.main.json'))
+    assert GraalWrapper.IdNamespace.get_namespace(root_file) is not \
+           GraalWrapper.IdNamespace.get_namespace(os.path.join(tmp_path, 'Calc.inc.json'))
+
+
+def check_global_ids(graph, namespace):
+    """
+    :return: the depth of the deepest call-site path in the graph
+    """
+    methods = {method.name: method.to_json() for method in (graphs.create_main()[0], graphs.create_inc(),
+                                                            graphs.create_twice(), graphs.create_loop())}
+    depth = 0
+    for node_id, node in graph.items():
+        call_path, local_id = namespace.get_local_id(node_id)
+        # the method of a call-site path follows from the target methods of its invoke nodes
+        method = methods['Main.main']
+        for invoke_id in call_path:
+            method = methods[method['nodes'][invoke_id]['props']['targetMethod']]
+        json_node = method['nodes'][local_id]
+        assert json_node['id'] == local_id
+        assert node.node['props']['node_class'] == json_node['props']['node_class']
+        depth = max(depth, len(call_path))
+    return depth
+
+
+def test_global_ids_map_back_to_the_method_files(program):
+    work_dir, ids = program
+    graph_builder = graphs.get_graph_builder(work_dir)
+    # Calc.loop calls itself until the inlining limit
+    assert check_global_ids(graph_builder.get_graph(0, -1), graph_builder.namespace) == 10
+
+
+def test_slices_keep_the_global_ids(program):
+    work_dir, ids = program
+    # the builds for the targets come first, the full build afterward uses the same namespace
+    built = {}
+    for end_node in (ids['target_a'], ids['target_b'], -1):
+        graph_builder = graphs.get_graph_builder(work_dir)
+        built[end_node] = graph_builder.get_graph(0, end_node)
+        assert check_global_ids(built[end_node], graph_builder.namespace) > 0
+    assert graph_builder.namespace is GraalWrapper.IdNamespace.get_namespace(os.path.join(work_dir, graphs.ROOT_FILE))
+    for end_node in (ids['target_a'], ids['target_b']):
+        assert ids['a'] in built[end_node] and end_node in built[end_node]
+        assert built[end_node].keys() <= built[-1].keys()
+        for node_id in built[end_node]:
+            assert built[-1][node_id].node['props'] == built[end_node][node_id].node['props']
@@ -0,0 +1,125 @@
+import json
+import os
+
+import pytest
+
+import nodes
+import graphs
+from nodes.NodeRegistry import node_classes
+from nodes.types.com.oracle.svm.core.graal.graal_nodes.ThrowBytecodeExceptionNode import ThrowBytecodeExceptionNode
+from nodes.types.com.oracle.svm.core.nodes.SubstrateMethodCallTargetNode import SubstrateMethodCallTargetNode
+
+GRAAL = 'jdk.graal.compiler.'
+UNARY = GRAAL + 'replacements.nodes.UnaryMathIntrinsicNode'
+BINARY = GRAAL + 'replacements.nodes.BinaryMathIntrinsicNode'
+
+# the dispatch of GraphBuilder.build before the registry, (Graal class, operation) -> node class
+BASELINE = {
+    (GRAAL + 'nodes.calc.AddNode', None): nodes.calc.AddNode,
+    (GRAAL + 'nodes.ConstantNode', None): nodes.ConstantNode,
+    (GRAAL + 'nodes.calc.IntegerLessThanNode', None): nodes.calc.IntegerLessThanNode,
+    (GRAAL + 'nodes.calc.FloatLessThanNode', None): nodes.calc.FloatLessThanNode,
+    (GRAAL + 'nodes.calc.ConditionalNode', None): nodes.calc.ConditionalNode,
+    (GRAAL + 'nodes.ValuePhiNode', None): nodes.ValuePhiNode,
+    (GRAAL + 'nodes.calc.IntegerEqualsNode', None): nodes.calc.IntegerEqualsNode,
+    (GRAAL + 'nodes.calc.FloatEqualsNode', None): nodes.calc.FloatEqualsNode,
+    (GRAAL + 'nodes.IfNode', None): nodes.IfNode,
+    (GRAAL + 'nodes.InvokeNode', 'String.charAt'): nodes.java.CharAtNode,
+    (GRAAL + 'nodes.InvokeNode', 'String.indexOf'): nodes.java.IndexOfNode,
+    (GRAAL + 'nodes.InvokeWithExceptionNode', 'String.charAt'): nodes.java.CharAtNode,
+    (GRAAL + 'nodes.InvokeWithExceptionNode', 'String.indexOf'): nodes.java.IndexOfNode,
+    (GRAAL + 'nodes.MergeNode', None): nodes.MergeNode,
+    (GRAAL + 'nodes.BeginNode', None): nodes.BeginNode,
+    (GRAAL + 'nodes.EndNode', None): nodes.EndNode,
+    (GRAAL + 'nodes.calc.LeftShiftNode', None): nodes.calc.LeftShiftNode,
+    (GRAAL + 'nodes.calc.IntegerBelowNode', None): nodes.calc.IntegerBelowNode,
+    (GRAAL + 'nodes.calc.FloatBelowNode', None): nodes.calc.FloatBelowNode,
+    (GRAAL + 'nodes.calc.SubNode', None): nodes.calc.SubNode,
+    (GRAAL + 'nodes.calc.MulNode', None): nodes.calc.MulNode,
+    (GRAAL + 'nodes.calc.SignedFloatingIntegerDivNode', None): nodes.calc.DivNode,
+    (GRAAL + 'nodes.calc.FloatDivNode', None): nodes.calc.DivNode,
+    (GRAAL + 'nodes.calc.SqrtNode', None): nodes.calc.SqrtNode,
+    (GRAAL + 'nodes.calc.SignedFloatingIntegerRemNode', None): nodes.calc.ModNode,
+    (GRAAL + 'nodes.calc.NegateNode', None): nodes.calc.NegateNode,
+    (GRAAL + 'nodes.StartNode', None): nodes.StartNode,
+    (GRAAL + 'nodes.ParameterNode', None): nodes.ParameterNode,
+    (GRAAL + 'nodes.ReturnNode', None): nodes.ReturnNode,
+    (GRAAL + 'nodes.virtual.VirtualInstanceNode', None): nodes.virtual.VirtualInstanceNode,
+    (GRAAL + 'nodes.virtual.CommitAllocationNode', None): nodes.virtual.CommitAllocationNode,
+    (GRAAL + 'nodes.virtual.AllocatedObjectNode', None): nodes.virtual.AllocatedObjectNode,
+    (GRAAL + 'nodes.java.LoadFieldNode', None): nodes.java.LoadFieldNode,
+    (GRAAL + 'nodes.FrameState', None): nodes.FrameState,
+    (GRAAL + 'nodes.calc.ObjectEqualsNode', None): nodes.calc.ObjectEqualsNode,
+    (GRAAL + 'nodes.calc.IsNullNode', None): nodes.calc.IsNullNode,
+    (GRAAL + 'nodes.java.ArrayLengthNode', None): nodes.java.ArrayLengthNode,
+    (GRAAL + 'replacements.nodes.ArrayEqualsNode', None): nodes.java.ArrayEqualsNode,
+    (GRAAL + 'nodes.PiNode', None): nodes.PiNode,
+    (GRAAL + 'nodes.java.LoadIndexedNode', None): nodes.java.LoadIndexedNode,
+    ('com.oracle.svm.core.nodes.SubstrateMethodCallTargetNode', None): SubstrateMethodCallTargetNode,
+    (GRAAL + 'nodes.FullInfopointNode', None): nodes.FullInfoPointNode,
+    (UNARY, 'SIN'): nodes.calc.SinNode,
+    (UNARY, 'COS'): nodes.calc.CosNode,
+    (UNARY, 'TAN'): nodes.calc.TanNode,
+    (UNARY, 'LOG'): nodes.calc.LogNode,
+    (UNARY, 'LOG10'): nodes.calc.Log10Node,
+    (UNARY, 'EXP'): nodes.calc.ExpNode,
+    (BINARY, 'POW'): nodes.calc.PowNode,
+    ('com.oracle.svm.core.graal.nodes.ThrowBytecodeExceptionNode', None): ThrowBytecodeExceptionNode,
+    (GRAAL + 'nodes.extended.BytecodeExceptionNode', None): ThrowBytecodeExceptionNode,
+}
+
+# GraphBuilder.get_invoked_math_node before the registry, function of FdLibm$<function>.compute -> node class
+BASELINE_FDLIBM = {
+    'Asin': nodes.calc.AsinNode,
+    'Acos': nodes.calc.AcosNode,
+    'Atan': nodes.calc.AtanNode,
+    'Atan2': nodes.calc.Atan2Node,
+    'Sin': nodes.calc.SinNode,
+    'Cos': nodes.calc.CosNode,
+    'Tan': nodes.calc.TanNode,
+    'Log': nodes.calc.LogNode,
+    'Log10': nodes.calc.Log10Node,
+    'Exp': nodes.calc.ExpNode,
+    'Pow': nodes.calc.PowNode,
+}
+
+
+@pytest.mark.parametrize('graal_class, operation', list(BASELINE))
+def test_registry_matches_the_baseline_dispatch(graal_class, operation):
+    assert nodes.NodeRegistry.get(graal_class, operation) is BASELINE[(graal_class, operation)]
+
+
+@pytest.mark.parametrize('function', list(BASELINE_FDLIBM))
+def test_registry_matches_the_baseline_math_functions(function):
+    assert nodes.NodeRegistry.get(nodes.NodeRegistry.FDLIBM, function) is BASELINE_FDLIBM[function]
+
+
+def test_registry_has_no_other_classes():
+    # all other classes fell back to the FallbackNode, a new node class has to be added to the baseline as well
+    assert len(node_classes) == len(BASELINE) + len(BASELINE_FDLIBM)
+
+
+def test_unknown_classes_and_operations_fall_back(tmp_path):
+    method = graphs.MethodGraph('Main.main')
+    start = method.add(graphs.START)
+    parameter = method.add(graphs.PARAMETER, index=0)
+    known = {}
+    for node_class, props, expected in [
+        (UNARY, {'operation': 'SIN'}, nodes.calc.SinNode),
+        (UNARY, {'operation': 'CBRT'}, nodes.FallbackNode),
+        (BINARY, {'operation': 'POW'}, nodes.calc.PowNode),
+        (BINARY, {'operation': 'HYPOT'}, nodes.FallbackNode),
+        (GRAAL + 'nodes.calc.UnknownNode', {}, nodes.FallbackNode),
+        (graphs.INVOKE, {'targetMethod': 'FdLibm$Atan2.compute'}, nodes.calc.Atan2Node),
+        (graphs.INVOKE, {'targetMethod': 'FdLibm$Cbrt.compute'}, nodes.InvokeNode),
+        (graphs.INVOKE, {'targetMethod': 'String.charAt'}, nodes.java.CharAtNode),
+    ]:
+        node_id = method.add(node_class, **props)
+        method.connect(parameter, node_id, 'value')
+        known[node_id] = expected
+    method.ret(None, start)
+    with open(os.path.join(tmp_path, f"{method.name}.json"), 'w') as file:
+        json.dump(method.to_json(), file)
+    graph = graphs.get_graph_builder(str(tmp_path) + os.sep).get_graph(0, -1)
+    for node_id, expected in known.items():
+        assert type(graph[node_id]) is expected
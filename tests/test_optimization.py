@@ -0,0 +1,41 @@
+import pytest
+import torch
+
+import graphs
+import test
+
+# start values of the tries, some reach the target and some don't
+START_VALUES = [[3.0, -5.0], [40.0, 1.0], [-7.0, 120.0]]
+
+
+def get_start_values(values):
+    return [torch.tensor(value, requires_grad=True) for value in values]
+
+
+@pytest.mark.parametrize('target, backend', [('target_a', test.BACKEND_SCHEDULE), ('target_b', test.BACKEND_SCHEDULE),
+                                             ('target_a', test.BACKEND_BATCHED)])
+def test_batched_tries_match_single_tries(program, target, backend):
+    work_dir, ids = program
+    input_ids = [ids['a'], ids['b']]
+    expected = []
+    for values in START_VALUES:
+        # every try on a new build, like the tries of main
+        graph_builder = graphs.get_graph_builder(work_dir)
+        graph = graph_builder.get_graph(0, ids[target])
+        expected.append(test.run_optimization(graph, input_ids, ids[target], graph_builder,
+                                              I_all=get_start_values(values), backend=backend))
+
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph = graph_builder.get_graph(0, ids[target])
+    results = test.run_optimization_batched(graph, input_ids, ids[target], graph_builder,
+                                            I_batch=[get_start_values(values) for values in START_VALUES],
+                                            backend=backend)
+
+    # the tries end with different losses, hence, no try took the result of another one
+    assert len({result['loss'] for result in expected}) > 1
+    for result, expected_result in zip(results, expected):
+        assert result['iteration'] == expected_result['iteration']
+        assert result['loss'] == pytest.approx(expected_result['loss'], rel=1e-9, abs=1e-12)
+        assert result['all_values'] == pytest.approx(expected_result['all_values'], rel=1e-9)
+        assert [value is None for value in result['values']] == \
+               [value is None for value in expected_result['values']]
@@ -0,0 +1,68 @@
+import multiprocessing
+from datetime import datetime
+
+import pytest
+
+import graphs
+import test
+from GraalWrapper.InputNodeTypes import input_node_tuple, TYPE_CONV_INT
+
+pytestmark = pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                                reason="the worker pool requires the fork start method")
+
+
+def get_start_nodes(ids):
+    return [input_node_tuple(ids['a'], TYPE_CONV_INT), input_node_tuple(ids['b'], TYPE_CONV_INT)]
+
+
+def set_worker_context(work_dir, ids, end_nodes):
+    """
+    Set worker_context like main_parallel, without a test directory the tries aren't validated
+    """
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph_builder.get_graph(0, -1)
+    test.worker_context.clear()
+    test.worker_context.update(start_nodes=get_start_nodes(ids), constant_nodes={}, start_time=datetime.now(),
+                               test_dir=None, test_class=None, use_sv_helpers=False, verbose=False,
+                               backend=test.BACKEND_SCHEDULE, concrete_screening=False, graphs={})
+    for end_node in end_nodes:
+        graph_slice = graph_builder.get_slice(end_node)
+        test.worker_context['graphs'][end_node] = (graph_slice, graph_slice.graph)
+
+
+def test_work_units_dont_depend_on_the_worker(program):
+    work_dir, ids = program
+    end_node = ids['target_a']
+    unit_results = []
+    for _ in range(2):
+        set_worker_context(work_dir, ids, [end_node])
+        unit_results.append(test.run_work_unit((end_node, 3, 2)))
+    (found_end_node, first_iteration, results, output, error), repeated = unit_results
+    assert (found_end_node, first_iteration, output, error) == (end_node, 3, None, False)
+    assert len(results) == 2
+    # the results are sent back to the main process, which adds the start nodes again
+    assert all('start_nodes' not in result for result in results)
+    # the start values are seeded from the target and the first try
+    assert repeated[2] == results
+    assert results[0]['all_values'] != results[1]['all_values']
+
+
+def test_pool_runs_the_work_units(program, capsys):
+    work_dir, ids = program
+    end_nodes = [ids['target_a'], ids['target_b']]
+    expected = []
+    for end_node in end_nodes:
+        set_worker_context(work_dir, ids, [end_node])
+        expected.extend(test.run_work_unit((end_node, 0, 1))[2])
+
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph_builder.get_graph(0, -1)
+    capsys.readouterr()
+    state = test.main_parallel(graph_builder, get_start_nodes(ids), end_nodes, {}, datetime.now(), None, None, False,
+                               False, 1, False, 1, test.BACKEND_SCHEDULE, 2)
+    assert state == test.STATE_INCORRECT
+    final_results = capsys.readouterr().out.split("Final results:\n")[1].splitlines()
+    assert len(final_results) == len(expected)
+    for line, (end_node, result) in zip(final_results, zip(end_nodes, expected)):
+        assert line.startswith(f"Target {end_node}: ")
+        assert f"Loss={result['loss']} Iteration={result['iteration']} Real Values={result['values']}" in line
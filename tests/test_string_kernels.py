@@ -0,0 +1,225 @@
+"""
+The vectorized String and Array kernels against the loops that they replaced
+"""
+import pytest
+import torch
+
+import nodes
+from nodes.custom.MathFunctions import MathFunctions
+from nodes.types.Array import Array
+from nodes.types.String import String
+
+INVOKE = 'jdk.graal.compiler.nodes.InvokeNode'
+OBJECT_EQUALS = 'jdk.graal.compiler.nodes.calc.ObjectEqualsNode'
+ARRAY_EQUALS = 'jdk.graal.compiler.replacements.nodes.ArrayEqualsNode'
+
+
+@pytest.fixture(autouse=True)
+def annealing():
+    nodes.custom.Sigmoid.set_annealing_constant(0.5)
+    String.set_temperature(0.7)
+    yield
+    String.set_temperature(1.0)
+
+
+def create_string(text, seed):
+    """
+    :return: String that is most likely text, with random logits that require a gradient
+    """
+    generator = torch.Generator().manual_seed(seed)
+    logits = torch.randn(len(text), len(String.vocab), generator=generator)
+    for idx, letter in enumerate(text):
+        logits[idx, String.vocab.index(letter)] += 3.0
+    return String(len(text), logits=logits.requires_grad_())
+
+
+def baseline_char_at(string, index):
+    # String.charAt without the caches
+    positions = torch.arange(string.length, dtype=torch.float64)
+    position_weights = torch.softmax(-torch.abs(positions - index) / 0.1, dim=0)
+    char_probs = torch.softmax(string.logits / String.temperature, dim=1)
+    return torch.sum(torch.sum(char_probs * position_weights.unsqueeze(1), dim=0) * String.vocab_codes)
+
+
+def baseline_index_of(haystack, needle):
+    # IndexOfNode.exec before the vectorization
+    if needle.length > haystack.length:
+        return torch.tensor(-1.0)
+    match_scores = []
+    for start_pos in range(haystack.length - needle.length + 1):
+        char_matches = [MathFunctions.equals(baseline_char_at(haystack, start_pos + i), baseline_char_at(needle, i))
+                        for i in range(needle.length)]
+        if char_matches:
+            position_match = torch.exp(torch.mean(torch.log(torch.clamp(torch.stack(char_matches), min=1e-10))))
+        else:
+            position_match = torch.tensor(1.0)
+        match_scores.append(position_match)
+    best_match_score = torch.max(torch.stack(match_scores))
+    weighted_sum = torch.sum(torch.stack([score * pos for pos, score in enumerate(match_scores)]))
+    found_index = weighted_sum / (torch.sum(torch.stack(match_scores)) + 1e-10)
+    return -1.0 + (found_index + 1.0) * best_match_score
+
+
+def baseline_object_equals(x, y):
+    # ObjectEqualsNode.exec for strings before the vectorization
+    v_len = MathFunctions.equals(torch.tensor(x.length), torch.tensor(y.length)) * MathFunctions.equals(x.is_null,
+                                                                                                      y.is_null)
+    v_data = 0
+    for i in range(x.length):
+        v_data += MathFunctions.equals(baseline_char_at(x, i), baseline_char_at(y, i))
+    return v_len * v_data / x.length
+
+
+def baseline_array_equals(x, y, x_data, y_data):
+    # ArrayEqualsNode.exec before the vectorization, on the lists of scalar tensors that backed the arrays
+    v_len = MathFunctions.equals(x.length, y.length) * MathFunctions.equals(x.is_null, y.is_null)
+    v_data = 0
+    for i in range(int(round(x.length.item()))):
+        v_data += MathFunctions.equals(x_data[i], y_data[i])
+    return v_len * v_data / x.length
+
+
+def run_node(node_class, operation, inputs):
+    node = nodes.NodeRegistry.get(node_class, operation)({'id': 0, 'props': {'id': 0}})
+    node.inputs = inputs
+    node.exec()
+    return node.output
+
+
+def assert_same_gradients(output, expected, strings):
+    torch.testing.assert_close(output, expected)
+    logits = [string.logits for string in strings]
+    grads = torch.autograd.grad(output, logits, retain_graph=True)
+    expected_grads = torch.autograd.grad(expected, logits)
+    for grad, expected_grad in zip(grads, expected_grads):
+        torch.testing.assert_close(grad, expected_grad)
+
+
+@pytest.mark.parametrize('haystack, needle', [
+    ('hello world', 'world'), ('hello world', 'o'), ('abcabc', 'abc'), ('abc', 'abc'), ('abc', 'xyz'),
+    ('short', ''),
+])
+def test_index_of_matches_the_baseline(haystack, needle):
+    haystack, needle = create_string(haystack, 1), create_string(needle, 2)
+    output = run_node(INVOKE, 'String.indexOf', {'callTarget': {'arguments': haystack, 'arguments_1': needle}})
+    expected = baseline_index_of(haystack, needle)
+    if needle.length == 0:
+        torch.testing.assert_close(output, expected)
+    else:
+        assert_same_gradients(output, expected, [haystack, needle])
+
+
+def test_index_of_a_longer_needle_is_minus_one():
+    output = run_node(INVOKE, 'String.indexOf', {'callTarget': {'arguments': create_string('ab', 1),
+                                                                'arguments_1': create_string('abc', 2)}})
+    assert output.item() == -1.0
+
+
+@pytest.mark.parametrize('x, y', [('hello', 'hello'), ('hello', 'help!'), ('abc', 'abcd'), ('abcd', 'abc')])
+def test_object_equals_matches_the_baseline(x, y):
+    x, y = create_string(x, 1), create_string(y, 2)
+    output = run_node(OBJECT_EQUALS, None, {'x': x, 'y': y})
+    assert_same_gradients(output, baseline_object_equals(x, y), [x, y])
+
+
+@pytest.mark.parametrize('x_values, y_values', [
+    ([1.0, 2.0, 3.0], [1.0, 2.0, 3.0]), ([1.0, 2.0, 3.0], [1.0, 5.0, 3.0]), ([1.0, 2.0], [1.0, 2.0, 3.0]),
+])
+def test_array_equals_matches_the_baseline(x_values, y_values):
+    x_data = [torch.tensor(value, requires_grad=True) for value in x_values]
+    y_data = [torch.tensor(value, requires_grad=True) for value in y_values]
+    x = Array(x_data, length=torch.tensor(float(len(x_values)), requires_grad=True))
+    y = Array(y_data, length=torch.tensor(float(len(y_values)), requires_grad=True))
+    output = run_node(ARRAY_EQUALS, None, {'array1': x, 'array2': y})
+    expected = baseline_array_equals(x, y, x_data, y_data)
+    torch.testing.assert_close(output, expected)
+    leaves = x_data + y_data + [x.length, y.length]
+    grads = torch.autograd.grad(output, leaves, retain_graph=True, allow_unused=True)
+    expected_grads = torch.autograd.grad(expected, leaves, allow_unused=True)
+    for grad, expected_grad in zip(grads, expected_grads):
+        torch.testing.assert_close(torch.zeros(()) if grad is None else grad,
+                                   torch.zeros(()) if expected_grad is None else expected_grad)
+
+
+@pytest.mark.parametrize('index', [0, 3, 4.0, torch.tensor(2.0), 1.5, -1, 7, torch.tensor(2.3, requires_grad=True)])
+def test_char_at_matches_the_baseline(index):
+    string = create_string('hello', 1)
+    # the first call fills the caches, the second one reads them
+    for _ in range(2):
+        output = string.charAt(index, use_gumbel=False)
+        expected = baseline_char_at(string, torch.as_tensor(index))
+        assert_same_gradients(output, expected, [string])
+    if isinstance(index, torch.Tensor) and index.requires_grad:
+        grad, = torch.autograd.grad(string.charAt(index, use_gumbel=False), [index])
+        expected_grad, = torch.autograd.grad(baseline_char_at(string, index), [index])
+        torch.testing.assert_close(grad, expected_grad)
+
+
+def test_char_at_of_several_indices_matches_the_baseline():
+    string = create_string('hello', 1)
+    indices = torch.tensor([[0.0, 4.0], [1.5, 2.0]])
+    output = string.charAt(indices, use_gumbel=False)
+    assert output.shape == indices.shape
+    expected = torch.stack([baseline_char_at(string, index) for index in indices.flatten()]).reshape(indices.shape)
+    torch.testing.assert_close(output, expected)
+
+
+def test_char_at_is_recomputed_after_a_step():
+    string = create_string('hello', 1)
+    optimizer = torch.optim.Adam([string.logits], lr=0.5)
+    for temperature in (0.7, 0.7, 0.3):
+        String.set_temperature(temperature)
+        optimizer.zero_grad()
+        output = sum(string.charAt(index, use_gumbel=False) for index in range(string.length))
+        expected = sum(baseline_char_at(string, index) for index in range(string.length))
+        assert_same_gradients(output, expected, [string])
+        output.backward()
+        optimizer.step()
+
+
+def test_only_integral_indices_within_the_string_are_cached():
+    String.position_weights.clear()
+    string = create_string('hello', 1)
+    for index in (0, 2.0, torch.tensor(4.0), 1.5, -1, 5, torch.tensor([1.0, 2.0])):
+        string.charAt(index, use_gumbel=False)
+    assert set(String.position_weights) == {(5, 0), (5, 2), (5, 4)}
+
+
+def baseline_load_indexed(data, index, stack=False):
+    """
+    LoadIndexedNode.exec before the tensor backed arrays, on the list of scalar tensors that backed the array
+
+    :param stack: keep the gradient of the index, the baseline created a new tensor from the weights, which detached it
+    """
+    distance_values = torch.stack([MathFunctions.equals(i, index) for i in range(len(data))])
+    if not stack:
+        distance_values = distance_values.detach()
+    weighted_distance_values = torch.softmax(distance_values, dim=0)
+    final_value = 0
+    for i in range(len(data)):
+        final_value += data[i] * weighted_distance_values[i]
+    return final_value
+
+
+@pytest.mark.parametrize('index', [0.0, 2.0, 2.4, 9.0, 12.0])
+def test_load_indexed_matches_the_baseline(index):
+    data = [torch.tensor(float(value), requires_grad=True) for value in (3, -1, 7, 5)]
+    # the baseline padded the data to ten elements with 42
+    padded = data + [torch.tensor(Array.default_value) for _ in range(Array.default_capacity - len(data))]
+    array = Array(data, length=torch.tensor(4.0, requires_grad=True))
+    index = torch.tensor(index, requires_grad=True)
+    output = run_node('jdk.graal.compiler.nodes.java.LoadIndexedNode', None, {'array': array, 'index': index})
+    torch.testing.assert_close(output, baseline_load_indexed(padded, index))
+    grads = torch.autograd.grad(output, data + [index])
+    expected_grads = torch.autograd.grad(baseline_load_indexed(padded, index, stack=True), data + [index])
+    for grad, expected_grad in zip(grads, expected_grads):
+        torch.testing.assert_close(grad, expected_grad)
+
+
+def test_arrays_keep_data_beyond_the_default_capacity():
+    data = torch.arange(15.0, requires_grad=True)
+    array = Array(data, length=torch.tensor(15.0))
+    assert len(array.data) == 15
+    expected = [baseline_load_indexed(data, torch.tensor(index)) for index in (12.0, 3.0)]
+    torch.testing.assert_close(array.load(torch.tensor([12.0, 3.0])), torch.stack(expected))
+    assert array.get_optimize_parameter()[-1] is data
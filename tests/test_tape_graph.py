@@ -0,0 +1,144 @@
+import sys
+import threading
+
+import pytest
+import torch
+
+import GraalWrapper
+import nodes
+import graphs
+from GraalWrapper import TapeAutograd
+
+
+@pytest.fixture
+def tape_graphs(program):
+    """
+    :return: (TapeGraph of the build of every target, start values of its inputs)
+    """
+    work_dir, ids = program
+    nodes.custom.Sigmoid.set_annealing_constant(0.5)
+    compiled = []
+    for end_node, input_ids in ((ids['target_a'], [ids['a']]), (ids['target_b'], [ids['a'], ids['b']])):
+        # separate builds, the slices of one build share nodes
+        graph_builder = graphs.get_graph_builder(work_dir)
+        graph_builder.get_graph(0, end_node)
+        schedule = graph_builder.get_schedule(input_ids, output_ids=[end_node])
+        input_values = [torch.tensor(3.0 + idx, requires_grad=True) for idx in range(len(input_ids))]
+        compiled.append((GraalWrapper.TapeGraph.compile(schedule, end_node, input_values), input_values))
+    assert all(tape_graph is not None for tape_graph, _ in compiled)
+    return compiled
+
+
+def get_node_torch():
+    return sys.modules[nodes.calc.AddNode.__module__].torch
+
+
+def test_torch_is_restored_after_a_failed_run(tape_graphs):
+    tape_graph, _ = tape_graphs[0]
+    with pytest.raises(RuntimeError), torch.no_grad(), tape_graph.activate():
+        assert get_node_torch() is TapeAutograd and not TapeAutograd.is_grad_enabled()
+        raise RuntimeError()
+    assert get_node_torch() is torch and TapeAutograd.is_grad_enabled()
+    assert len(GraalWrapper.TapeGraph.get_torch_attributes()) == len(tape_graph.replaced_attributes)
+
+
+def test_nested_activations_restore_the_previous_state(tape_graphs):
+    (outer, _), (inner, _) = tape_graphs
+    with outer.activate():
+        with inner.activate():
+            assert get_node_torch() is TapeAutograd
+        assert get_node_torch() is TapeAutograd
+    assert get_node_torch() is torch
+
+
+def test_threads_run_their_tape_graphs_one_after_the_other(tape_graphs):
+    # switch between the threads as often as possible
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        check_concurrent_runs(tape_graphs)
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+
+def check_concurrent_runs(tape_graphs):
+    def run(tape_graph, input_values):
+        with torch.no_grad():
+            output, penalty = tape_graph(tape_graph.to_tape(input_values))
+        return float(output.numpy()), float(penalty.numpy())
+
+    expected = [run(tape_graph, input_values) for tape_graph, input_values in tape_graphs]
+    results = {idx: [] for idx in range(len(tape_graphs))}
+
+    def work(idx):
+        for _ in range(50):
+            results[idx].append(run(*tape_graphs[idx]))
+
+    threads = [threading.Thread(target=work, args=(idx,)) for idx in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for idx, values in results.items():
+        assert values == [expected[idx]] * 50
+    assert get_node_torch() is torch
+
+
+def compile_target_b(program):
+    work_dir, ids = program
+    nodes.custom.Sigmoid.set_annealing_constant(0.5)
+    graph_builder = graphs.get_graph_builder(work_dir)
+    graph_builder.get_graph(0, ids['target_b'])
+    input_ids = [ids['a'], ids['b']]
+    schedule = graph_builder.get_schedule(input_ids, output_ids=[ids['target_b']])
+    input_values = [torch.tensor(3.0 + idx, requires_grad=True) for idx in range(len(input_ids))]
+    return GraalWrapper.TapeGraph.compile(schedule, ids['target_b'], input_values), schedule
+
+
+def test_folded_runs_match_torch(tape_graphs):
+    for tape_graph, input_values in tape_graphs:
+        schedule, graph = tape_graph.schedule, tape_graph.graph
+        tape_values = tape_graph.to_tape(input_values)
+        for run in range(4):
+            output, penalty = tape_graph(tape_values)
+            loss = -output + penalty
+            loss.backward()
+            tape_result = (float(loss.numpy()), [value.grad.numpy() for value in tape_values])
+            for value in tape_values:
+                value.grad = None
+            assert schedule.captured == (run >= 1)
+        # the same runs with torch
+        schedule.reset()
+        for run in range(4):
+            schedule.run(input_values)
+            loss = -graph[tape_graph.output_id].controlFlowMultiplicative + GraalWrapper.TapeGraph.get_penalties(graph)
+            grads = torch.autograd.grad(loss, input_values)
+        assert tape_result[0] == pytest.approx(loss.item(), rel=1e-9)
+        for grad, expected_grad in zip(tape_result[1], grads):
+            assert grad == pytest.approx(expected_grad.numpy(), rel=1e-9)
+
+
+def test_compile_checks_the_folded_runs(program, monkeypatch):
+    # the frozen nodes lose their values once they are captured on the tape, the first two runs still match
+    monkeypatch.setattr(TapeAutograd.Tensor, 'detach', lambda self: TapeAutograd.Tensor(self.numpy() * 0.0))
+    tape_graph, schedule = compile_target_b(program)
+    assert tape_graph is None
+    assert schedule.runs == 0
+
+
+def test_compile_rejects_kernels_outside_of_the_tape(program, monkeypatch):
+    def exec_with_lerp(self):
+        x, y = self.get_operands()
+        self.output = get_node_torch().lerp(x, x + y, 1.0)
+
+    monkeypatch.setattr(nodes.calc.AddNode, 'exec', exec_with_lerp)
+    assert compile_target_b(program)[0] is None
+
+
+def test_compile_raises_errors_of_the_graph(program, monkeypatch):
+    def exec_with_error(self):
+        raise RuntimeError("kernel failed")
+
+    monkeypatch.setattr(nodes.calc.AddNode, 'exec', exec_with_error)
+    with pytest.raises(RuntimeError, match="kernel failed"):
+        compile_target_b(program)
@@ -0,0 +1,96 @@
+import shutil
+import subprocess
+
+import pytest
+
+import GraalWrapper
+import test
+from GraalWrapper.ValidationDaemon import daemons
+
+pytestmark = pytest.mark.skipif(shutil.which('java') is None or shutil.which('javac') is None,
+                                reason="the tests need a JDK")
+
+TEST_CLASSES = {
+    # reads its input like Verifier, the assertion fails for 42
+    'Checked': """
+import java.util.Scanner;
+
+public class Checked {
+    public static void main(String[] args) {
+        int value = Integer.parseInt(new Scanner(System.in).nextLine().split(" ")[1]);
+        System.out.println("value " + value);
+        assert value != 42 : "value is 42";
+    }
+}
+""",
+    'Endless': """
+public class Endless {
+    public static void main(String[] args) {
+        while (true) {
+            Thread.onSpinWait();
+        }
+    }
+}
+""",
+}
+
+
+@pytest.fixture
+def test_dir(tmp_path):
+    """
+    :return: directory with the compiled classes of TEST_CLASSES, with a trailing separator like the test_dir of main
+    """
+    for name, source in TEST_CLASSES.items():
+        (tmp_path / f"{name}.java").write_text(source)
+    subprocess.run(['javac', '-d', str(tmp_path)] + [str(tmp_path / f"{name}.java") for name in TEST_CLASSES],
+                   check=True, capture_output=True)
+    return str(tmp_path) + '/'
+
+
+@pytest.fixture(params=['daemon', 'subprocess'])
+def execution(request):
+    """
+    run every test through the daemon and through a new java process
+    """
+    GraalWrapper.ValidationDaemon.set_enabled(request.param == 'daemon')
+    yield request.param
+    GraalWrapper.ValidationDaemon.stop_all()
+    GraalWrapper.ValidationDaemon.set_enabled(True)
+
+
+def run_checked(test_dir, value, daemon):
+    GraalWrapper.ValidationDaemon.set_enabled(daemon)
+    try:
+        return test.run_test([value], test_dir, 'Checked', False)[1]
+    finally:
+        GraalWrapper.ValidationDaemon.stop_all()
+        GraalWrapper.ValidationDaemon.set_enabled(True)
+
+
+@pytest.mark.parametrize('value, returncode', [(7, 0), (42, 1)])
+def test_daemon_matches_a_new_java_process(test_dir, value, returncode):
+    res = run_checked(test_dir, value, daemon=True)
+    expected = run_checked(test_dir, value, daemon=False)
+    assert res.returncode == expected.returncode == returncode
+    assert res.stdout.decode().splitlines() == expected.stdout.decode().splitlines() == [f"value {value}"]
+    for stderr in (res.stderr.decode(), expected.stderr.decode()):
+        assert ("java.lang.AssertionError: value is 42" in stderr) == (returncode != 0)
+
+
+def test_daemon_starts_every_test_fresh(test_dir):
+    # a failed test doesn't end the daemon, the next test still runs in it
+    GraalWrapper.ValidationDaemon.set_enabled(True)
+    try:
+        results = []
+        for value in (42, 7, 42):
+            results.append(test.run_test([value], test_dir, 'Checked', False)[1])
+            (daemon,) = daemons.values()
+            assert daemon.process is not None
+        assert [res.returncode for res in results] == [1, 0, 1]
+    finally:
+        GraalWrapper.ValidationDaemon.stop_all()
+
+
+def test_endless_test_is_killed_at_the_timeout(test_dir, execution):
+    with pytest.raises(subprocess.TimeoutExpired):
+        test.run_test([], test_dir, 'Endless', False, timeout=1)
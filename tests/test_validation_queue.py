@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+import GraalWrapper
+
+
+class Validations:
+    """
+    validate function of a ValidationQueue that records its calls
+    """
+
+    def __init__(self, violations=(), errors=(), blocking=()):
+        self.violations = violations
+        self.errors = errors
+        self.blocking = blocking
+        self.release = threading.Event()
+        self.validated = []
+
+    def __call__(self, candidate, log):
+        self.validated.append(candidate)
+        log(f"validated {candidate}")
+        if candidate in self.blocking:
+            self.release.wait(10)
+        if candidate in self.errors:
+            raise ValueError(candidate)
+        return f"violation {candidate}" if candidate in self.violations else None
+
+
+def test_duplicates_are_validated_once(capsys):
+    validations = Validations()
+    queue = GraalWrapper.ValidationQueue(validations)
+    assert queue.submit((1, 2), 'first')
+    assert not queue.submit((1, 2), 'duplicate')
+    assert queue.submit((2, 1), 'second')
+    assert queue.get_violation(wait=True) is None
+    assert validations.validated == ['first', 'second']
+    # the messages are printed in the order of the submissions
+    assert capsys.readouterr().out == "validated first\nvalidated second\n"
+
+
+def test_violation_cancels_the_pending_validations():
+    validations = Validations(violations=['first'], blocking=['second'])
+    queue = GraalWrapper.ValidationQueue(validations)
+    queue.submit(1, 'first')
+    queue.submit(2, 'second')
+    queue.submit(3, 'third')
+    assert queue.get_violation(wait=True) == "violation first"
+    assert not queue.submit(4, 'fourth')
+    validations.release.set()
+    queue.executor.shutdown(wait=True)
+    # the second validation may have started before the violation was found
+    assert validations.validated[0] == 'first' and 'third' not in validations.validated
+
+
+def test_errors_are_raised_by_get_violation():
+    queue = GraalWrapper.ValidationQueue(Validations(errors=['first'], violations=['second']))
+    queue.submit(1, 'first')
+    queue.submit(2, 'second')
+    with pytest.raises(ValueError, match='first'):
+        queue.get_violation(wait=True)
+    # the next validations are still checked
+    assert queue.get_violation(wait=True) == "violation second"
+
+
+def test_validations_are_cancelled_at_the_deadline():
+    validations = Validations(violations=['second'], blocking=['first'])
+    queue = GraalWrapper.ValidationQueue(validations)
+    queue.submit(1, 'first')
+    queue.submit(2, 'second')
+    start = time.monotonic()
+    assert queue.get_violation(wait=True, timeout=0.2) is None
+    assert time.monotonic() - start < 5
+    validations.release.set()
+    queue.executor.shutdown(wait=True)
+    # the running validation ended, the one that didn't start was cancelled
+    assert validations.validated == ['first']